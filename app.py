@@ -2,38 +2,43 @@ from flask import Flask, render_template, jsonify, request
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import plotly.utils
-import json
 import numpy as np
 from datetime import datetime
+from sales_data import load_sales_data, SALES_CSV
+from categories import categorize_descriptions
+from chart_cache import ChartCache, encode_figure
+from request_timing import RequestTimings
+from sales_store import SalesStore, register_store_routes
+from shared_data import source_mtime
+from scatter_charts import scatter_figure
+from histogram_charts import histogram_figure, HISTOGRAM_BINNING, BINNING_METHODS
+from pareto import ParetoCurve
 import warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
 
+# Per-route latency, payload size and cache hit ratios at /api/debug/timings
+timings = RequestTimings(app)
+
+# Date-range metrics over the partitioned export store (sales_store.py)
+register_store_routes(app, SalesStore())
+
 class FlaskSalesDashboard:
-    def __init__(self):
+    def __init__(self, sales_csv=SALES_CSV):
+        self.sales_csv = sales_csv
         self.df = None
         self.insights = {}
+        self.pareto = None
+        # Rebuilt with the data, so cached payloads never outlive it
+        self.chart_cache = ChartCache(source_mtime([self.sales_csv]))
         self.load_data()
     
     def load_data(self):
         """Load and prepare the data"""
         try:
-            # Load CSV data
-            self.df = pd.read_csv('reports_sales_listings_item.csv')
-            
-            # Clean column names
-            self.df.columns = self.df.columns.str.strip().str.replace('"', '')
-            
-            # Clean numeric data
-            numeric_columns = ['Stock', 'Sold', 'Subtotal', 'Discounts', 'Subtotal w/ Discounts', 
-                              'Total', 'Cost', 'Profit', 'Margin']
-            
-            for col in numeric_columns:
-                if col in self.df.columns:
-                    self.df[col] = self.df[col].astype(str).str.replace('$', '').str.replace('%', '').str.replace(',', '')
-                    self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+            # Load cleaned CSV data (served from the typed cache when unchanged)
+            self.df = load_sales_data(self.sales_csv)
             
             # Create categories
             self.df['Category'] = self.categorize_products(self.df['Description'])
@@ -44,39 +49,25 @@ class FlaskSalesDashboard:
     
     def categorize_products(self, descriptions):
         """Categorize products based on description"""
-        categories = []
-        for desc in descriptions:
-            desc_lower = str(desc).lower()
-            if any(word in desc_lower for word in ['vibrator', 'rabbit', 'bullet', 'wand']):
-                categories.append('Vibrators')
-            elif any(word in desc_lower for word in ['supplement', 'rhino', 'mood', 'male', 'female']):
-                categories.append('Supplements')
-            elif any(word in desc_lower for word in ['lube', 'lubricant', 'gel', 'oil']):
-                categories.append('Lubricants')
-            elif any(word in desc_lower for word in ['dress', 'lingerie', 'bra', 'panty', 'stocking', 'heels', 'shoes']):
-                categories.append('Clothing & Accessories')
-            elif any(word in desc_lower for word in ['dildo', 'plug', 'ring', 'harness', 'restraint']):
-                categories.append('Adult Toys')
-            elif any(word in desc_lower for word in ['cleaner', 'clean', 'charger', 'battery']):
-                categories.append('Accessories')
-            else:
-                categories.append('Other')
-        return categories
+        return categorize_descriptions(descriptions)
     
     def generate_insights(self):
         """Generate key insights from the data"""
         self.insights = {
-            'total_revenue': self.df['Total'].sum(),
-            'total_units_sold': self.df['Sold'].sum(),
-            'total_products': len(self.df),
-            'avg_profit_margin': self.df['Margin'].mean(),
-            'top_product': self.df.loc[self.df['Total'].idxmax(), 'Description'],
-            'top_product_revenue': self.df['Total'].max(),
-            'negative_margin_products': len(self.df[self.df['Margin'] < 0]),
-            'high_margin_products': len(self.df[self.df['Margin'] > 50]),
-            'top_category': self.df.groupby('Category')['Total'].sum().idxmax(),
-            'top_category_revenue': self.df.groupby('Category')['Total'].sum().max()
+            'total_revenue': float(self.df['Total'].sum()),
+            'total_units_sold': int(self.df['Sold'].sum()),
+            'total_products': int(len(self.df)),
+            'avg_profit_margin': float(self.df['Margin'].mean()),
+            'top_product': str(self.df.loc[self.df['Total'].idxmax(), 'Description']),
+            'top_product_revenue': float(self.df['Total'].max()),
+            'negative_margin_products': int(len(self.df[self.df['Margin'] < 0])),
+            'high_margin_products': int(len(self.df[self.df['Margin'] > 50])),
+            'top_category': str(self.df.groupby('Category')['Total'].sum().idxmax()),
+            'top_category_revenue': float(self.df.groupby('Category')['Total'].sum().max())
         }
+        # Concentration curve and breakpoints, ranked once per load
+        self.pareto = ParetoCurve(self.df['Total'])
+        self.insights.update(self.pareto.insights())
     
     def create_revenue_chart(self):
         """Create revenue distribution chart"""
@@ -87,7 +78,7 @@ class FlaskSalesDashboard:
             title="Revenue Distribution by Category"
         )
         fig.update_traces(textposition='inside', textinfo='percent+label')
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_top_products_chart(self):
         """Create top products chart"""
@@ -100,33 +91,37 @@ class FlaskSalesDashboard:
             title="Top 10 Products by Revenue"
         )
         fig.update_layout(yaxis={'categoryorder':'total ascending'})
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
-    def create_margin_distribution_chart(self):
+    def create_margin_distribution_chart(self, binning=None):
         """Create margin distribution chart"""
-        fig = px.histogram(
-            self.df,
-            x='Margin',
-            nbins=30,
+        # Binned here so only the bin edges and counts are sent, not every margin
+        fig = histogram_figure(
+            self.df['Margin'],
             title="Profit Margin Distribution",
-            labels={'Margin': 'Profit Margin (%)', 'count': 'Number of Products'}
+            x_label='Profit Margin (%)',
+            bins=30,
+            method=binning
         )
-        fig.add_vline(x=self.df['Margin'].mean(), line_dash="dash", line_color="red",
-                     annotation_text=f"Mean: {self.df['Margin'].mean():.1f}%")
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_revenue_vs_units_chart(self):
         """Create revenue vs units sold chart"""
-        fig = px.scatter(
-            self.df,
+        # Marker sizes cannot be negative: loss-making products get the smallest marker
+        df_filtered = self.df.copy()
+        df_filtered['Margin_size'] = df_filtered['Margin'].clip(lower=0).fillna(0)
+        
+        fig = scatter_figure(
+            df_filtered,
             x='Sold',
             y='Total',
             color='Category',
-            size='Margin',
+            size='Margin_size',
             hover_data=['Description'],
-            title="Revenue vs Units Sold (Size = Profit Margin)"
+            title="Revenue vs Units Sold (Size = Profit Margin)",
+            labels={'Margin_size': 'Profit Margin (%)'}
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_category_performance_chart(self):
         """Create category performance chart"""
@@ -156,30 +151,12 @@ class FlaskSalesDashboard:
             yaxis2=dict(title="Units Sold", overlaying="y", side="right"),
             barmode='group'
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_pareto_chart(self):
         """Create Pareto analysis chart"""
-        sorted_df = self.df.sort_values('Total', ascending=False)
-        cumulative_revenue = sorted_df['Total'].cumsum()
-        cumulative_percentage = (np.arange(len(cumulative_revenue)) + 1) / len(cumulative_revenue) * 100
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=cumulative_percentage,
-            y=cumulative_revenue,
-            mode='lines+markers',
-            name='Cumulative Revenue'
-        ))
-        fig.add_hline(y=cumulative_revenue.max() * 0.8, line_dash="dash", line_color="red",
-                     annotation_text="80% of Revenue")
-        
-        fig.update_layout(
-            title="Revenue Concentration (Pareto Analysis)",
-            xaxis_title="Percentage of Products (%)",
-            yaxis_title="Cumulative Revenue ($)"
-        )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        # Downsampled curve: a bounded number of points whatever the catalog size
+        return encode_figure(self.pareto.figure())
     
     def get_top_products_data(self):
         """Get top products data for table"""
@@ -214,52 +191,56 @@ def index():
 @app.route('/api/metrics')
 def get_metrics():
     """API endpoint for key metrics"""
-    return jsonify(dashboard.insights)
+    return dashboard.chart_cache.response('data:metrics', lambda: app.json.dumps(dashboard.insights))
 
 @app.route('/api/charts/revenue')
 def get_revenue_chart():
     """API endpoint for revenue chart"""
-    return dashboard.create_revenue_chart()
+    return dashboard.chart_cache.response('revenue', dashboard.create_revenue_chart)
 
 @app.route('/api/charts/top-products')
 def get_top_products_chart():
     """API endpoint for top products chart"""
-    return dashboard.create_top_products_chart()
+    return dashboard.chart_cache.response('top-products', dashboard.create_top_products_chart)
 
 @app.route('/api/charts/margin-distribution')
 def get_margin_distribution_chart():
     """API endpoint for margin distribution chart"""
-    return dashboard.create_margin_distribution_chart()
+    binning = request.args.get('binning', HISTOGRAM_BINNING)
+    if binning not in BINNING_METHODS:
+        return jsonify({'error': f"Unknown binning: {binning}"}), 400
+    return dashboard.chart_cache.response(f'margin-distribution:{binning}',
+                                          lambda: dashboard.create_margin_distribution_chart(binning))
 
 @app.route('/api/charts/revenue-vs-units')
 def get_revenue_vs_units_chart():
     """API endpoint for revenue vs units chart"""
-    return dashboard.create_revenue_vs_units_chart()
+    return dashboard.chart_cache.response('revenue-vs-units', dashboard.create_revenue_vs_units_chart)
 
 @app.route('/api/charts/category-performance')
 def get_category_performance_chart():
     """API endpoint for category performance chart"""
-    return dashboard.create_category_performance_chart()
+    return dashboard.chart_cache.response('category-performance', dashboard.create_category_performance_chart)
 
 @app.route('/api/charts/pareto')
 def get_pareto_chart():
     """API endpoint for Pareto chart"""
-    return dashboard.create_pareto_chart()
+    return dashboard.chart_cache.response('pareto', dashboard.create_pareto_chart)
 
 @app.route('/api/data/top-products')
 def get_top_products_data():
     """API endpoint for top products data"""
-    return jsonify(dashboard.get_top_products_data().to_dict('records'))
+    return dashboard.chart_cache.response('data:top-products', lambda: app.json.dumps(dashboard.get_top_products_data().to_dict('records')))
 
 @app.route('/api/data/negative-margin')
 def get_negative_margin_data():
     """API endpoint for negative margin data"""
-    return jsonify(dashboard.get_negative_margin_data().to_dict('records'))
+    return dashboard.chart_cache.response('data:negative-margin', lambda: app.json.dumps(dashboard.get_negative_margin_data().to_dict('records')))
 
 @app.route('/api/data/category-summary')
 def get_category_summary_data():
     """API endpoint for category summary data"""
-    return jsonify(dashboard.get_category_summary().to_dict('index'))
+    return dashboard.chart_cache.response('data:category-summary', lambda: app.json.dumps(dashboard.get_category_summary().to_dict('index')))
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
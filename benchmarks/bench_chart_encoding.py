@@ -0,0 +1,113 @@
+"""Benchmark chart payload encoding: the old encode/decode/jsonify path vs encode_figure.
+
+Run from the project root:
+    python benchmarks/bench_chart_encoding.py --rows 100000
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix='chart-bench-')
+os.environ.setdefault('SALES_CACHE_DIR', os.path.join(WORK_DIR, 'cache'))
+os.environ.setdefault('SHARED_DATA_DIR', os.path.join(WORK_DIR, 'shared'))
+os.environ['DASHBOARD_RELOAD_INTERVAL'] = '0'
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import plotly.io as pio
+import plotly.utils
+from flask import jsonify
+from synthetic_data import write_sales_export, write_warehouse_export
+
+
+def capture_figures(simple_app, dashboard):
+    """Build every simple_app chart once and keep the Figure objects"""
+    figures = {}
+    encode = simple_app.encode_figure
+    for name, method in simple_app.BOOTSTRAP_CHARTS.items():
+        def capture(fig, name=name):
+            figures[name] = fig
+            return encode(fig)
+        simple_app.encode_figure = capture
+        try:
+            getattr(dashboard, method)()
+        except Exception as e:
+            print(f"{name}: could not build figure: {e}", file=sys.stderr)
+        finally:
+            simple_app.encode_figure = encode
+    return figures
+
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="also write the results as JSON here")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    try:
+        run(args)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+def run(args):
+    import simple_app
+    from chart_cache import encode_figure, FIGURE_JSON_ENGINE
+
+    sales_csv = write_sales_export(os.path.join(WORK_DIR, 'sales.csv'), args.rows)
+    warehouse_csv = write_warehouse_export(os.path.join(WORK_DIR, 'warehouse.csv'), args.rows)
+    dashboard = simple_app.SimpleSalesDashboard(sales_csv, warehouse_csv)
+    figures = capture_figures(simple_app, dashboard)
+
+    def legacy(fig):
+        # What the chart routes used to do: encode, decode, then re-encode with jsonify
+        return jsonify(json.loads(json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder))).get_data()
+
+    results = []
+    with simple_app.app.app_context():
+        for name, fig in figures.items():
+            legacy_time, legacy_body = best_time(lambda: legacy(fig), args.repeat)
+            stdlib_time, _ = best_time(lambda: pio.to_json(fig, validate=False, engine='json'), args.repeat)
+            fast_time, fast_body = best_time(lambda: encode_figure(fig), args.repeat)
+            assert json.loads(legacy_body) == json.loads(fast_body), name
+            results.append({
+                'chart': name,
+                'legacy_ms': round(legacy_time * 1000, 3),
+                'single_pass_json_ms': round(stdlib_time * 1000, 3),
+                'encode_figure_ms': round(fast_time * 1000, 3),
+                'legacy_bytes': len(legacy_body),
+                'bytes': len(fast_body)
+            })
+
+    print(f"rows: {args.rows:,}   encode_figure engine: {FIGURE_JSON_ENGINE}")
+    print(f"{'chart':<28}{'legacy':>12}{'1-pass json':>14}{'encode_figure':>16}{'bytes':>12}")
+    for r in results:
+        print(f"{r['chart']:<28}{r['legacy_ms']:>10.1f}ms{r['single_pass_json_ms']:>12.1f}ms"
+              f"{r['encode_figure_ms']:>14.1f}ms{r['bytes']:>12,}")
+    legacy_total = sum(r['legacy_ms'] for r in results)
+    fast_total = sum(r['encode_figure_ms'] for r in results)
+    print(f"{'total':<28}{legacy_total:>10.1f}ms{'':>14}{fast_total:>14.1f}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'engine': FIGURE_JSON_ENGINE, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""Time every stage of the dashboards on synthetic exports and emit the results as JSON.
+
+Run from the project root:
+    python benchmarks/run_benchmarks.py --sizes 10k,100k --output bench.json
+    python benchmarks/run_benchmarks.py --sizes 1m --stages load,categorize,simple_app
+
+Exports are generated once per size into --data-dir and reused on later runs.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Keep caches out of the project and the reloader thread off before the apps are imported
+WORK_DIR = tempfile.mkdtemp(prefix='sales-bench-')
+os.environ.setdefault('SALES_CACHE_DIR', os.path.join(WORK_DIR, 'cache'))
+os.environ.setdefault('SHARED_DATA_DIR', os.path.join(WORK_DIR, 'shared'))
+os.environ['DASHBOARD_RELOAD_INTERVAL'] = '0'
+os.environ['MPLBACKEND'] = 'Agg'
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+import pandas as pd
+from synthetic_data import write_sales_export, write_warehouse_export
+
+STAGES = ['load', 'categorize', 'insights', 'warehouse', 'simple_app', 'app', 'report']
+
+
+def parse_size(text):
+    text = text.strip().lower().replace('_', '')
+    for suffix, factor in (('k', 1_000), ('m', 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+class Recorder:
+    """Collects one result row per timed call"""
+
+    def __init__(self, verbose=True):
+        self.results = []
+        self.verbose = verbose
+
+    def time(self, stage, name, rows, func, **extra):
+        """Run func once, silencing its prints, and record the wall time"""
+        record = {'stage': stage, 'name': name, 'rows': rows}
+        output = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                result = func()
+        except Exception as e:
+            result = None
+            record['error'] = f"{type(e).__name__}: {e}"
+        record['seconds'] = round(time.perf_counter() - start, 6)
+        record.update(extra)
+        self.results.append(record)
+
+        if self.verbose:
+            status = record.get('error', f"{record['seconds'] * 1000:,.1f} ms")
+            print(f"  {rows:>12,}  {stage:<11} {name:<45} {status}", file=sys.stderr)
+        return result
+
+
+def ensure_exports(data_dir, rows):
+    """Generate (or reuse) the synthetic sales and warehouse exports for a size"""
+    os.makedirs(data_dir, exist_ok=True)
+    sales_csv = os.path.join(data_dir, f'sales_{rows}.csv')
+    warehouse_csv = os.path.join(data_dir, f'warehouse_{rows}.csv')
+    if not os.path.exists(sales_csv):
+        write_sales_export(sales_csv, rows)
+    if not os.path.exists(warehouse_csv):
+        write_warehouse_export(warehouse_csv, rows)
+    return sales_csv, warehouse_csv
+
+
+def api_routes(flask_app):
+    """Every /api/data/* and /api/charts/* endpoint, in registration order"""
+    return [rule.rule for rule in flask_app.url_map.iter_rules()
+            if rule.rule.startswith(('/api/data/', '/api/charts/'))]
+
+
+def time_endpoints(recorder, stage, flask_app, rows):
+    """Request each endpoint twice: cold renders, then warm (cached) responses"""
+    client = flask_app.test_client()
+    # Failures are recorded as their status code; keep tracebacks off the progress output
+    flask_app.logger.disabled = True
+    for route in api_routes(flask_app):
+        for phase in ('cold', 'warm'):
+            response = recorder.time(stage, f"{route} ({phase})", rows, lambda: client.get(route))
+            if response is not None:
+                recorder.results[-1]['status'] = response.status_code
+                recorder.results[-1]['bytes'] = len(response.get_data())
+
+
+def bench_size(recorder, stages, rows, sales_csv, warehouse_csv):
+    from sales_data import load_sales_data
+    from categories import CategoryEngine
+    from warehouse_data import derive_warehouse_columns
+    from reloader import SnapshotReloader
+    from shared_data import SharedTables
+
+    cache_dir = os.path.join(WORK_DIR, f'cache_{rows}')
+    df = None
+
+    if 'load' in stages or 'categorize' in stages:
+        df = recorder.time('load', 'read_csv + clean', rows,
+                           lambda: load_sales_data(sales_csv, use_cache=False))
+    if 'load' in stages:
+        recorder.time('load', 'load_sales_data (cache miss)', rows,
+                      lambda: load_sales_data(sales_csv, cache_dir=cache_dir))
+        recorder.time('load', 'load_sales_data (cache hit)', rows,
+                      lambda: load_sales_data(sales_csv, cache_dir=cache_dir))
+
+    if 'categorize' in stages and df is not None:
+        engine = CategoryEngine()
+        recorder.time('categorize', 'categorize_products (cold)', rows,
+                      lambda: engine.categorize(df['Description']))
+        recorder.time('categorize', 'categorize_products (memoized)', rows,
+                      lambda: engine.categorize(df['Description']))
+
+    if stages & {'insights', 'warehouse', 'simple_app'}:
+        import simple_app
+        # A fresh shared-table directory per size so the first build really loads
+        simple_app.shared_tables = SharedTables(os.path.join(WORK_DIR, f'shared_{rows}'))
+        dashboard = recorder.time('simple_app', 'SimpleSalesDashboard() (load)', rows,
+                                  lambda: simple_app.SimpleSalesDashboard(sales_csv, warehouse_csv))
+        recorder.time('simple_app', 'SimpleSalesDashboard() (attach shared)', rows,
+                      lambda: simple_app.SimpleSalesDashboard(sales_csv, warehouse_csv))
+
+        if dashboard is not None and dashboard.df is not None:
+            if 'insights' in stages:
+                recorder.time('insights', 'generate_insights', rows, dashboard.generate_insights)
+                recorder.time('insights', 'generate_warehouse_insights', rows,
+                              dashboard.generate_warehouse_insights)
+            if 'warehouse' in stages:
+                recorder.time('warehouse', 'load_warehouse_data', rows, dashboard.load_warehouse_data)
+                frame = dashboard.warehouse_df.copy()
+                recorder.time('warehouse', 'derive_warehouse_columns', rows,
+                              lambda: derive_warehouse_columns(frame))
+            if 'simple_app' in stages:
+                simple_app.reloader = SnapshotReloader(lambda: dashboard, [], interval=0, initial=dashboard)
+                time_endpoints(recorder, 'simple_app', simple_app.app, rows)
+
+    if 'app' in stages:
+        import app as flask_app_module
+        dashboard = recorder.time('app', 'FlaskSalesDashboard()', rows,
+                                  lambda: flask_app_module.FlaskSalesDashboard(sales_csv))
+        if dashboard is not None:
+            flask_app_module.dashboard = dashboard
+            time_endpoints(recorder, 'app', flask_app_module.app, rows)
+
+    if 'report' in stages:
+        bench_report(recorder, rows, sales_csv)
+
+
+def bench_report(recorder, rows, sales_csv):
+    """Time sales_analytics.py's chart and Excel generation in a scratch directory"""
+    from sales_analytics import SalesAnalytics
+    import matplotlib.pyplot as plt
+
+    sales_csv = os.path.abspath(sales_csv)
+    previous = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix='report_', dir=WORK_DIR))
+    try:
+        analytics = recorder.time('report', 'SalesAnalytics()', rows, lambda: SalesAnalytics(sales_csv))
+        if analytics is None:
+            return
+        for name in ('create_revenue_analysis', 'create_performance_metrics',
+                     'create_predictive_insights', 'print_summary_report'):
+            recorder.time('report', name, rows, getattr(analytics, name))
+            plt.close('all')
+        # Raw Data continues on further sheets past Excel's row limit, so every size is timed
+        recorder.time('report', 'generate_excel_report', rows, analytics.generate_excel_report)
+    finally:
+        os.chdir(previous)
+
+
+def environment():
+    import flask
+    import plotly
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'flask': flask.__version__ if hasattr(flask, '__version__') else None,
+        'plotly': plotly.__version__
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10k,100k',
+                        help="comma separated row counts, e.g. 10k,100k,1m,10m")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"comma separated subset of: {', '.join(STAGES)}")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'sales-bench-data'),
+                        help="where synthetic exports are generated and reused")
+    parser.add_argument('--output', help="write the JSON results here instead of stdout")
+    parser.add_argument('--quiet', action='store_true', help="no progress lines on stderr")
+    args = parser.parse_args()
+
+    stages = {stage.strip() for stage in args.stages.split(',') if stage.strip()}
+    unknown = stages - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    # The apps build their default dashboard from the project's sample export on import
+    os.chdir(ROOT)
+    recorder = Recorder(verbose=not args.quiet)
+    try:
+        for rows in [parse_size(size) for size in args.sizes.split(',')]:
+            start = time.perf_counter()
+            sales_csv, warehouse_csv = ensure_exports(args.data_dir, rows)
+            if not args.quiet:
+                print(f"{rows:,} rows (exports ready in {time.perf_counter() - start:.1f}s)", file=sys.stderr)
+            bench_size(recorder, stages, rows, sales_csv, warehouse_csv)
+    finally:
+        # Caches and shared tables for 10M rows run to gigabytes
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    report = {'environment': environment(), 'results': recorder.results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(recorder.results)} results to {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
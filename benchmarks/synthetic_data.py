@@ -0,0 +1,172 @@
+"""Synthesize sales and warehouse exports in the exact formats the dashboards read.
+
+Sales rows use the listings report layout: every field quoted, money as
+"$4519.03" / "$-24.00" and margins as "6.33%". Warehouse rows use the
+Inventory Planning Settings column names. Generation is chunked so 10M-row
+files can be written without holding them in memory.
+
+    python benchmarks/synthetic_data.py --rows 1000000 --output-dir /tmp/synthetic
+"""
+import argparse
+import csv
+import os
+import numpy as np
+import pandas as pd
+
+SALES_COLUMNS = ['System ID', 'UPC', 'EAN', 'Custom SKU', 'Manufact. SKU', 'Description',
+                 'Stock', 'Sold', 'Subtotal', 'Discounts', 'Subtotal w/ Discounts',
+                 'Total', 'Cost', 'Profit', 'Margin']
+
+WAREHOUSE_COLUMNS = ['Inventory ID', 'Description', 'Class ID', 'Warehouse ID', 'Qty. On Hand',
+                     'Qty. Available', 'Reorder Point', 'Max Qty.', 'Vendor', 'Vendor Name',
+                     'Vendor Lead Time (Days)', 'Total Lead Time', 'Item Status']
+
+# Description vocabulary; the nouns cover every categorization rule plus 'Other'
+BRANDS = ['SI', 'POCKET EXOTICS', 'WICKED', 'RHINO', 'BASIX', 'COLT', 'SHOTS', 'DOC JOHNSON',
+          'PIPEDREAM', 'CALEXOTICS', 'LELO', 'SATISFYER', 'FANTASY', 'EXTREME']
+PRODUCTS = ['VIBRATOR', 'THRUSTING RABBIT', 'VIBRATING BULLET', 'MASSAGE WAND', 'MALE SUPPLEMENT',
+            'MOOD ENHANCER', 'WATER BASED LUBE', 'SILICONE LUBRICANT', 'WARMING GEL', 'MASSAGE OIL',
+            'LACE DRESS', 'LINGERIE SET', 'BRA', 'PANTY', 'FISHNET STOCKING', 'PLATFORM HEELS',
+            'DILDO', 'ANAL PLUG', 'COCK RING', 'STRAP ON HARNESS', 'BED RESTRAINT', 'TOY CLEANER',
+            'USB CHARGER', 'BATTERY PACK', 'STROKER', 'PUMP', 'SLEEVE', 'BLINDFOLD', 'GIFT CARD']
+COLORS = ['BLACK', 'RED', 'PINK', 'PURPLE', 'BLUE', 'TEAL', 'GOLD', 'CLEAR', 'S/M', 'L/XL']
+CLASSES = ['ADULT TOYS', 'VIBRATORS', 'SUPPLEMENTS', 'LUBE', 'CLOTHING', 'SHOES', 'CLEANERS',
+           'NOVELTY', 'DVD']
+WAREHOUSES = ['MAIN', 'STORE01', 'STORE02', 'STORE03', 'STORE04', 'STORE05', 'ONLINE', 'RETURNS']
+VENDORS = [f'V{i:04d}' for i in range(60)]
+STATUSES = ['Active', 'Active', 'Active', 'Inactive', 'No Purchases']
+
+CHUNK_ROWS = 1_000_000
+
+
+def _pick(rng, labels, size):
+    """Draw labels by index as a pandas string Series"""
+    return pd.Series(labels).take(rng.integers(0, len(labels), size)).reset_index(drop=True)
+
+
+def _fixed2(values):
+    """Format floats with two decimals using vectorized string ops"""
+    cents = np.round(values * 100).astype(np.int64)
+    sign = pd.Series(np.where(cents < 0, '-', ''))
+    cents = np.abs(cents)
+    whole = pd.Series(cents // 100).astype(str)
+    fraction = pd.Series(cents % 100).astype(str).str.zfill(2)
+    return sign + whole + '.' + fraction
+
+
+def _money(values):
+    return '$' + _fixed2(values)
+
+
+def _percent(values):
+    return _fixed2(values) + '%'
+
+
+def sales_chunk(start, rows, rng):
+    """One chunk of listings-report rows, already formatted as strings"""
+    ids = np.arange(start, start + rows)
+    sold = np.maximum(1, rng.lognormal(1.0, 1.1, rows).astype(np.int64))
+    stock = np.where(rng.random(rows) < 0.9, 0, rng.integers(1, 25, rows))
+    price = np.round(rng.lognormal(3.0, 0.9, rows), 2)
+
+    subtotal = price * sold
+    discounts = np.where(rng.random(rows) < 0.2, subtotal * rng.uniform(0, 0.15, rows), 0.0)
+    discounted = subtotal - discounts
+    total = discounted * 1.0725  # sales tax
+    cost = discounted * rng.uniform(0.2, 1.2, rows)
+    profit = discounted - cost
+    margin = np.divide(profit, discounted, out=np.zeros(rows), where=discounted != 0) * 100
+
+    sku = 'SI-' + pd.Series(ids).astype(str).str.zfill(7)
+    description = (_pick(rng, BRANDS, rows) + ' ' + _pick(rng, PRODUCTS, rows) + ' ' +
+                   pd.Series(ids % 997).astype(str) + ' - ' + _pick(rng, COLORS, rows))
+    upc = pd.Series(800000000000 + ids).astype(str)
+    upc[rng.random(rows) < 0.05] = ''
+
+    return pd.DataFrame({
+        'System ID': pd.Series(210000000000 + ids).astype(str),
+        'UPC': upc,
+        'EAN': '',
+        'Custom SKU': sku,
+        'Manufact. SKU': 'M' + pd.Series(ids).astype(str),
+        'Description': description,
+        'Stock': pd.Series(stock).astype(str),
+        'Sold': pd.Series(sold).astype(str),
+        'Subtotal': _money(subtotal),
+        'Discounts': _money(discounts),
+        'Subtotal w/ Discounts': _money(discounted),
+        'Total': _money(total),
+        'Cost': _money(cost),
+        'Profit': _money(profit),
+        'Margin': _percent(margin)
+    }, columns=SALES_COLUMNS)
+
+
+def warehouse_chunk(start, rows, rng):
+    """One chunk of inventory planning rows keyed on the sales Custom SKU"""
+    ids = np.arange(start, start + rows)
+    on_hand = np.where(rng.random(rows) < 0.3, 0, rng.integers(0, 2500, rows))
+    reorder = rng.integers(0, 200, rows)
+    max_qty = reorder + rng.integers(10, 1500, rows)
+    lead_time = rng.integers(3, 45, rows)
+    vendor = rng.integers(0, len(VENDORS), rows)
+    vendors = pd.Series(VENDORS)
+
+    def with_commas(values):
+        # Planning exports format thousands with commas
+        return pd.Series(values).map('{:,}'.format)
+
+    return pd.DataFrame({
+        'Inventory ID': 'SI-' + pd.Series(ids).astype(str).str.zfill(7),
+        'Description': (_pick(rng, BRANDS, rows) + ' ' + _pick(rng, PRODUCTS, rows) + ' ' +
+                        pd.Series(ids % 997).astype(str) + ' - ' + _pick(rng, COLORS, rows)),
+        'Class ID': _pick(rng, CLASSES, rows),
+        'Warehouse ID': _pick(rng, WAREHOUSES, rows),
+        'Qty. On Hand': with_commas(on_hand),
+        'Qty. Available': with_commas(np.maximum(0, on_hand - rng.integers(0, 20, rows))),
+        'Reorder Point': pd.Series(reorder).astype(str),
+        'Max Qty.': with_commas(max_qty),
+        'Vendor': vendors.take(vendor).reset_index(drop=True),
+        'Vendor Name': ('Vendor ' + vendors.take(vendor)).reset_index(drop=True),
+        'Vendor Lead Time (Days)': pd.Series(lead_time).astype(str),
+        'Total Lead Time': pd.Series(lead_time + rng.integers(0, 7, rows)).astype(str),
+        'Item Status': _pick(rng, STATUSES, rows)
+    }, columns=WAREHOUSE_COLUMNS)
+
+
+def _write_chunks(path, rows, make_chunk, seed):
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', newline='') as f:
+        for start in range(0, rows, CHUNK_ROWS):
+            chunk = make_chunk(start, min(CHUNK_ROWS, rows - start), rng)
+            chunk.to_csv(f, index=False, header=start == 0, quoting=csv.QUOTE_ALL)
+    return path
+
+
+def write_sales_export(path, rows, seed=0):
+    """Write a synthetic reports_sales_listings_item.csv with `rows` products"""
+    return _write_chunks(path, rows, sales_chunk, seed)
+
+
+def write_warehouse_export(path, rows, seed=1):
+    """Write a synthetic inventory planning export with `rows` inventory lines"""
+    return _write_chunks(path, rows, warehouse_chunk, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    sales = write_sales_export(os.path.join(args.output_dir, 'reports_sales_listings_item.csv'),
+                               args.rows, args.seed)
+    warehouse = write_warehouse_export(os.path.join(args.output_dir, 'inventory_planning.csv'),
+                                       args.rows, args.seed + 1)
+    print(f"Wrote {sales} and {warehouse} ({args.rows:,} rows each)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import re
+import numpy as np
+import pandas as pd
+
+# Keyword rules in priority order: the first category with a keyword that
+# appears anywhere in the lower-cased description wins
+CATEGORY_RULES = [
+    ('Vibrators', ['vibrator', 'rabbit', 'bullet', 'wand']),
+    ('Supplements', ['supplement', 'rhino', 'mood', 'male', 'female']),
+    ('Lubricants', ['lube', 'lubricant', 'gel', 'oil']),
+    ('Clothing & Accessories', ['dress', 'lingerie', 'bra', 'panty', 'stocking', 'heels', 'shoes']),
+    ('Adult Toys', ['dildo', 'plug', 'ring', 'harness', 'restraint']),
+    ('Accessories', ['cleaner', 'clean', 'charger', 'battery']),
+]
+
+DEFAULT_CATEGORY = 'Other'
+
+
+def rules_fingerprint(rules=CATEGORY_RULES, default=DEFAULT_CATEGORY):
+    """Short hash of a rule table, so caches of categorized rows notice rule edits"""
+    text = json.dumps([default, [[name, list(words)] for name, words in rules]])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+# Upper bound on remembered descriptions before the memo is reset
+MAX_MEMO_SIZE = 2_000_000
+
+
+class CategoryEngine:
+    """Vectorized keyword categorizer with a memo of seen descriptions"""
+
+    def __init__(self, rules=CATEGORY_RULES, default=DEFAULT_CATEGORY):
+        self.names = np.array([name for name, _ in rules] + [default], dtype=object)
+        # One precompiled alternation per category
+        self.patterns = [
+            re.compile('|'.join(re.escape(word) for word in words))
+            for _, words in rules
+        ]
+        # Memo of normalized description -> index into self.names, kept as a
+        # hashed Index so lookups stay vectorized
+        self.memo_keys = pd.Index([], dtype=str)
+        self.memo_codes = np.empty(0, dtype=np.int8)
+
+    def normalize(self, descriptions):
+        """Lower-case descriptions the same way str(desc).lower() would"""
+        descriptions = pd.Series(descriptions)
+        if descriptions.dtype == object or not pd.api.types.is_string_dtype(descriptions.dtype):
+            descriptions = descriptions.astype(object).where(descriptions.notna(), 'nan').astype(str)
+        return descriptions.fillna('nan').str.lower()
+
+    def classify(self, normalized):
+        """Return rule indices for already-normalized descriptions, bypassing the memo"""
+        normalized = pd.Series(normalized)
+        conditions = [
+            normalized.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+            for pattern in self.patterns
+        ]
+        # np.select takes the first matching condition, preserving rule order
+        choices = np.arange(len(self.patterns), dtype=np.int8)
+        return np.select(conditions, choices, default=len(self.patterns)).astype(np.int8)
+
+    def categorize(self, descriptions):
+        """Return the category of every description as an object array"""
+        codes, uniques = pd.factorize(self.normalize(descriptions))
+
+        unique_codes = np.full(len(uniques), -1, dtype=np.int8)
+        positions = self.memo_keys.get_indexer(uniques)
+        known = positions >= 0
+        unique_codes[known] = self.memo_codes[positions[known]]
+
+        unseen = unique_codes < 0
+        if unseen.any():
+            new_keys = uniques[unseen]
+            new_codes = self.classify(new_keys)
+            unique_codes[unseen] = new_codes
+
+            if len(self.memo_keys) + len(new_keys) > MAX_MEMO_SIZE:
+                self.memo_keys = pd.Index([], dtype=uniques.dtype)
+                self.memo_codes = np.empty(0, dtype=np.int8)
+            self.memo_keys = self.memo_keys.append(new_keys)
+            self.memo_codes = np.concatenate([self.memo_codes, new_codes])
+
+        return self.names[unique_codes[codes]]
+
+
+_engine = CategoryEngine()
+
+
+def categorize_descriptions(descriptions):
+    """Categorize product descriptions with the shared engine"""
+    return _engine.categorize(descriptions)
@@ -0,0 +1,200 @@
+import gzip
+import hashlib
+import threading
+import plotly.io as pio
+import plotly.utils
+from flask import Response, request
+from request_timing import mark_cache
+
+# orjson writes the figures' numpy arrays natively; without it use the stdlib encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Brotli is offered to clients that accept it when the module is installed; gzip otherwise
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FIGURE_JSON_ENGINE = 'orjson' if orjson is not None else 'json'
+
+# Bodies smaller than this are sent uncompressed; the savings would not cover the overhead
+COMPRESS_MIN_BYTES = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 6
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+_PLOTLY_ENCODER = plotly.utils.PlotlyJSONEncoder()
+
+
+def _plotly_default(value):
+    """Let Plotly's encoder handle whatever orjson cannot (object arrays, dates, NA)"""
+    return _PLOTLY_ENCODER.default(value)
+
+
+def encode_figure(fig):
+    """Serialize a Plotly figure to JSON bytes in one pass.
+
+    The figure dict is handed straight to orjson rather than going through
+    plotly.io.to_json, whose orjson path first cleans every array element
+    in Python.
+    """
+    if orjson is not None:
+        return orjson.dumps(fig.to_plotly_json(), default=_plotly_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return pio.to_json(fig, validate=False, engine='json').encode('utf-8')
+
+
+def compress(body, encoding):
+    """Compress a body for a Content-Encoding; gzip output is byte-for-byte reproducible"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def negotiate_encoding(size):
+    """The preferred encoding the client accepts for a body of this size, or None"""
+    if size < COMPRESS_MIN_BYTES:
+        return None
+    for encoding in ENCODINGS:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def held_etag(etag):
+    """The variant of an ETag the client already holds, if any"""
+    if not request.if_none_match:
+        return None
+    if request.if_none_match.star_tag:
+        return etag
+    for candidate in (etag,) + tuple(f"{etag}-{encoding}" for encoding in ENCODINGS):
+        if request.if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def not_modified(etag, last_modified=None):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def json_response(body, etag, last_modified=None, encoded=None):
+    """JSON response with negotiated compression, validators and 304 handling.
+
+    ``encoded(encoding)`` may supply already-compressed bytes; otherwise the
+    body is compressed for this request. Each encoding gets its own strong
+    ETag, ``<etag>-<encoding>``.
+    """
+    held = held_etag(etag)
+    if held is not None:
+        return not_modified(held, last_modified)
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    encoding = negotiate_encoding(len(body))
+    payload = body
+    if encoding is not None:
+        payload = encoded(encoding) if encoded is not None else compress(body, encoding)
+        etag = f"{etag}-{encoding}"
+
+    response = Response(payload, mimetype='application/json')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Let browsers keep the payload but revalidate it on every load
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+class ChartCache:
+    """Encoded payloads, rendered once per dataset and served compressed with strong ETags.
+
+    A cache belongs to one loaded dataset: the dashboards create a fresh one
+    whenever their data is (re)loaded, so cached bytes never outlive the
+    frame they were rendered from. ETags are the hash of the encoded body,
+    so they change with the rendering code and settings as well as the data,
+    and a revalidation of a cached payload is answered with 304 without
+    rendering anything. Compressed bytes are kept per encoding.
+
+    ``last_modified`` is the dataset's own timestamp (the newest source
+    export), so every worker serving the same data sends the same value.
+    """
+
+    def __init__(self, last_modified=None):
+        self.last_modified = last_modified
+        self._payloads = {}
+        self._encoded = {}
+        # Re-entrant so a render (e.g. a batched payload) can read other entries
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def etag(body):
+        return hashlib.sha1(body).hexdigest()
+
+    def get(self, name, render):
+        """Return (body, etag) for a chart, rendering it on first use"""
+        payload = self._payloads.get(name)
+        hit = payload is not None
+        if payload is None:
+            with self._lock:
+                payload = self._payloads.get(name)
+                hit = payload is not None
+                if payload is None:
+                    body = render()
+                    if isinstance(body, str):
+                        body = body.encode('utf-8')
+                    payload = (body, self.etag(body))
+                    self._payloads[name] = payload
+        # Set after rendering so a batched payload reports its own lookup, not its parts'
+        mark_cache(hit)
+        return payload
+
+    def encoded(self, name, body, encoding):
+        """Compressed bytes of a cached payload, compressed on first use"""
+        key = (name, encoding)
+        payload = self._encoded.get(key)
+        if payload is None:
+            with self._lock:
+                payload = self._encoded.get(key)
+                if payload is None:
+                    payload = compress(body, encoding)
+                    self._encoded[key] = payload
+        return payload
+
+    def warm(self, renderers, encodings=()):
+        """Eagerly render a {name: render} mapping, and compress it for each of `encodings`"""
+        for name, render in renderers.items():
+            body, _ = self.get(name, render)
+            if len(body) >= COMPRESS_MIN_BYTES:
+                for encoding in encodings:
+                    self.encoded(name, body, encoding)
+
+    def response(self, name, render, store=True):
+        """Build a JSON response for a payload, answering 304 when the ETag matches.
+
+        ``store=False`` is for payloads too varied to keep (e.g. ad-hoc
+        queries): they still get validators and compression, per request.
+        """
+        if not store:
+            body = render()
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            mark_cache(False)
+            return json_response(body, self.etag(body), self.last_modified)
+
+        body, etag = self.get(name, render)
+        return json_response(body, etag, self.last_modified,
+                             encoded=lambda encoding: self.encoded(name, body, encoding))
@@ -0,0 +1,116 @@
+from openpyxl import Workbook
+from sales_aggregates import SalesAggregates, STREAM_CHUNK_ROWS
+
+# Excel's hard limit per worksheet, header row included
+EXCEL_MAX_ROWS = 1_048_576
+
+# What to do with the Raw Data sheet: continue on new sheets past the row
+# limit, stop at the limit, or leave it out
+RAW_DATA_MODES = ('split', 'truncate', 'skip')
+
+SUMMARY_METRICS = [
+    ('Total Revenue', 'total_revenue'),
+    ('Total Units Sold', 'total_units_sold'),
+    ('Total Products', 'total_products'),
+    ('Average Profit Margin', 'avg_profit_margin'),
+    ('Negative Margin Products', 'negative_margin_products'),
+    ('High Margin Products', 'high_margin_products')
+]
+
+CATEGORY_COLUMNS = ['Total_sum', 'Total_count', 'Margin_mean', 'Sold_sum', 'Cost_sum', 'Profit_sum']
+
+TOP_PRODUCT_SHEET_COLUMNS = ['Description', 'Category', 'Sold', 'Total', 'Margin', 'Profit']
+
+
+def iter_frame_chunks(df, chunksize=STREAM_CHUNK_ROWS):
+    """Yield consecutive row slices of an already-loaded frame"""
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def _cell_rows(frame):
+    """Rows of a frame as tuples of plain values, with missing values as empty cells"""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).itertuples(index=False, name=None)
+
+
+def _write_frame(sheet, frame, index_label=None):
+    if index_label is not None:
+        frame = frame.reset_index().rename(columns={'index': index_label})
+    sheet.append(list(frame.columns))
+    for row in _cell_rows(frame):
+        sheet.append(row)
+
+
+class _RawDataSheets:
+    """Appends rows to 'Raw Data', starting 'Raw Data 2', 3, ... at Excel's row limit"""
+
+    def __init__(self, workbook, mode):
+        self.workbook = workbook
+        self.mode = mode
+        self.sheet = None
+        self.sheet_rows = 0
+        self.sheets = 0
+        self.header = None
+        self.dropped = 0
+
+    def _new_sheet(self):
+        self.sheets += 1
+        title = 'Raw Data' if self.sheets == 1 else f'Raw Data {self.sheets}'
+        self.sheet = self.workbook.create_sheet(title)
+        self.sheet.append(self.header)
+        self.sheet_rows = 1
+
+    def append(self, chunk):
+        if self.mode == 'skip':
+            return
+        if self.header is None:
+            self.header = list(chunk.columns)
+        for row in _cell_rows(chunk):
+            if self.sheet is None or self.sheet_rows >= EXCEL_MAX_ROWS:
+                if self.sheet is not None and self.mode == 'truncate':
+                    self.dropped += 1
+                    continue
+                self._new_sheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+
+def write_excel_report(filename, chunks, raw_data='split', top_n=20):
+    """Write the analytics workbook from cleaned, categorized chunks in one pass.
+
+    The workbook is opened in openpyxl's write-only mode, so rows go straight
+    to disk and memory stays flat however many rows the Raw Data sheets get.
+    Each chunk is folded into one SalesAggregates, which then fills the
+    Summary, Category Analysis, Top Products and Negative Margin sheets, and
+    is returned.
+    """
+    if raw_data not in RAW_DATA_MODES:
+        raise ValueError(f"Unknown raw data mode: {raw_data}")
+
+    workbook = Workbook(write_only=True)
+    # Created first so they lead the workbook, but filled once the pass is done
+    summary_sheet = workbook.create_sheet('Summary')
+    category_sheet = workbook.create_sheet('Category Analysis')
+    top_sheet = workbook.create_sheet('Top Products')
+    negative_sheet = workbook.create_sheet('Negative Margin Products')
+
+    aggregates = SalesAggregates(top_n)
+    raw = _RawDataSheets(workbook, raw_data)
+    for chunk in chunks:
+        aggregates.update(chunk)
+        raw.append(chunk)
+
+    insights = aggregates.insights()
+    summary_sheet.append(['Metric', 'Value'])
+    for label, key in SUMMARY_METRICS:
+        summary_sheet.append([label, insights[key]])
+
+    _write_frame(category_sheet, aggregates.category_summary()[CATEGORY_COLUMNS], index_label='Category')
+    _write_frame(top_sheet, aggregates.top_products()[TOP_PRODUCT_SHEET_COLUMNS])
+    _write_frame(negative_sheet, aggregates.negative_margin_products())
+
+    workbook.save(filename)
+    if raw.dropped:
+        print(f"⚠️  Raw Data stopped at Excel's row limit; {raw.dropped:,} rows were not written")
+    return aggregates
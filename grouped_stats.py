@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+MOMENT_COLUMNS = ['n', 'sum_x', 'sum_y', 'sum_xy', 'sum_xx', 'sum_yy']
+
+
+class GroupedMoments:
+    """Per-group count, Σx, Σy, Σxy, Σx² and Σy² of two numeric columns.
+
+    Built in one vectorized pass (np.bincount per moment) for any grouping
+    key, so correlation and regression slope for every group come from a
+    handful of array operations instead of a Python call per group. Two
+    results with the same columns can be merged by adding their moments.
+    """
+
+    def __init__(self, moments, skipped=None):
+        self.moments = moments
+        # Rows left out of each group because x or y was undefined
+        self.skipped = skipped if skipped is not None else pd.Series(0, index=moments.index)
+
+    @classmethod
+    def from_arrays(cls, keys, x, y):
+        keys = pd.Series(keys).reset_index(drop=True)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        codes, groups = pd.factorize(keys, sort=True)
+        has_key = codes >= 0
+        valid = has_key & np.isfinite(x) & np.isfinite(y)
+
+        size = len(groups)
+        c, xv, yv = codes[valid], x[valid], y[valid]
+        moments = pd.DataFrame({
+            'n': np.bincount(c, minlength=size).astype(float),
+            'sum_x': np.bincount(c, xv, size),
+            'sum_y': np.bincount(c, yv, size),
+            'sum_xy': np.bincount(c, xv * yv, size),
+            'sum_xx': np.bincount(c, xv * xv, size),
+            'sum_yy': np.bincount(c, yv * yv, size)
+        }, index=groups)
+        skipped = pd.Series(np.bincount(codes[has_key & ~valid], minlength=size), index=groups)
+        return cls(moments, skipped)
+
+    @classmethod
+    def from_frame(cls, df, x, y, by):
+        """Moments of df[x] and df[y] grouped by a column name or an aligned array of keys"""
+        keys = df[by] if isinstance(by, str) else by
+        return cls.from_arrays(keys, df[x], df[y])
+
+    def merge(self, other):
+        """Add another partial result's moments (groups missing on one side count as empty)"""
+        self.moments = self.moments.add(other.moments, fill_value=0)
+        self.skipped = self.skipped.add(other.skipped, fill_value=0).astype(int)
+        return self
+
+    def _centered(self):
+        m = self.moments
+        n = m['n'].where(m['n'] > 0)
+        sxx = m['sum_xx'] - m['sum_x'] ** 2 / n
+        syy = m['sum_yy'] - m['sum_y'] ** 2 / n
+        sxy = m['sum_xy'] - m['sum_x'] * m['sum_y'] / n
+        # Rounding can leave a tiny negative variance for constant columns
+        return sxx.clip(lower=0), syy.clip(lower=0), sxy
+
+    def correlation(self):
+        """Pearson correlation per group; NaN with fewer than two rows or a constant column"""
+        sxx, syy, sxy = self._centered()
+        denominator = np.sqrt(sxx * syy)
+        corr = sxy / denominator.where(denominator > 0)
+        corr[self.moments['n'] < 2] = np.nan
+        return corr.clip(-1, 1)
+
+    def slope(self):
+        """Least-squares slope of y on x per group; NaN where x does not vary"""
+        sxx, _, sxy = self._centered()
+        slope = sxy / sxx.where(sxx > 0)
+        slope[self.moments['n'] < 2] = np.nan
+        return slope
+
+    def summary(self):
+        """Rows used, rows skipped, correlation and slope per group"""
+        return pd.DataFrame({
+            'rows': self.moments['n'].astype(int),
+            'skipped': self.skipped.astype(int),
+            'correlation': self.correlation(),
+            'slope': self.slope()
+        })
+
+
+def price_elasticity(df, by='Category'):
+    """Correlation between unit price (Total / Sold) and units sold, per group.
+
+    Products with nothing sold have no unit price and are skipped explicitly
+    (counted in GroupedMoments.skipped) rather than producing inf. Groups with
+    fewer than two priced products, or no variation, get 0.
+    """
+    sold = df['Sold'].to_numpy(dtype=float)
+    total = df['Total'].to_numpy(dtype=float)
+    price = np.full(len(sold), np.nan)
+    np.divide(total, sold, out=price, where=sold != 0)
+    moments = GroupedMoments.from_arrays(df[by] if isinstance(by, str) else by, price, sold)
+    return moments.correlation().fillna(0)
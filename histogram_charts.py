@@ -0,0 +1,72 @@
+import os
+import numpy as np
+import plotly.graph_objects as go
+
+# How the margin histograms bin by default: 'fixed' width or 'quantile' (equal-count) bins
+HISTOGRAM_BINNING = os.environ.get('HISTOGRAM_BINNING', 'fixed')
+
+BINNING_METHODS = ('fixed', 'quantile')
+
+
+def bin_values(values, bins=30, method='fixed'):
+    """Bin edges, per-bin counts and the mean of the non-missing values.
+
+    'fixed' splits the observed range into equal-width bins; 'quantile' puts
+    the edges at evenly spaced quantiles, so each bin holds about the same
+    number of values (ties can merge edges, giving fewer bins).
+    """
+    if method not in BINNING_METHODS:
+        raise ValueError(f"Unknown binning method: {method}")
+
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.array([]), np.array([], dtype=np.int64), float('nan')
+
+    if method == 'quantile':
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)))
+        if len(edges) < 2:
+            edges = np.array([edges[0] - 0.5, edges[0] + 0.5])
+        counts, edges = np.histogram(values, bins=edges)
+    else:
+        counts, edges = np.histogram(values, bins=bins)
+    return edges, counts, float(values.mean())
+
+
+def histogram_figure(values, title, x_label, bins=30, method=None, color=None,
+                     y_label='Number of Products', unit='%'):
+    """A histogram built from server-side bins: one bar per bin plus a mean line.
+
+    Only the edges and counts are serialized, so the payload depends on the
+    number of bins rather than the number of rows. Quantile bins have
+    different widths, so their bars show values per unit of x instead of raw
+    counts to keep the shape of the distribution honest.
+    """
+    method = method or HISTOGRAM_BINNING
+    edges, counts, mean = bin_values(values, bins, method)
+    widths = np.diff(edges)
+    if method == 'quantile':
+        heights = counts / widths
+        y_label = f"{y_label} per 1{unit}"
+    else:
+        heights = counts
+
+    fig = go.Figure(go.Bar(
+        x=edges[:-1] + widths / 2,
+        y=heights,
+        width=widths,
+        customdata=np.column_stack([edges[:-1], edges[1:], counts]) if len(counts) else None,
+        marker=dict(color=color, line=dict(width=0)),
+        hovertemplate=f"%{{customdata[0]:.1f}}{unit} to %{{customdata[1]:.1f}}{unit}<br>"
+                      "Products: %{customdata[2]:,}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        bargap=0
+    )
+    if not np.isnan(mean):
+        fig.add_vline(x=mean, line_dash="dash", line_color="red",
+                      annotation_text=f"Mean: {mean:.1f}{unit}")
+    return fig
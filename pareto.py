@@ -0,0 +1,95 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# Revenue shares (%) whose exact product counts are reported as breakpoints
+PARETO_LEVELS = (50, 80, 95)
+
+# Largest gap (in percentage points of products and of revenue) between the
+# downsampled curve and the full one; bounds the curve to a few hundred points
+PARETO_TOLERANCE = 0.5
+
+
+class ParetoCurve:
+    """Revenue concentration curve of a catalog, computed once per dataset.
+
+    Products are ranked by revenue (missing revenue counts as zero) and the
+    cumulative revenue is kept only at knot ranks: every rank where either
+    the product share or the revenue share crosses into a new
+    ``tolerance``-sized bucket, plus the rank just before it and the exact
+    breakpoint ranks. Between two knots the full curve is either a single
+    step (drawn exactly) or stays inside one bucket on both axes, so the
+    straight line between knots is never more than ``tolerance`` percentage
+    points from the full curve, whatever the number of products.
+    """
+
+    def __init__(self, revenue, levels=PARETO_LEVELS, tolerance=PARETO_TOLERANCE):
+        revenue = np.nan_to_num(np.asarray(revenue, dtype=float))
+        self.products = len(revenue)
+        self.tolerance = tolerance
+        cumulative = np.cumsum(-np.sort(-revenue))
+        self.total_revenue = float(cumulative[-1]) if self.products else 0.0
+
+        # Exact breakpoints: the fewest top products reaching each share of revenue
+        self.breakpoints = {}
+        for level in levels:
+            target = self.total_revenue * level / 100
+            rank = int(np.searchsorted(cumulative, target, 'left')) + 1 if self.total_revenue > 0 else 0
+            rank = min(rank, self.products)
+            self.breakpoints[level] = {
+                'products': rank,
+                'product_share': rank / self.products * 100 if self.products else 0.0
+            }
+
+        ranks = np.arange(1, self.products + 1)
+        scale = max(float(np.abs(cumulative).max()), 1e-9) if self.products else 1.0
+        x_bucket = np.floor(ranks / max(self.products, 1) * 100 / tolerance)
+        y_bucket = np.floor(cumulative / scale * 100 / tolerance)
+        changed = np.flatnonzero((np.diff(x_bucket) != 0) | (np.diff(y_bucket) != 0)) + 1
+        knots = np.concatenate([
+            [0, self.products - 1], changed, changed - 1,
+            [point['products'] - 1 for point in self.breakpoints.values()]
+        ])
+        knots = np.unique(knots[(knots >= 0) & (knots < self.products)]).astype(np.int64)
+
+        self.ranks = ranks[knots]
+        self.product_share = self.ranks / max(self.products, 1) * 100
+        self.cumulative_revenue = cumulative[knots]
+
+    def insights(self):
+        """Breakpoints as flat keys for the dashboards' insights"""
+        insights = {}
+        for level, point in self.breakpoints.items():
+            insights[f'products_for_{level}pct_revenue'] = point['products']
+            insights[f'product_share_for_{level}pct_revenue'] = round(point['product_share'], 2)
+        return insights
+
+    def figure(self, title="Revenue Concentration (Pareto Analysis)"):
+        """Plotly figure of the downsampled curve with the breakpoints marked"""
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=self.product_share,
+            y=self.cumulative_revenue,
+            mode='lines',
+            name='Cumulative Revenue',
+            customdata=self.ranks,
+            hovertemplate="Top %{customdata:,} products (%{x:.1f}%)<br>$%{y:,.0f}<extra></extra>"
+        ))
+        fig.add_trace(go.Scatter(
+            x=[point['product_share'] for point in self.breakpoints.values()],
+            y=[self.total_revenue * level / 100 for level in self.breakpoints],
+            mode='markers+text',
+            name='Breakpoints',
+            text=[f"{level}%: {point['products']:,} products" for level, point in self.breakpoints.items()],
+            textposition='bottom right',
+            marker=dict(color='red', size=8)
+        ))
+        if 80 in self.breakpoints:
+            fig.add_hline(y=self.total_revenue * 0.8, line_dash="dash", line_color="red",
+                          annotation_text="80% of Revenue")
+
+        fig.update_layout(
+            title=title,
+            xaxis_title="Percentage of Products (%)",
+            yaxis_title="Cumulative Revenue ($)"
+        )
+        return fig
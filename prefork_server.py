@@ -0,0 +1,287 @@
+"""Pre-fork production server: load the data once, fork workers that share it.
+
+Run from the project root:
+    python prefork_server.py simple_app --workers 4 --threads 8 --port 8080
+
+The master imports the app module (which loads and precomputes everything),
+lets the module warm its caches through ``prefork_prepare()``, freezes the
+garbage collector and forks the workers. Each worker serves requests from a
+bounded thread pool on the shared listening socket, so the loaded frames,
+indexes and rendered payloads are inherited copy-on-write instead of being
+built N times.
+
+Signals to the master:
+    HUP           graceful reload: rebuild the data, start a new generation of
+                  workers, and retire the old one once it finishes its requests
+    TERM / INT    graceful shutdown
+"""
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer
+
+# Seconds retired workers get to finish in-flight requests before being killed
+GRACEFUL_TIMEOUT = float(os.environ.get('WEB_GRACEFUL_TIMEOUT', '30'))
+
+# How often the master asks the app whether its data changed (0 disables polling)
+CHECK_INTERVAL = float(os.environ.get('DASHBOARD_RELOAD_INTERVAL', '5'))
+
+# Seconds a connection may sit idle mid-request; bounds how long an idle
+# (e.g. preconnected) socket can hold a retiring worker open
+READ_TIMEOUT = float(os.environ.get('WEB_READ_TIMEOUT', '10'))
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug's WSGI server with requests handled on a fixed-size thread pool"""
+
+    def __init__(self, host, port, app, threads, fd=None, read_timeout=READ_TIMEOUT):
+        super().__init__(host, port, app, fd=fd)
+        self.read_timeout = read_timeout
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='request')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            request.settimeout(self.read_timeout)
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def worker_log(message):
+    """Print from a worker in one write, so lines from concurrent workers never interleave"""
+    sys.stdout.write(f"{message}\n")
+    sys.stdout.flush()
+
+
+def freeze_heap():
+    """Move everything loaded so far out of the collector's reach.
+
+    Forked workers would otherwise have the cyclic GC walk (and so write to)
+    every inherited object, copying pages that hold nothing but data.
+    """
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
+
+class PreforkServer:
+    """Master process: owns the socket, forks worker generations and supervises them.
+
+    ``prepare()`` runs in the master before each generation is forked.
+    ``check()`` is polled every ``check_interval`` seconds and ``reload()``
+    runs on SIGHUP; either returning True forks a fresh generation from the
+    master's new data and retires the previous one.
+    """
+
+    def __init__(self, app, host='0.0.0.0', port=8080, workers=None, threads=8,
+                 prepare=None, check=None, reload=None, check_interval=CHECK_INTERVAL,
+                 graceful_timeout=GRACEFUL_TIMEOUT):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.worker_count = workers or os.cpu_count() or 1
+        self.threads = threads
+        self.prepare = prepare
+        self.check = check
+        self.reload = reload
+        self.check_interval = check_interval
+        self.graceful_timeout = graceful_timeout
+        self.socket = None
+        self.master_pid = None
+        self.generation = 0
+        # pid -> generation for running workers, pid -> kill deadline for retiring ones
+        self.workers = {}
+        self.retiring = {}
+        self._stopping = False
+        self._reload_requested = False
+
+    def run(self):
+        self.socket = socket.create_server((self.host, self.port), backlog=2048)
+        self.master_pid = os.getpid()
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_reload)
+        print(f"Master {os.getpid()} listening on {self.host}:{self.port} "
+              f"({self.worker_count} workers x {self.threads} threads)")
+
+        self._start_generation()
+        next_check = time.monotonic() + self.check_interval
+        try:
+            while not self._stopping:
+                time.sleep(0.5)
+                self._reap()
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self._reload(self.reload)
+                elif self.check is not None and self.check_interval > 0 and time.monotonic() >= next_check:
+                    next_check = time.monotonic() + self.check_interval
+                    self._reload(self.check)
+                self._kill_overdue()
+        finally:
+            self._shutdown()
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+
+    def _request_reload(self, signum, frame):
+        self._reload_requested = True
+
+    def _reload(self, rebuild):
+        if rebuild is None:
+            return
+        try:
+            changed = rebuild()
+        except Exception as e:
+            print(f"Reload failed, keeping current workers: {e}")
+            return
+        if changed:
+            print("Data reloaded, starting a new worker generation")
+            self._start_generation()
+
+    def _start_generation(self):
+        if self.prepare is not None:
+            self.prepare()
+        freeze_heap()
+
+        previous = list(self.workers)
+        self.generation += 1
+        for _ in range(self.worker_count):
+            self._spawn()
+        # The new generation is already accepting; the old one drains and exits
+        for pid in previous:
+            self._retire(pid)
+
+    def _spawn(self):
+        # Anything still buffered would otherwise be printed again by the child
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                self._serve()
+            except Exception as e:
+                worker_log(f"Worker {os.getpid()} failed: {e}")
+                status = 1
+            finally:
+                os._exit(status)
+        self.workers[pid] = self.generation
+        return pid
+
+    def _serve(self):
+        """Worker process: serve from the inherited socket until told to stop or orphaned"""
+        stopping = threading.Event()
+        # Replace the master's handlers first, so a TERM arriving this early still stops us
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        server = PooledWSGIServer(self.host, self.port, self.app, self.threads, fd=self.socket.fileno())
+
+        def watch():
+            # A master that died without retiring us (e.g. SIGKILL) reparents us
+            while not stopping.wait(1.0) and os.getppid() == self.master_pid:
+                pass
+            # shutdown() waits for serve_forever, which the main thread is running
+            server.shutdown()
+
+        threading.Thread(target=watch, name='worker-watch', daemon=True).start()
+        worker_log(f"Worker {os.getpid()} (generation {self.generation}) ready")
+        server.serve_forever()
+        # Finish the requests already accepted before exiting
+        server.pool.shutdown(wait=True)
+
+    def _retire(self, pid):
+        self.workers.pop(pid, None)
+        self.retiring[pid] = time.monotonic() + self.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.retiring.pop(pid, None)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.retiring.pop(pid, None)
+            if self.workers.pop(pid, None) is not None and not self._stopping:
+                print(f"Worker {pid} exited unexpectedly (status {status}), replacing it")
+                self._spawn()
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now >= deadline:
+                print(f"Worker {pid} did not finish within {self.graceful_timeout:.0f}s, killing it")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.retiring.pop(pid, None)
+
+    def _shutdown(self):
+        print("Shutting down workers...")
+        for pid in list(self.workers):
+            self._retire(pid)
+        while self.retiring:
+            self._reap()
+            self._kill_overdue()
+            time.sleep(0.1)
+        self.socket.close()
+
+
+def serve_module(module_name, host='0.0.0.0', port=8080, workers=None, threads=8):
+    """Import an app module in the master and serve its ``app`` from forked workers.
+
+    The module may define ``prefork_prepare()``, ``prefork_check()`` and
+    ``prefork_reload()`` to warm caches and rebuild its data in the master.
+    """
+    module = importlib.import_module(module_name)
+    server = PreforkServer(
+        module.app, host=host, port=port, workers=workers, threads=threads,
+        prepare=getattr(module, 'prefork_prepare', None),
+        check=getattr(module, 'prefork_check', None),
+        reload=getattr(module, 'prefork_reload', None)
+    )
+    server.run()
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('module', nargs='?', default='simple_app',
+                        help="module defining the Flask `app` (default: simple_app)")
+    parser.add_argument('--host', default=os.environ.get('WEB_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '8080')))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', '0')) or None,
+                        help="worker processes (default: WEB_WORKERS, else the CPU count)")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', '8')),
+                        help="request threads per worker (default: WEB_THREADS, else 8)")
+    return parser.parse_args()
+
+
+def main():
+    if not hasattr(os, 'fork'):
+        print("❌ Error: the pre-fork server needs os.fork (Linux or macOS)")
+        sys.exit(1)
+    args = parse_args()
+    serve_module(args.module, args.host, args.port, args.workers, args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# Sales identifiers tried in order against the warehouse Product_ID (Inventory ID)
+SALES_KEY_COLUMNS = ['System ID', 'UPC', 'Custom SKU']
+
+WAREHOUSE_KEY_COLUMN = 'Product_ID'
+
+# How many of the best-selling products the warehouse views focus on
+TOP_REVENUE_PRODUCTS = 100
+
+
+def normalize_ids(values):
+    """Identifiers as upper-case strings; numbers lose any '.0', blanks become NaN"""
+    values = pd.Series(values).reset_index(drop=True)
+    if pd.api.types.is_float_dtype(values):
+        # Exports with blank UPCs parse as float; whole numbers are IDs, not measurements
+        whole = values.dropna()
+        if (whole == np.floor(whole)).all():
+            values = values.astype('Int64')
+    present = values.notna()
+    keys = values.astype(str).str.strip().str.upper()
+    return keys.where(present & (keys != ''))
+
+
+def normalize_descriptions(values):
+    """Descriptions with runs of whitespace collapsed, trimmed and upper-cased"""
+    values = pd.Series(values).reset_index(drop=True)
+    present = values.notna()
+    keys = values.astype(str).str.replace(r'\s+', ' ', regex=True).str.strip().str.upper()
+    return keys.where(present & (keys != ''))
+
+
+def _lookup(sales_keys):
+    """Unique-key index over sales rows (first occurrence wins) and its row positions"""
+    valid = (sales_keys.notna() & ~sales_keys.duplicated()).to_numpy()
+    return pd.Index(sales_keys[valid]), np.flatnonzero(valid)
+
+
+class ProductIndex:
+    """Row-position join between the sales and warehouse tables, built once per load.
+
+    Each warehouse row is matched to at most one sales row, by the first
+    stable identifier that agrees (System ID, UPC, then Custom SKU against
+    the warehouse Product_ID) and only then by whitespace-normalized
+    description. Lookups afterwards are plain array indexing, so a product
+    is never dropped or duplicated because its descriptions differ.
+    """
+
+    def __init__(self, sales_df, warehouse_df, top_n=TOP_REVENUE_PRODUCTS):
+        self.sales_df = sales_df
+        self.warehouse_df = warehouse_df
+        self.top_n = top_n
+        # Sales row position for every warehouse row, -1 where nothing matched
+        self.warehouse_to_sales = np.full(len(warehouse_df), -1, dtype=np.int64)
+        self.matched_by = {}
+        self._match()
+
+        # The best-selling sales rows and the warehouse rows that stock them
+        total = sales_df['Total'].reset_index(drop=True)
+        self.top_sales_rows = total.nlargest(top_n).index.to_numpy()
+        is_top = np.zeros(len(sales_df), dtype=bool)
+        is_top[self.top_sales_rows] = True
+        matched = self.warehouse_to_sales >= 0
+        self.top_warehouse_rows = np.flatnonzero(matched & is_top[np.where(matched, self.warehouse_to_sales, 0)])
+
+    def _match(self):
+        if WAREHOUSE_KEY_COLUMN in self.warehouse_df.columns:
+            warehouse_ids = normalize_ids(self.warehouse_df[WAREHOUSE_KEY_COLUMN])
+            for column in SALES_KEY_COLUMNS:
+                if column in self.sales_df.columns:
+                    self._assign(column, normalize_ids(self.sales_df[column]), warehouse_ids)
+
+        if 'Description' in self.sales_df.columns and 'Product_Name' in self.warehouse_df.columns:
+            self._assign('Description',
+                         normalize_descriptions(self.sales_df['Description']),
+                         normalize_descriptions(self.warehouse_df['Product_Name']))
+
+    def _assign(self, name, sales_keys, warehouse_keys):
+        """Match still-unmatched warehouse rows on one key"""
+        unmatched = np.flatnonzero(self.warehouse_to_sales < 0)
+        if len(unmatched) == 0:
+            return
+        lookup, positions = _lookup(sales_keys)
+        hits = lookup.get_indexer(warehouse_keys.to_numpy()[unmatched])
+        found = hits >= 0
+        self.warehouse_to_sales[unmatched[found]] = positions[hits[found]]
+        self.matched_by[name] = int(found.sum())
+
+    @property
+    def matched(self):
+        return int((self.warehouse_to_sales >= 0).sum())
+
+    def top_product_rows(self):
+        """Warehouse rows of the top-revenue products, with each product's sales Total"""
+        rows = self.warehouse_df.iloc[self.top_warehouse_rows].reset_index(drop=True)
+        sales_rows = self.warehouse_to_sales[self.top_warehouse_rows]
+        rows['Total'] = self.sales_df['Total'].to_numpy()[sales_rows]
+        return rows
+
+    def summary(self):
+        """One-line description of how the tables were joined"""
+        by_key = ', '.join(f"{name}: {count}" for name, count in self.matched_by.items() if count)
+        return f"Matched {self.matched} of {len(self.warehouse_df)} warehouse rows to sales products ({by_key or 'none'})"
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# Columns that get a presorted index for range filters and sorting
+INDEXED_COLUMNS = ['Total', 'Margin', 'Stock', 'Sold', 'Profit']
+
+# Columns summed over the matching rows of a query
+TOTAL_COLUMNS = ['Total', 'Sold', 'Stock', 'Cost', 'Profit']
+
+# Above this share of matching rows a filter scans every row instead of sorting positions
+SCAN_FRACTION = 0.125
+
+
+class SortedColumn:
+    """Row positions of one numeric column in ascending value order (missing values last)"""
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+        self.order = np.argsort(self.values, kind='stable')
+        self.sorted_values = self.values[self.order]
+        self.valid = int((~np.isnan(self.values)).sum())
+
+    @property
+    def min(self):
+        return float(self.sorted_values[0]) if self.valid else float('nan')
+
+    @property
+    def max(self):
+        return float(self.sorted_values[self.valid - 1]) if self.valid else float('nan')
+
+    def bounds(self, low=None, high=None):
+        """Slice of `order` whose values fall in [low, high], found by binary search"""
+        start = 0 if low is None else int(np.searchsorted(self.sorted_values[:self.valid], low, 'left'))
+        stop = self.valid if high is None else int(np.searchsorted(self.sorted_values[:self.valid], high, 'right'))
+        return start, max(start, stop)
+
+    def range_positions(self, low=None, high=None):
+        start, stop = self.bounds(low, high)
+        return self.order[start:stop]
+
+
+class SalesQueryIndex:
+    """Presorted column indexes and a category position index over a sales frame.
+
+    Built once per loaded frame. A filter picks whichever predicate matches
+    the fewest rows (a binary-searched slice of a sorted index, or one
+    category's positions) and checks the remaining predicates on just those
+    rows, so narrow filters never scan the whole catalog.
+    """
+
+    def __init__(self, df, columns=INDEXED_COLUMNS, category_column='Category'):
+        self.df = df
+        self.rows = len(df)
+        self.columns = {col: SortedColumn(df[col]) for col in columns if col in df.columns}
+        self.sum_columns = {col: df[col].to_numpy(dtype=float) for col in TOTAL_COLUMNS if col in df.columns}
+
+        codes, names = pd.factorize(df[category_column])
+        self.category_codes = codes
+        self.categories = list(names)
+        self.category_lookup = {name: code for code, name in enumerate(self.categories)}
+        # Positions of each category's rows, ascending, as slices of one stable sort
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(names))
+        start = int((codes < 0).sum())
+        self.category_positions = {}
+        for name, count in zip(self.categories, counts):
+            self.category_positions[name] = order[start:start + count]
+            start += count
+
+    def filter_positions(self, categories=None, ranges=None):
+        """Ascending row positions matching the categories and inclusive column ranges.
+
+        ``ranges`` maps an indexed column to ``(low, high)``; either bound may
+        be None. Rows with a missing value in a ranged column never match.
+        """
+        ranges = {col: bounds for col, bounds in (ranges or {}).items() if bounds is not None}
+        candidates = []
+        for col, (low, high) in ranges.items():
+            start, stop = self.columns[col].bounds(low, high)
+            candidates.append((stop - start, col))
+
+        wanted = None
+        if categories is not None:
+            selected = [name for name in categories if name in self.category_lookup]
+            wanted = np.zeros(len(self.categories), dtype=bool)
+            wanted[[self.category_lookup[name] for name in selected]] = True
+            candidates.append((sum(len(self.category_positions[name]) for name in selected), None))
+
+        if not candidates:
+            return np.arange(self.rows)
+
+        # Drive from the most selective predicate, then check the others on its rows
+        matches, driver = min(candidates, key=lambda candidate: candidate[0])
+        if matches > self.rows * SCAN_FRACTION:
+            # Broad filters: one pass over every row beats sorting most of them
+            positions, driver, checks_category = None, False, wanted is not None
+        elif driver is None:
+            parts = [self.category_positions[name] for name in selected]
+            positions = np.sort(np.concatenate(parts)) if parts else np.array([], dtype=np.int64)
+            checks_category = False
+        else:
+            positions = np.sort(self.columns[driver].range_positions(*ranges[driver]))
+            checks_category = wanted is not None
+
+        keep = np.ones(self.rows if positions is None else len(positions), dtype=bool)
+        for col, (low, high) in ranges.items():
+            if col == driver:
+                continue
+            values = self.columns[col].values
+            values = values if positions is None else values[positions]
+            keep &= ~np.isnan(values)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+        if checks_category:
+            codes = self.category_codes if positions is None else self.category_codes[positions]
+            keep &= (codes >= 0) & wanted[np.maximum(codes, 0)]
+        return np.flatnonzero(keep) if positions is None else positions[keep]
+
+    def filter(self, categories=None, ranges=None):
+        """The matching rows as a frame; the whole frame itself when nothing is excluded"""
+        positions = self.filter_positions(categories, ranges)
+        if len(positions) == self.rows:
+            return self.df
+        return self.df.take(positions)
+
+    def sorted_positions(self, positions, column, limit, descending=False):
+        """The first `limit` of `positions` ordered by an indexed column, missing values last.
+
+        Small result sets are sorted directly; large ones walk the column's
+        presorted order and stop as soon as `limit` matching rows are seen.
+        Either way ties come in row order ascending and in reverse row order
+        descending; missing values stay in row order.
+        """
+        sorted_column = self.columns[column]
+        if len(positions) <= self.rows * SCAN_FRACTION:
+            values = sorted_column.values[positions]
+            valid = ~np.isnan(values)
+            ranked = positions[valid][np.argsort(values[valid], kind='stable')]
+            if descending:
+                ranked = ranked[::-1]
+            return np.concatenate([ranked, positions[~valid]])[:limit]
+
+        member = np.zeros(self.rows, dtype=bool)
+        member[positions] = True
+        walk = sorted_column.order[:sorted_column.valid]
+        if descending:
+            walk = walk[::-1]
+        found = []
+        remaining = limit
+        step = max(4 * limit, 4096)
+        for start in range(0, len(walk), step):
+            part = walk[start:start + step]
+            hits = part[member[part]][:remaining]
+            found.append(hits)
+            remaining -= len(hits)
+            if remaining <= 0:
+                break
+        if remaining > 0:
+            missing = sorted_column.order[sorted_column.valid:]
+            found.append(missing[member[missing]][:remaining])
+        return np.concatenate(found) if found else np.array([], dtype=np.int64)
+
+    def totals(self, positions):
+        """Sums and the mean margin over the given rows"""
+        totals = {'count': int(len(positions))}
+        for col, values in self.sum_columns.items():
+            totals[col] = float(np.nansum(values[positions]))
+        if 'Margin' in self.columns:
+            margins = self.columns['Margin'].values[positions]
+            margins = margins[~np.isnan(margins)]
+            totals['avg_margin'] = float(margins.mean()) if len(margins) else None
+        return totals
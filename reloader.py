@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+
+
+def file_signature(paths):
+    """Size and mtime of every file (None for missing files)"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append((path, None))
+    return tuple(signature)
+
+
+class SnapshotReloader:
+    """Serve an immutable dashboard snapshot and rebuild it when its source files change.
+
+    Requests call ``current()`` once and use the returned object for the rest
+    of the request. A reload builds a completely new snapshot in a background
+    thread and swaps the reference in a single assignment, so in-flight
+    requests keep the view they started with and no request waits on a load.
+
+    A prebuilt ``initial`` snapshot should come with the ``signature`` of
+    its files taken before it was built, so an export replaced while it was
+    loading is still picked up.
+    """
+
+    def __init__(self, factory, paths, interval=5.0, initial=None, signature=None):
+        self.factory = factory
+        self.paths = list(paths)
+        self.interval = interval
+        self.reload_count = 0
+        self.last_error = None
+        # Taken before the first build, like reload() does
+        self._signature = signature if signature is not None else self.file_signature()
+        self._snapshot = initial if initial is not None else factory()
+        self._loaded_at = time.time()
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._reload_lock = threading.Lock()
+
+    def current(self):
+        """Return the snapshot requests should read from"""
+        return self._snapshot
+
+    @property
+    def loaded_at(self):
+        return self._loaded_at
+
+    def file_signature(self):
+        """Size and mtime of every watched file"""
+        return file_signature(self.paths)
+
+    def reload(self, signature=None):
+        """Build a new snapshot and swap it in; keep the old one if the build fails"""
+        with self._reload_lock:
+            signature = signature or self.file_signature()
+            try:
+                snapshot = self.factory()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Reload failed, keeping previous data: {e}")
+                return False
+
+            self._signature = signature
+            self._snapshot = snapshot
+            self._loaded_at = time.time()
+            self.reload_count += 1
+            self.last_error = None
+            print(f"Reloaded dashboard data (reload #{self.reload_count})")
+            return True
+
+    def check(self):
+        """Reload if the watched files changed and have stopped changing"""
+        signature = self.file_signature()
+        if signature == self._signature:
+            self._pending = None
+            return False
+
+        # Wait for one quiet poll so a half-written export is never loaded
+        if signature != self._pending:
+            self._pending = signature
+            return False
+
+        self._pending = None
+        return self.reload(signature)
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error checking data files for changes: {e}")
+
+    def start(self):
+        """Start polling the watched files in a daemon thread"""
+        if self.interval > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name='snapshot-reloader', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,185 @@
+import bisect
+import hmac
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+from flask import Response, abort, g, has_request_context, jsonify, request
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Recent latencies kept per route for the percentile estimates
+SAMPLE_WINDOW = 2048
+
+# The timings endpoint is off unless a token is set; clients send it as
+# `Authorization: Bearer <token>`
+DEBUG_TIMINGS_TOKEN = os.environ.get('DEBUG_TIMINGS_TOKEN', '')
+
+
+def mark_cache(hit):
+    """Record whether the current request was answered from a payload cache"""
+    if has_request_context():
+        g.cache_hit = hit
+
+
+class RouteStats:
+    """Latency, payload size and cache counters for one route"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.max_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def record(self, seconds, status, size, cache_hit):
+        self.count += 1
+        self.seconds += seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.samples.append(seconds)
+        self.bytes += size
+        self.max_bytes = max(self.max_bytes, size)
+        if status >= 500:
+            self.errors += 1
+        elif status == 304:
+            self.not_modified += 1
+        if cache_hit is True:
+            self.cache_hits += 1
+        elif cache_hit is False:
+            self.cache_misses += 1
+
+    def summary(self):
+        p50, p95, p99 = (np.percentile(self.samples, [50, 95, 99]) * 1000) if self.samples else (0.0, 0.0, 0.0)
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'not_modified': self.not_modified,
+            'mean_ms': round(self.seconds / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(float(p50), 3),
+            'p95_ms': round(float(p95), 3),
+            'p99_ms': round(float(p99), 3),
+            'mean_bytes': round(self.bytes / self.count) if self.count else 0,
+            'max_bytes': self.max_bytes,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_ratio': round(self.cache_hits / lookups, 4) if lookups else None
+        }
+
+
+class RequestTimings:
+    """In-process per-route request timing for a Flask app.
+
+    Every request is timed from before_request to after_request and filed
+    under its URL rule, so each endpoint gets latency percentiles, a
+    latency histogram, payload sizes and the hit ratio of the chart cache.
+    Figures are per process; with several workers each reports its own.
+    Timings are always recorded, but the endpoint answers 404 unless a
+    ``token`` is configured and the request carries it.
+    """
+
+    def __init__(self, app=None, endpoint='/api/debug/timings', token=None):
+        self.endpoint = endpoint
+        self.token = DEBUG_TIMINGS_TOKEN if token is None else token
+        self.started_at = time.time()
+        self._routes = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule(self.endpoint, 'debug_timings', self.view, methods=['GET', 'POST'])
+        return self
+
+    def _start(self):
+        g.request_started = time.perf_counter()
+
+    def _finish(self, response):
+        started = g.pop('request_started', None)
+        if started is None or request.path == self.endpoint:
+            return response
+
+        seconds = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        # 304s and streamed bodies put nothing measurable on the wire here
+        if response.is_streamed or response.status_code in (204, 304) or request.method == 'HEAD':
+            size = 0
+        else:
+            size = response.calculate_content_length() or 0
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats()
+            stats.record(seconds, response.status_code, size, g.get('cache_hit'))
+        return response
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """Per-route summaries, slowest p95 first"""
+        with self._lock:
+            routes = [dict(route=route, **stats.summary()) for route, stats in self._routes.items()]
+        return {
+            'since': self.started_at,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'routes': sorted(routes, key=lambda summary: summary['p95_ms'], reverse=True)
+        }
+
+    def prometheus(self):
+        """Render the counters in the Prometheus text exposition format"""
+        lines = [
+            '# HELP dashboard_request_duration_seconds Request latency by route.',
+            '# TYPE dashboard_request_duration_seconds histogram'
+        ]
+        with self._lock:
+            routes = sorted(self._routes.items())
+            for route, stats in routes:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), stats.buckets):
+                    cumulative += count
+                    lines.append(f'dashboard_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+                lines.append(f'dashboard_request_duration_seconds_sum{{route="{route}"}} {stats.seconds:.6f}')
+                lines.append(f'dashboard_request_duration_seconds_count{{route="{route}"}} {stats.count}')
+
+            counters = [
+                ('dashboard_response_bytes_total', 'Response body bytes by route.', 'bytes'),
+                ('dashboard_request_errors_total', 'Responses with a 5xx status by route.', 'errors'),
+                ('dashboard_not_modified_total', 'Responses answered 304 by route.', 'not_modified'),
+                ('dashboard_cache_hits_total', 'Requests served from the payload cache by route.', 'cache_hits'),
+                ('dashboard_cache_misses_total', 'Requests that rendered their payload by route.', 'cache_misses')
+            ]
+            for name, description, attribute in counters:
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} counter')
+                for route, stats in routes:
+                    lines.append(f'{name}{{route="{route}"}} {getattr(stats, attribute)}')
+        return '\n'.join(lines) + '\n'
+
+    def authorized(self):
+        if not self.token:
+            return False
+        scheme, _, presented = request.headers.get('Authorization', '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(presented.strip(), self.token)
+
+    def view(self):
+        """GET the timings as JSON, or Prometheus text with ?format=prometheus; POST clears them"""
+        if not self.authorized():
+            abort(404)
+        if request.method == 'POST':
+            self.reset()
+            return jsonify({'reset': True})
+        if request.args.get('format') == 'prometheus':
+            return Response(self.prometheus(), mimetype='text/plain; version=0.0.4')
+        return jsonify(self.snapshot())
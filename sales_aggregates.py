@@ -0,0 +1,210 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+import pandas as pd
+from sales_data import clean_sales_frame, NUMERIC_COLUMNS
+from categories import categorize_descriptions
+
+# Rows per chunk when streaming an export; bounds peak memory during ingestion
+STREAM_CHUNK_ROWS = 200_000
+
+# Columns kept for the top products candidates
+TOP_PRODUCT_COLUMNS = ['Description', 'Category', 'Sold', 'Stock', 'Total', 'Margin', 'Profit', 'Cost']
+
+SUM_COLUMNS = ['Total', 'Sold', 'Stock', 'Cost', 'Profit']
+
+# Columns kept for every negative-margin product
+NEGATIVE_MARGIN_COLUMNS = ['Description', 'Category', 'Sold', 'Total', 'Margin', 'Cost']
+
+
+def iter_sales_chunks(csv_file, chunksize=STREAM_CHUNK_ROWS, all_columns=False):
+    """Yield cleaned, categorized chunks of a sales export without loading it whole"""
+    wanted = set(NUMERIC_COLUMNS) | {'Description'}
+    reader = pd.read_csv(
+        csv_file,
+        chunksize=chunksize,
+        usecols=None if all_columns else lambda col: col.strip().replace('"', '') in wanted
+    )
+    for chunk in reader:
+        chunk = clean_sales_frame(chunk)
+        chunk['Category'] = categorize_descriptions(chunk['Description'])
+        yield chunk
+
+
+class SalesAggregates:
+    """Running, mergeable aggregates over cleaned and categorized sales rows.
+
+    Everything kept here is either a sum, a count or a bounded list of top-N
+    candidates, so folding in another chunk (or another store's partial
+    result) never needs the rows that were already seen.
+    """
+
+    def __init__(self, top_n=20):
+        self.top_n = top_n
+        self.rows = 0
+        self.sums = dict.fromkeys(SUM_COLUMNS, 0.0)
+        # Margin moments: count, sum and sum of squares of non-null margins
+        self.margin_count = 0
+        self.margin_sum = 0.0
+        self.margin_sumsq = 0.0
+        self.negative_margin = 0
+        self.high_margin = 0
+        self.categories = pd.DataFrame(
+            columns=['Total_sum', 'Total_count', 'Margin_sum', 'Margin_count',
+                     'Sold_sum', 'Stock_sum', 'Cost_sum', 'Profit_sum'],
+            dtype=float
+        )
+        self.top = pd.DataFrame(columns=TOP_PRODUCT_COLUMNS)
+        # Negative-margin rows in stream order; only as large as the problem list itself
+        self.negative = []
+
+    @classmethod
+    def from_frame(cls, df, top_n=20):
+        """Aggregate an already-loaded frame in one step"""
+        aggregates = cls(top_n)
+        aggregates.update(df)
+        return aggregates
+
+    def update(self, chunk):
+        """Fold a cleaned, categorized chunk into the running totals"""
+        self.rows += len(chunk)
+        for col in SUM_COLUMNS:
+            self.sums[col] += float(chunk[col].sum())
+
+        margin = chunk['Margin'].to_numpy(dtype=float)
+        valid = margin[~np.isnan(margin)]
+        self.margin_count += len(valid)
+        self.margin_sum += float(valid.sum())
+        self.margin_sumsq += float(np.square(valid).sum())
+        self.negative_margin += int((valid < 0).sum())
+        self.high_margin += int((valid > 50).sum())
+
+        per_category = chunk.groupby('Category').agg(
+            Total_sum=('Total', 'sum'),
+            Total_count=('Total', 'count'),
+            Margin_sum=('Margin', 'sum'),
+            Margin_count=('Margin', 'count'),
+            Sold_sum=('Sold', 'sum'),
+            Stock_sum=('Stock', 'sum'),
+            Cost_sum=('Cost', 'sum'),
+            Profit_sum=('Profit', 'sum')
+        ).astype(float)
+        self.categories = self.categories.add(per_category, fill_value=0)
+
+        candidates = chunk.nlargest(self.top_n, 'Total')[TOP_PRODUCT_COLUMNS]
+        self._keep_top(candidates)
+
+        negative = chunk.loc[chunk['Margin'] < 0, NEGATIVE_MARGIN_COLUMNS]
+        if len(negative):
+            self.negative.append(negative)
+        return self
+
+    def merge(self, other):
+        """Combine another partial result into this one (self's rows come first)"""
+        self.rows += other.rows
+        for col in SUM_COLUMNS:
+            self.sums[col] += other.sums[col]
+        self.margin_count += other.margin_count
+        self.margin_sum += other.margin_sum
+        self.margin_sumsq += other.margin_sumsq
+        self.negative_margin += other.negative_margin
+        self.high_margin += other.high_margin
+        self.categories = self.categories.add(other.categories, fill_value=0)
+        self._keep_top(other.top)
+        self.negative.extend(other.negative)
+        return self
+
+    def _keep_top(self, candidates):
+        if len(candidates) == 0:
+            return
+        if len(self.top) == 0:
+            combined = candidates
+        else:
+            combined = pd.concat([self.top, candidates], ignore_index=True)
+        # keep='first' preserves stream order on ties, matching idxmax/nlargest on the full frame
+        self.top = combined.nlargest(self.top_n, 'Total').reset_index(drop=True)
+
+    def margin_mean(self):
+        return self.margin_sum / self.margin_count if self.margin_count else float('nan')
+
+    def margin_std(self):
+        """Sample standard deviation of margin, from the running moments"""
+        if self.margin_count < 2:
+            return float('nan')
+        mean = self.margin_mean()
+        variance = (self.margin_sumsq - self.margin_count * mean * mean) / (self.margin_count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def insights(self):
+        """Key metrics with the same keys as the dashboards' generate_insights"""
+        category_revenue = self.categories['Total_sum']
+        has_top = len(self.top) > 0
+        return {
+            'total_revenue': self.sums['Total'],
+            'total_units_sold': int(self.sums['Sold']),
+            'total_stock_remaining': int(self.sums['Stock']),
+            'total_products': int(self.rows),
+            'avg_profit_margin': self.margin_mean(),
+            'top_product': str(self.top['Description'].iloc[0]) if has_top else '',
+            'top_product_revenue': float(self.top['Total'].iloc[0]) if has_top else 0.0,
+            'negative_margin_products': self.negative_margin,
+            'high_margin_products': self.high_margin,
+            'top_category': str(category_revenue.idxmax()) if len(category_revenue) else '',
+            'top_category_revenue': float(category_revenue.max()) if len(category_revenue) else 0.0
+        }
+
+    def category_summary(self):
+        """Per-category totals shaped like get_category_summary"""
+        summary = pd.DataFrame({
+            'Total_sum': self.categories['Total_sum'],
+            'Total_count': self.categories['Total_count'].astype(int),
+            'Margin_mean': self.categories['Margin_sum'] / self.categories['Margin_count'],
+            'Sold_sum': self.categories['Sold_sum'],
+            'Stock_sum': self.categories['Stock_sum'],
+            'Cost_sum': self.categories['Cost_sum'],
+            'Profit_sum': self.categories['Profit_sum']
+        }).sort_index()
+        summary.index.name = 'Category'
+        return summary.round(2)
+
+    def negative_margin_products(self):
+        """Every negative-margin product seen, in stream order"""
+        if not self.negative:
+            return pd.DataFrame(columns=NEGATIVE_MARGIN_COLUMNS)
+        return pd.concat(self.negative)
+
+    def top_products(self, n=None):
+        """Top products by revenue, at most top_n rows"""
+        return self.top.head(n or self.top_n)
+
+
+def aggregate_sales_csv(csv_file, chunksize=STREAM_CHUNK_ROWS, top_n=20):
+    """Stream a sales export into SalesAggregates with bounded memory"""
+    aggregates = SalesAggregates(top_n)
+    for chunk in iter_sales_chunks(csv_file, chunksize):
+        aggregates.update(chunk)
+    return aggregates
+
+
+def aggregate_stores(csv_files, workers=None, chunksize=STREAM_CHUNK_ROWS, top_n=20):
+    """Aggregate several stores' exports in a process pool and merge them chain-wide.
+
+    Each worker streams one export into its own SalesAggregates, so memory
+    per worker stays bounded and wall time follows the number of cores
+    rather than the number of stores. Returns (chain, per_store), with
+    per_store keyed by export path in the order given; partial results are
+    merged in that order, so ties resolve the same way on every run.
+    """
+    csv_files = list(csv_files)
+    workers = workers or min(len(csv_files), os.cpu_count() or 1)
+    if workers <= 1:
+        partials = [aggregate_sales_csv(csv_file, chunksize, top_n) for csv_file in csv_files]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(aggregate_sales_csv, csv_files, repeat(chunksize), repeat(top_n)))
+
+    chain = SalesAggregates(top_n)
+    for partial in partials:
+        chain.merge(partial)
+    return chain, dict(zip(csv_files, partials))
@@ -1,8 +1,21 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from datetime import datetime
+from sales_data import load_sales_data, SALES_CSV
+from categories import categorize_descriptions
+from sales_aggregates import SalesAggregates, aggregate_sales_csv, aggregate_stores, iter_sales_chunks
+from excel_report import write_excel_report, iter_frame_chunks, RAW_DATA_MODES
+from sales_store import SalesStore, STORE_DIR
+from pareto import ParetoCurve
+from grouped_stats import price_elasticity
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -11,28 +24,43 @@ plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
 class SalesAnalytics:
-    def __init__(self, csv_file):
-        """Initialize the analytics with CSV data"""
-        self.df = self.load_and_clean_data(csv_file)
+    def __init__(self, csv_file, streaming=False, store=None, start=None, end=None, aggregates=None):
+        """Initialize the analytics with CSV data, a date range of a SalesStore, or
+        precomputed SalesAggregates (e.g. merged across stores)"""
+        self.csv_file = csv_file
+        self.store = store
+        self.start = start
+        self.end = end
+        if store is not None and not store.dates(start, end):
+            raise ValueError(f"No stored exports between {start or 'the first'} and {end or 'the last'} date")
+        
+        if aggregates is not None:
+            self.df = None
+            self.aggregates = aggregates
+        elif store is not None and streaming:
+            # One partition in memory at a time
+            self.df = None
+            self.aggregates = SalesAggregates()
+            for chunk in store.iter_partitions(start, end):
+                self.aggregates.update(chunk)
+        elif store is not None:
+            # Only the partitions in the range are read, already cleaned and categorized
+            self.df = store.read(start, end)
+            self.aggregates = None
+        elif streaming:
+            # Fold the export into running aggregates with bounded memory;
+            # row-level charts and sheets need the full frame and are unavailable
+            self.df = None
+            self.aggregates = aggregate_sales_csv(csv_file)
+        else:
+            self.df = self.load_and_clean_data(csv_file)
+            self.aggregates = None
         self.generate_insights()
     
     def load_and_clean_data(self, csv_file):
         """Load and clean the CSV data"""
-        # Read CSV file
-        df = pd.read_csv(csv_file)
-        
-        # Clean column names
-        df.columns = df.columns.str.strip().str.replace('"', '')
-        
-        # Clean data types
-        # Remove $ and % symbols and convert to numeric
-        numeric_columns = ['Stock', 'Sold', 'Subtotal', 'Discounts', 'Subtotal w/ Discounts', 
-                          'Total', 'Cost', 'Profit', 'Margin']
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.replace('$', '').str.replace('%', '').str.replace(',', '')
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Read CSV file with $ and % symbols already stripped to numeric
+        df = load_sales_data(csv_file)
         
         # Create product categories based on description
         df['Category'] = self.categorize_products(df['Description'])
@@ -41,27 +69,16 @@ class SalesAnalytics:
     
     def categorize_products(self, descriptions):
         """Categorize products based on description keywords"""
-        categories = []
-        for desc in descriptions:
-            desc_lower = str(desc).lower()
-            if any(word in desc_lower for word in ['vibrator', 'rabbit', 'bullet', 'wand']):
-                categories.append('Vibrators')
-            elif any(word in desc_lower for word in ['supplement', 'rhino', 'mood', 'male', 'female']):
-                categories.append('Supplements')
-            elif any(word in desc_lower for word in ['lube', 'lubricant', 'gel', 'oil']):
-                categories.append('Lubricants')
-            elif any(word in desc_lower for word in ['dress', 'lingerie', 'bra', 'panty', 'stocking', 'heels', 'shoes']):
-                categories.append('Clothing & Accessories')
-            elif any(word in desc_lower for word in ['dildo', 'plug', 'ring', 'harness', 'restraint']):
-                categories.append('Adult Toys')
-            elif any(word in desc_lower for word in ['cleaner', 'clean', 'charger', 'battery']):
-                categories.append('Accessories')
-            else:
-                categories.append('Other')
-        return categories
+        return categorize_descriptions(descriptions)
     
     def generate_insights(self):
         """Generate key insights from the data"""
+        if self.df is None:
+            self.insights = self.aggregates.insights()
+            # Ranking every product needs the rows, which streaming does not keep
+            self.pareto = None
+            return
+        
         self.insights = {
             'total_revenue': self.df['Total'].sum(),
             'total_units_sold': self.df['Sold'].sum(),
@@ -72,6 +89,8 @@ class SalesAnalytics:
             'negative_margin_products': len(self.df[self.df['Margin'] < 0]),
             'high_margin_products': len(self.df[self.df['Margin'] > 50])
         }
+        self.pareto = ParetoCurve(self.df['Total'])
+        self.insights.update(self.pareto.insights())
     
     def create_revenue_analysis(self):
         """Create revenue analysis charts"""
@@ -172,11 +191,9 @@ class SalesAnalytics:
         fig.suptitle('Predictive Analytics & Insights', fontsize=16, fontweight='bold')
         
         # 1. Price Elasticity Analysis
-        price_elasticity = self.df.groupby('Category').apply(
-            lambda x: np.corrcoef(x['Total']/x['Sold'], x['Sold'])[0,1] if len(x) > 1 else 0
-        ).fillna(0)
+        elasticity = price_elasticity(self.df, by='Category')
         
-        axes[0, 0].bar(price_elasticity.index, price_elasticity.values)
+        axes[0, 0].bar(elasticity.index, elasticity.values)
         axes[0, 0].set_title('Price Elasticity by Category')
         axes[0, 0].set_xlabel('Category')
         axes[0, 0].set_ylabel('Price Elasticity')
@@ -189,17 +206,21 @@ class SalesAnalytics:
         axes[0, 1].set_title('Profitability vs Sales Volume')
         
         # 3. Revenue Forecast (Simple trend)
-        sorted_df = self.df.sort_values('Total', ascending=False)
-        cumulative_revenue = sorted_df['Total'].cumsum()
-        axes[1, 0].plot(range(len(cumulative_revenue)), cumulative_revenue, marker='o')
+        axes[1, 0].plot(self.pareto.ranks - 1, self.pareto.cumulative_revenue)
+        for level, point in self.pareto.breakpoints.items():
+            axes[1, 0].axvline(point['products'] - 1, linestyle='--', color='red', alpha=0.5)
+            axes[1, 0].annotate(f"{level}%", (point['products'] - 1, self.pareto.total_revenue * level / 100))
         axes[1, 0].set_xlabel('Product Rank')
         axes[1, 0].set_ylabel('Cumulative Revenue ($)')
         axes[1, 0].set_title('Revenue Concentration (Pareto Analysis)')
         
         # 4. Margin Distribution by Category
+        categories = self.df['Category'].unique()
         margin_data = [self.df[self.df['Category'] == cat]['Margin'].dropna() 
-                      for cat in self.df['Category'].unique()]
-        axes[1, 1].boxplot(margin_data, labels=self.df['Category'].unique())
+                      for cat in categories]
+        # Labelled through the axis: boxplot's labels= was renamed in Matplotlib 3.9
+        axes[1, 1].boxplot(margin_data)
+        axes[1, 1].set_xticks(range(1, len(categories) + 1), categories)
         axes[1, 1].set_title('Margin Distribution by Category')
         axes[1, 1].set_xlabel('Category')
         axes[1, 1].set_ylabel('Profit Margin (%)')
@@ -209,6 +230,21 @@ class SalesAnalytics:
         plt.savefig('predictive_insights.png', dpi=300, bbox_inches='tight')
         plt.show()
     
+    def get_category_summary(self):
+        """Get per-category revenue, count, margin and units"""
+        if self.df is None:
+            return self.aggregates.category_summary()
+        
+        category_summary = self.df.groupby('Category').agg({
+            'Total': ['sum', 'count'],
+            'Margin': 'mean',
+            'Sold': 'sum'
+        }).round(2)
+        
+        # Flatten column names
+        category_summary.columns = ['_'.join(col).strip() for col in category_summary.columns]
+        return category_summary
+    
     def print_summary_report(self):
         """Print a comprehensive summary report"""
         print("=" * 80)
@@ -227,6 +263,10 @@ class SalesAnalytics:
         print("🏆 TOP PERFORMERS:")
         print(f"   • Best Selling Product: {self.insights['top_product'][:50]}...")
         print(f"   • Top Product Revenue: ${self.insights['top_product_revenue']:,.2f}")
+        if self.pareto is not None:
+            for level, point in self.pareto.breakpoints.items():
+                print(f"   • {level}% of Revenue: top {point['products']:,} products "
+                      f"({point['product_share']:.1f}% of catalog)")
         print()
         
         print("⚠️  AREAS OF CONCERN:")
@@ -235,18 +275,14 @@ class SalesAnalytics:
         print()
         
         print("📈 CATEGORY PERFORMANCE:")
-        category_summary = self.df.groupby('Category').agg({
-            'Total': ['sum', 'count'],
-            'Margin': 'mean',
-            'Sold': 'sum'
-        }).round(2)
+        category_summary = self.get_category_summary()
         
         for category in category_summary.index:
-            revenue = category_summary.loc[category, ('Total', 'sum')]
-            count = category_summary.loc[category, ('Total', 'count')]
-            margin = category_summary.loc[category, ('Margin', 'mean')]
-            units = category_summary.loc[category, ('Sold', 'sum')]
-            print(f"   • {category}: ${revenue:,.0f} revenue, {count} products, {margin:.1f}% avg margin, {units:,} units")
+            revenue = category_summary.loc[category, 'Total_sum']
+            count = category_summary.loc[category, 'Total_count']
+            margin = category_summary.loc[category, 'Margin_mean']
+            units = category_summary.loc[category, 'Sold_sum']
+            print(f"   • {category}: ${revenue:,.0f} revenue, {count} products, {margin:.1f}% avg margin, {units:,.0f} units")
         
         print()
         print("🎯 RECOMMENDATIONS:")
@@ -257,48 +293,178 @@ class SalesAnalytics:
         print("   5. Optimize inventory based on sales volume and margin analysis")
         print("=" * 80)
     
-    def generate_excel_report(self, filename='sales_analytics_report.xlsx'):
+    def generate_excel_report(self, filename='sales_analytics_report.xlsx', raw_data='split'):
         """Generate a comprehensive Excel report"""
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # Summary sheet
-            summary_data = {
-                'Metric': ['Total Revenue', 'Total Units Sold', 'Total Products', 
-                          'Average Profit Margin', 'Negative Margin Products', 'High Margin Products'],
-                'Value': [self.insights['total_revenue'], self.insights['total_units_sold'],
-                         self.insights['total_products'], self.insights['avg_profit_margin'],
-                         self.insights['negative_margin_products'], self.insights['high_margin_products']]
-            }
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Category analysis
-            category_analysis = self.df.groupby('Category').agg({
-                'Total': ['sum', 'count'],
-                'Margin': 'mean',
-                'Sold': 'sum',
-                'Cost': 'sum',
-                'Profit': 'sum'
-            }).round(2)
-            category_analysis.to_excel(writer, sheet_name='Category Analysis')
-            
-            # Top products
-            top_products = self.df.nlargest(20, 'Total')[['Description', 'Category', 'Sold', 'Total', 'Margin', 'Profit']]
-            top_products.to_excel(writer, sheet_name='Top Products', index=False)
-            
-            # Products with negative margins
-            negative_margin = self.df[self.df['Margin'] < 0][['Description', 'Category', 'Sold', 'Total', 'Margin', 'Cost']]
-            negative_margin.to_excel(writer, sheet_name='Negative Margin Products', index=False)
-            
-            # Raw data
-            self.df.to_excel(writer, sheet_name='Raw Data', index=False)
+        # Streamed in write-only mode: from the loaded frame, or re-read chunk by chunk
+        if self.df is not None:
+            chunks = iter_frame_chunks(self.df)
+        elif self.store is not None:
+            chunks = self.store.iter_partitions(self.start, self.end)
+        else:
+            chunks = iter_sales_chunks(self.csv_file, all_columns=True)
+        write_excel_report(filename, chunks, raw_data=raw_data)
         
         print(f"📄 Excel report generated: {filename}")
 
+# Report files and the SalesAnalytics method that writes each one
+REPORT_ARTIFACTS = {
+    'revenue_analysis.png': 'create_revenue_analysis',
+    'performance_metrics.png': 'create_performance_metrics',
+    'predictive_insights.png': 'create_predictive_insights',
+    'sales_analytics_report.xlsx': 'generate_excel_report'
+}
+
+_worker_analytics = None
+
+def _init_report_worker(analytics):
+    """Pool initializer: headless backend, plus the analytics object every task renders from"""
+    global _worker_analytics
+    plt.switch_backend('Agg')
+    _worker_analytics = analytics
+
+def _render_artifact(method, options):
+    """Run one report method in a worker; returns (seconds, error message or None)"""
+    start = time.perf_counter()
+    try:
+        getattr(_worker_analytics, method)(**options)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        plt.close('all')
+    return time.perf_counter() - start, error
+
+def render_reports(analytics, workers=None, raw_data='split'):
+    """Render every report artifact concurrently in a process pool.
+    
+    Returns {artifact: (seconds, error)} in REPORT_ARTIFACTS order; a worker
+    that dies before reporting shows up as that artifact's error. Where fork
+    is available the workers inherit the loaded frame instead of unpickling it.
+    """
+    workers = workers or min(len(REPORT_ARTIFACTS), os.cpu_count() or 1)
+    options = {'sales_analytics_report.xlsx': {'raw_data': raw_data}}
+    context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_report_worker, initargs=(analytics,)) as pool:
+        futures = {artifact: pool.submit(_render_artifact, method, options.get(artifact, {}))
+                   for artifact, method in REPORT_ARTIFACTS.items()}
+        results = {}
+        for artifact, future in futures.items():
+            try:
+                results[artifact] = future.result()
+            except Exception as e:
+                # e.g. BrokenProcessPool when a worker was killed
+                results[artifact] = (0.0, f"{type(e).__name__}: {e}")
+        return results
+
+def run_headless(analytics, workers=None, raw_data='split'):
+    """Batch mode: summary report, then all artifacts in parallel with per-artifact wall time"""
+    print("📋 Printing summary report...")
+    analytics.print_summary_report()
+    
+    print("🖨️  Rendering reports in parallel...")
+    start = time.perf_counter()
+    results = render_reports(analytics, workers, raw_data)
+    elapsed = time.perf_counter() - start
+    
+    for artifact, (seconds, error) in results.items():
+        status = f"❌ {error}" if error else "✅"
+        print(f"   • {artifact:<30} {seconds:7.2f}s  {status}")
+    print(f"   Total wall time: {elapsed:.2f}s")
+    return results
+
+def store_exports(paths):
+    """Export paths for --stores: a directory means the standard export inside it"""
+    return [os.path.join(path, SALES_CSV) if os.path.isdir(path) else path for path in paths]
+
+def store_label(csv_file):
+    """Name a store by its directory when the export has the standard name, else by the file"""
+    if os.path.basename(csv_file) == os.path.basename(SALES_CSV):
+        return os.path.basename(os.path.dirname(os.path.abspath(csv_file)))
+    return os.path.splitext(os.path.basename(csv_file))[0]
+
+def run_multi_store(paths, workers=None):
+    """Chain-wide summary merged from per-store partial aggregates, plus a per-store table"""
+    csv_files = store_exports(paths)
+    start = time.perf_counter()
+    chain, per_store = aggregate_stores(csv_files, workers)
+    elapsed = time.perf_counter() - start
+    
+    analytics = SalesAnalytics(None, aggregates=chain)
+    analytics.print_summary_report()
+    
+    print("🏬 STORES:")
+    for csv_file, aggregates in per_store.items():
+        insights = aggregates.insights()
+        print(f"   • {store_label(csv_file)}: ${insights['total_revenue']:,.0f} revenue, "
+              f"{insights['total_products']:,} products, {insights['avg_profit_margin']:.1f}% avg margin")
+    print(f"   Aggregated {len(csv_files)} stores in {elapsed:.2f}s")
+    return analytics
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Sunset Novelties sales analytics")
+    parser.add_argument('csv_file', nargs='?', default=SALES_CSV,
+                        help="sales export to analyze")
+    parser.add_argument('--streaming', action='store_true',
+                        help="read the export in chunks and write the summary and Excel reports "
+                             "only (bounded memory for very large exports)")
+    parser.add_argument('--raw-data', choices=RAW_DATA_MODES, default='split',
+                        help="Excel Raw Data sheet: continue on new sheets past Excel's row "
+                             "limit (default), stop at the limit, or skip it")
+    parser.add_argument('--store', nargs='?', const=STORE_DIR, default=None,
+                        help="analyze the date-partitioned store (see sales_store.py) "
+                             f"instead of one export (default directory: {STORE_DIR})")
+    parser.add_argument('--start', help="first export date to include from --store (YYYY-MM-DD)")
+    parser.add_argument('--end', help="last export date to include from --store (YYYY-MM-DD)")
+    parser.add_argument('--stores', nargs='+', metavar='EXPORT',
+                        help="chain-wide summary across store exports (files, or directories "
+                             f"holding {SALES_CSV}), aggregated in parallel")
+    parser.add_argument('--headless', action='store_true',
+                        help="batch mode for cron/CI: no display, render the charts and the "
+                             "Excel report concurrently and report per-artifact wall time")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for --headless and --stores (default: one per "
+                             "artifact or store, up to the CPU count)")
+    return parser.parse_args()
+
 def main():
     """Main function to run the analytics"""
+    args = parse_args()
+    store = SalesStore(args.store) if args.store else None
+    period = {'store': store, 'start': args.start, 'end': args.end}
+    # Batch runs exit non-zero on any failure so cron and CI notice
+    batch = args.headless or args.stores
+    if args.headless:
+        # Never block on (or require) a display
+        plt.switch_backend('Agg')
     try:
+        if args.stores:
+            print(f"🔍 Aggregating {len(args.stores)} stores...")
+            run_multi_store(args.stores, args.workers)
+            return
+        
+        if args.streaming:
+            print("🔍 Streaming sales data...")
+            analytics = SalesAnalytics(args.csv_file, streaming=True, **period)
+            analytics.print_summary_report()
+            
+            print("📄 Generating Excel report...")
+            analytics.generate_excel_report(raw_data=args.raw_data)
+            return
+        
         # Initialize analytics
         print("🔍 Loading sales data...")
-        analytics = SalesAnalytics('reports_sales_listings_item.csv')
+        analytics = SalesAnalytics(args.csv_file, **period)
+        
+        if args.headless:
+            results = run_headless(analytics, args.workers, args.raw_data)
+            failed = [artifact for artifact, (_, error) in results.items() if error]
+            if failed:
+                print(f"\n❌ {len(failed)} of {len(results)} reports failed: {', '.join(failed)}")
+                sys.exit(1)
+            print("\n✅ Analytics complete!")
+            return
         
         # Generate reports
         print("📊 Generating revenue analysis...")
@@ -314,7 +480,7 @@ def main():
         analytics.print_summary_report()
         
         print("📄 Generating Excel report...")
-        analytics.generate_excel_report()
+        analytics.generate_excel_report(raw_data=args.raw_data)
         
         print("\n✅ Analytics complete! Check the generated files:")
         print("   • revenue_analysis.png")
@@ -325,8 +491,12 @@ def main():
     except FileNotFoundError:
         print("❌ Error: CSV file 'reports_sales_listings_item.csv' not found!")
         print("   Please ensure the file is in the same directory as this script.")
+        if batch:
+            sys.exit(1)
     except Exception as e:
         print(f"❌ Error: {str(e)}")
+        if batch:
+            sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+from shared_data import write_table, map_table, pa
+
+SALES_CSV = 'reports_sales_listings_item.csv'
+
+NUMERIC_COLUMNS = ['Stock', 'Sold', 'Subtotal', 'Discounts', 'Subtotal w/ Discounts',
+                   'Total', 'Cost', 'Profit', 'Margin']
+
+# Cleaned snapshots live next to the exports unless told otherwise
+CACHE_DIR = os.environ.get('SALES_CACHE_DIR', '.data_cache')
+
+# Bump whenever clean_sales_frame changes what it produces
+CACHE_VERSION = 2
+
+
+def clean_sales_frame(df):
+    """Strip $/%/, from the numeric columns and convert them to numbers"""
+    df.columns = df.columns.str.strip().str.replace('"', '')
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(str).str.replace(r'[$%,]', '', regex=True)
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    return df
+
+
+def file_digest(path, block_size=1 << 20):
+    """Return the SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_paths(csv_file, cache_dir):
+    """Return the (data, meta) cache file paths for a source export"""
+    key = hashlib.sha1(os.path.abspath(csv_file).encode('utf-8')).hexdigest()[:16]
+    stem = os.path.join(cache_dir, f"{os.path.basename(csv_file)}.{key}")
+    extension = 'arrow' if pa is not None else 'pkl'
+    return f"{stem}.{extension}", f"{stem}.json"
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _source_unchanged(csv_file, meta):
+    """Check a cached snapshot against the source file's size, mtime and hash"""
+    if meta is None or meta.get('version') != CACHE_VERSION:
+        return False
+
+    stat = os.stat(csv_file)
+    if stat.st_size != meta.get('size'):
+        return False
+    if stat.st_mtime_ns == meta.get('mtime_ns'):
+        return True
+
+    # Same size but touched: only re-parse if the contents actually changed
+    return file_digest(csv_file) == meta.get('sha1')
+
+
+def _write_atomic(path, writer):
+    """Write via a temp file so concurrent workers never read a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_cache(df, csv_file, data_path, meta_path):
+    stat = os.stat(csv_file)
+    meta = {
+        'version': CACHE_VERSION,
+        'source': os.path.abspath(csv_file),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha1': file_digest(csv_file)
+    }
+
+    os.makedirs(os.path.dirname(data_path) or '.', exist_ok=True)
+    if pa is not None:
+        write_table(df, data_path)
+    else:
+        _write_atomic(data_path, df.to_pickle)
+
+    def write_meta(p):
+        with open(p, 'w') as f:
+            json.dump(meta, f)
+
+    _write_atomic(meta_path, write_meta)
+
+
+def _read_cache(data_path):
+    if pa is not None:
+        # Memory-mapped: processes loading the same export share its pages
+        return map_table(data_path)
+    return pd.read_pickle(data_path)
+
+
+def load_sales_data(csv_file=SALES_CSV, use_cache=True, cache_dir=None):
+    """Load the sales export as a cleaned, typed DataFrame.
+
+    A typed columnar snapshot of the cleaned frame is kept in ``cache_dir``
+    and reused for as long as the source file is unchanged, so warm starts
+    skip the CSV parse and string cleaning entirely. The snapshot is an
+    Arrow IPC file that is memory-mapped read-only on warm starts.
+    """
+    if not use_cache:
+        return clean_sales_frame(pd.read_csv(csv_file))
+
+    data_path, meta_path = _cache_paths(csv_file, cache_dir or CACHE_DIR)
+    if os.path.exists(data_path) and _source_unchanged(csv_file, _read_meta(meta_path)):
+        try:
+            return _read_cache(data_path)
+        except Exception as e:
+            print(f"Ignoring unreadable data cache {data_path}: {e}")
+
+    df = clean_sales_frame(pd.read_csv(csv_file))
+    try:
+        _write_cache(df, csv_file, data_path, meta_path)
+    except Exception as e:
+        print(f"Could not write data cache {data_path}: {e}")
+    return df
@@ -0,0 +1,280 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+import pandas as pd
+from flask import current_app, jsonify, request
+from chart_cache import json_response
+from sales_data import load_sales_data, file_digest
+from categories import categorize_descriptions
+from sales_aggregates import SalesAggregates
+from shared_data import write_table, map_table, pa
+
+# Appenders serialize on a lock file next to the manifest (no locking without fcntl)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# One sub-directory per export date, plus a manifest describing each partition
+STORE_DIR = os.environ.get('SALES_STORE_DIR', 'sales_store')
+
+MANIFEST = 'manifest.json'
+
+MANIFEST_LOCK = 'manifest.lock'
+
+# Dates in export file names: 20250627, 2025-06-27 or 2025_06_27
+_FILE_DATE = re.compile(r'(20\d{2})[-_]?(\d{2})[-_]?(\d{2})')
+
+
+def export_date(csv_file):
+    """The date an export covers: from its file name, else its modification time"""
+    match = _FILE_DATE.search(os.path.basename(csv_file))
+    if match:
+        try:
+            return date(*(int(part) for part in match.groups()))
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(csv_file)).date()
+
+
+def _as_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+class SalesStore:
+    """Daily sales exports kept as date partitions of cleaned, categorized rows.
+
+    Appending an export parses only that file and writes it as its own
+    partition; reading a date range maps only the partitions inside it. Each
+    partition is an Arrow IPC file (pickle without pyarrow), so reads are
+    memory-mapped rather than parsed. Appends from several processes are
+    serialized on a lock file and merged into the manifest as it is on disk.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or STORE_DIR
+        self._summaries = {}
+        self._manifest_stat = None
+        self.manifest = self._read_manifest()
+
+    def _stat_manifest(self):
+        try:
+            stat = os.stat(os.path.join(self.directory, MANIFEST))
+        except OSError:
+            return None
+        # The manifest is replaced, never rewritten in place, so a new inode means new contents
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _read_manifest(self):
+        # Stat first: a write landing after it is picked up by the next refresh
+        self._manifest_stat = self._stat_manifest()
+        self._summaries.clear()
+        try:
+            with open(os.path.join(self.directory, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self):
+        path = os.path.join(self.directory, MANIFEST)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+        self._manifest_stat = self._stat_manifest()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store's write lock, with the manifest re-read under it"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, MANIFEST_LOCK), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self.manifest = self._read_manifest()
+            yield
+            # Closing the file releases the lock
+
+    @property
+    def last_modified(self):
+        """When the manifest was last written, as a UTC datetime (None for an empty store)"""
+        if self._manifest_stat is None:
+            return None
+        return datetime.fromtimestamp(self._manifest_stat[2] // 1_000_000_000, timezone.utc)
+
+    def refresh(self):
+        """Pick up partitions appended by another process, if the manifest changed"""
+        if self._stat_manifest() != self._manifest_stat:
+            self.manifest = self._read_manifest()
+
+    def _partition_path(self, day):
+        extension = 'arrow' if pa is not None else 'pkl'
+        return os.path.join(self.directory, f"date={day}", f"sales.{extension}")
+
+    def append(self, csv_file, day=None):
+        """Ingest one export as the partition for its date; returns the partition's date.
+
+        Re-appending the same file is a no-op; a different file for a date
+        that is already stored replaces that partition.
+        """
+        day = (_as_date(day) or export_date(csv_file)).isoformat()
+        digest = file_digest(csv_file)
+        self.refresh()
+        existing = self.manifest.get(day)
+        if existing is not None and existing['sha1'] == digest:
+            print(f"Partition {day} is already up to date")
+            return day
+
+        # Parsed outside the lock; only the partition and manifest writes are serialized
+        df = load_sales_data(csv_file, use_cache=False)
+        df['Category'] = categorize_descriptions(df['Description'])
+
+        with self._locked():
+            existing = self.manifest.get(day)
+            path = self._partition_path(day)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if pa is not None:
+                write_table(df, path)
+            else:
+                df.to_pickle(path)
+
+            # Merged into the manifest as it is now, keeping other appenders' partitions
+            self.manifest[day] = {
+                'rows': int(len(df)),
+                'source': os.path.abspath(csv_file),
+                'sha1': digest,
+                'path': os.path.relpath(path, self.directory)
+            }
+            self._write_manifest()
+        action = 'Replaced' if existing is not None else 'Appended'
+        print(f"{action} partition {day} ({len(df)} products)")
+        return day
+
+    def dates(self, start=None, end=None):
+        """Stored partition dates within [start, end], oldest first"""
+        start, end = _as_date(start), _as_date(end)
+        selected = []
+        for day in sorted(self.manifest):
+            value = date.fromisoformat(day)
+            if (start is None or value >= start) and (end is None or value <= end):
+                selected.append(day)
+        return selected
+
+    def version(self, start=None, end=None):
+        """Fingerprint of the partitions a range reads, for cache keys"""
+        parts = [f"{day}:{self.manifest[day]['sha1']}" for day in self.dates(start, end)]
+        return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+    def _read_partition(self, day):
+        path = os.path.join(self.directory, self.manifest[day]['path'])
+        return map_table(path) if path.endswith('.arrow') else pd.read_pickle(path)
+
+    def iter_partitions(self, start=None, end=None):
+        """Yield each partition in [start, end] as a frame with a Date column, oldest first"""
+        for day in self.dates(start, end):
+            df = self._read_partition(day)
+            df.insert(0, 'Date', pd.Timestamp(day))
+            yield df
+
+    def read(self, start=None, end=None):
+        """Rows of every partition in [start, end] as one frame"""
+        frames = list(self.iter_partitions(start, end))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def summary(self, start=None, end=None):
+        """Insights and category totals of a date range, folded one partition at a time"""
+        key = (self.version(start, end), str(start), str(end))
+        cached = self._summaries.get(key)
+        if cached is not None:
+            return cached
+
+        days = self.dates(start, end)
+        aggregates = SalesAggregates()
+        for df in self.iter_partitions(start, end):
+            aggregates.update(df)
+        summary = {
+            'start': days[0] if days else None,
+            'end': days[-1] if days else None,
+            'partitions': len(days),
+            'insights': aggregates.insights() if days else {},
+            'categories': aggregates.category_summary().to_dict('index') if days else {}
+        }
+        # A handful of ranges are compared at a time; keep the cache small
+        if len(self._summaries) >= 32:
+            self._summaries.clear()
+        self._summaries[key] = summary
+        return summary
+
+
+def register_store_routes(app, store):
+    """Add the date-range endpoints for a store to a Flask dashboard"""
+
+    def store_response(render):
+        # Validators hash the body, so they follow the summary code as well as the partitions
+        body = current_app.json.dumps(render()).encode('utf-8')
+        return json_response(body, hashlib.sha1(body).hexdigest(), store.last_modified)
+
+    @app.route('/api/store/partitions')
+    def get_store_partitions():
+        """API endpoint for the stored export dates"""
+        store.refresh()
+        return store_response(lambda: [
+            {'date': day, 'rows': store.manifest[day]['rows']} for day in store.dates()
+        ])
+
+    @app.route('/api/store/summary')
+    def get_store_summary():
+        """API endpoint for metrics and category totals over ?start=YYYY-MM-DD&end=YYYY-MM-DD"""
+        store.refresh()
+        try:
+            start = _as_date(request.args.get('start'))
+            end = _as_date(request.args.get('end'))
+        except ValueError:
+            return jsonify({'error': 'start and end must be YYYY-MM-DD dates'}), 400
+        return store_response(lambda: store.summary(start, end))
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Date-partitioned sales export store")
+    parser.add_argument('--store', default=STORE_DIR, help="store directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    append = commands.add_parser('append', help="ingest exports as date partitions")
+    append.add_argument('csv_files', nargs='+', help="sales exports to ingest")
+    append.add_argument('--date', help="partition date (YYYY-MM-DD) when ingesting one export; "
+                                       "defaults to the date in the file name, else its mtime")
+
+    commands.add_parser('list', help="list stored partitions")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = SalesStore(args.store)
+    try:
+        if args.command == 'append':
+            if args.date and len(args.csv_files) > 1:
+                print("❌ Error: --date applies to a single export")
+                return
+            for csv_file in args.csv_files:
+                store.append(csv_file, args.date)
+        else:
+            for day in store.dates():
+                entry = store.manifest[day]
+                print(f"{day}  {entry['rows']:>10,} products  {entry['source']}")
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
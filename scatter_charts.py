@@ -0,0 +1,137 @@
+import os
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Above this many products the scatter charts stop drawing one marker per product
+SCATTER_POINT_LIMIT = int(os.environ.get('SCATTER_POINT_LIMIT', '5000'))
+
+# 'sample' keeps a density-preserving sample plus the outliers; 'bin' draws a 2-D histogram
+SCATTER_MODE = os.environ.get('SCATTER_MODE', 'sample')
+
+SCATTER_MODES = ('sample', 'bin')
+
+# Points beyond these quantiles on either axis count as outliers and are always drawn
+OUTLIER_QUANTILE = 0.001
+
+# Cells per axis for the coverage grid (sample mode) and the histogram (bin mode)
+GRID_BINS = 80
+
+
+def _axis_bounds(values):
+    low, high = np.nanquantile(values, [OUTLIER_QUANTILE, 1 - OUTLIER_QUANTILE])
+    return low, (high if high > low else low + 1)
+
+
+def outlier_positions(x, y, limit):
+    """Row positions outside the central quantiles of either axis, most extreme first"""
+    (x_low, x_high), (y_low, y_high) = _axis_bounds(x), _axis_bounds(y)
+    # Distance beyond the fence, in units of the central range
+    excess = np.maximum(
+        np.maximum(x_low - x, x - x_high) / (x_high - x_low),
+        np.maximum(y_low - y, y - y_high) / (y_high - y_low)
+    )
+    positions = np.flatnonzero(excess > 0)
+    if len(positions) > limit:
+        positions = positions[np.argsort(-excess[positions], kind='stable')[:limit]]
+    return np.sort(positions)
+
+
+def _grid_cells(x, y):
+    """Coverage grid cell of every point, over the central range of each axis"""
+    cells = []
+    for values in (x, y):
+        low, high = _axis_bounds(values)
+        scaled = (np.clip(values, low, high) - low) / (high - low) * (GRID_BINS - 1)
+        cells.append(np.nan_to_num(scaled).astype(np.int64))
+    return cells[0] * GRID_BINS + cells[1]
+
+
+def sample_positions(x, y, limit, seed=0):
+    """Pick at most `limit` rows: every outlier, one row per occupied grid cell,
+    then a uniform sample of the rest so dense regions stay dense."""
+    rows = len(x)
+    if rows <= limit:
+        return np.arange(rows)
+
+    rng = np.random.default_rng(seed)
+    outliers = outlier_positions(x, y, limit // 2)
+    chosen = np.zeros(rows, dtype=bool)
+    chosen[outliers] = True
+
+    # Shuffle once so the representative of each cell is a random member
+    order = rng.permutation(np.flatnonzero(~chosen))
+    _, first = np.unique(_grid_cells(x[order], y[order]), return_index=True)
+    budget = limit - len(outliers)
+    chosen[order[np.sort(first)[:budget]]] = True
+
+    remaining = limit - int(chosen.sum())
+    if remaining > 0:
+        rest = order[~chosen[order]]
+        chosen[rest[:remaining]] = True
+    return np.flatnonzero(chosen)
+
+
+def _binned_figure(df, x, y, title, labels, limit):
+    """2-D histogram of product counts, with outliers drawn as individual markers"""
+    x_values = df[x].to_numpy(dtype=float)
+    y_values = df[y].to_numpy(dtype=float)
+    valid = ~(np.isnan(x_values) | np.isnan(y_values))
+    x_range, y_range = _axis_bounds(x_values[valid]), _axis_bounds(y_values[valid])
+    counts, x_edges, y_edges = np.histogram2d(
+        np.clip(x_values[valid], *x_range), np.clip(y_values[valid], *y_range),
+        bins=GRID_BINS, range=[x_range, y_range]
+    )
+
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=np.where(counts.T > 0, counts.T, np.nan),
+        colorscale='Blues',
+        colorbar=dict(title='Products'),
+        hovertemplate=f"{labels.get(x, x)}: %{{x}}<br>{labels.get(y, y)}: %{{y}}<br>Products: %{{z}}<extra></extra>"
+    ))
+
+    outliers = df.iloc[np.flatnonzero(valid)[outlier_positions(x_values[valid], y_values[valid], limit)]]
+    hover = outliers['Description'] if 'Description' in outliers.columns else None
+    fig.add_trace(go.Scattergl(
+        x=outliers[x], y=outliers[y], mode='markers', name='Outliers',
+        marker=dict(color='#ef4444', size=5), text=hover,
+        hovertemplate="%{text}<br>%{x}, %{y}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f"{title} - {len(df):,} products binned",
+        xaxis_title=labels.get(x, x),
+        yaxis_title=labels.get(y, y)
+    )
+    return fig
+
+
+def scatter_figure(df, x, y, title, labels=None, limit=None, mode=None, **scatter_args):
+    """px.scatter for catalogs up to `limit` products, a bounded WebGL view above it.
+
+    Small catalogs get exactly the figure px.scatter would build. Larger ones
+    are either sampled (every outlier, every occupied region, then a uniform
+    sample) or binned into a 2-D histogram, so the payload stays bounded no
+    matter how many products there are.
+    """
+    labels = labels or {}
+    limit = SCATTER_POINT_LIMIT if limit is None else limit
+    mode = mode or SCATTER_MODE
+    # Checked before the size so a misspelled mode fails on small catalogs too
+    if mode not in SCATTER_MODES:
+        raise ValueError(f"Unknown scatter mode: {mode}")
+    if len(df) <= limit:
+        return px.scatter(df, x=x, y=y, title=title, labels=labels, **scatter_args)
+
+    if mode == 'bin':
+        return _binned_figure(df, x, y, title, labels, limit)
+
+    x_values = df[x].to_numpy(dtype=float)
+    y_values = df[y].to_numpy(dtype=float)
+    positions = sample_positions(x_values, y_values, limit)
+    return px.scatter(
+        df.iloc[positions], x=x, y=y, labels=labels, render_mode='webgl',
+        title=f"{title} - {len(positions):,} of {len(df):,} products (sampled, outliers kept)",
+        **scatter_args
+    )
@@ -0,0 +1,145 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from categories import rules_fingerprint
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Shared tables sit alongside the parsed-data cache unless told otherwise
+SHARED_DIR = os.environ.get('SHARED_DATA_DIR', os.environ.get('SALES_CACHE_DIR', '.data_cache'))
+
+# Bump whenever the layout of published tables changes
+SHARED_VERSION = 1
+
+
+def _string_dtype():
+    """Arrow-backed string dtype with NaN missing values, if this pandas has one"""
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except (TypeError, ImportError):
+        return None
+
+
+def write_table(df, path):
+    """Write a frame as an uncompressed Arrow IPC file that can be memory-mapped.
+
+    Float columns are written with NaN kept as a value rather than turned into
+    nulls, so mapping them back into pandas needs no copy.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, name in enumerate(table.column_names):
+        if pd.api.types.is_float_dtype(df[name].dtype):
+            table = table.set_column(i, name, pa.array(df[name].to_numpy(dtype=float), type=pa.float64()))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def map_table(path):
+    """Memory-map an Arrow IPC file read-only and view it as a DataFrame.
+
+    Numeric columns without nulls and string columns stay backed by the
+    mapped file, so every process attaching the same file shares its pages.
+    """
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    string_dtype = _string_dtype()
+    mapping = {pa.string(): string_dtype, pa.large_string(): string_dtype} if string_dtype else {}
+    return table.to_pandas(split_blocks=True, types_mapper=mapping.get)
+
+
+def source_key(paths):
+    """Short key for a set of source paths, independent of their contents"""
+    joined = '|'.join(os.path.abspath(path) for path in paths)
+    return hashlib.sha1(joined.encode('utf-8')).hexdigest()[:8]
+
+
+def source_version(paths):
+    """Fingerprint a set of source files by path, size and mtime, plus the
+    cleaning and category rules that turned them into the published tables.
+
+    The version starts with the paths' ``source_key``, so tables published
+    from different exports can share a directory.
+    """
+    # Imported here because sales_data imports this module
+    from sales_data import CACHE_VERSION
+    parts = [str(SHARED_VERSION), str(CACHE_VERSION), rules_fingerprint()]
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{os.path.abspath(path)}:missing")
+    digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+    return f"{source_key(paths)}-{digest}"
+
+
+def source_mtime(paths):
+    """Newest modification time among the source files, as a UTC datetime (None if none exist)"""
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime)
+        except OSError:
+            pass
+    return datetime.fromtimestamp(int(max(mtimes)), timezone.utc) if mtimes else None
+
+
+class SharedTables:
+    """Named tables materialized once per source version and mapped by every process"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or SHARED_DIR
+
+    @property
+    def available(self):
+        return pa is not None
+
+    def _path(self, name, version):
+        return os.path.join(self.directory, f"{name}.{version}.arrow")
+
+    def publish(self, name, df, version):
+        """Materialize a table for a source version; older versions of the same sources are removed"""
+        if not self.available:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name, version)
+        write_table(df, path)
+
+        # Only versions published from the same source paths are superseded; processes
+        # that still map an old file keep their pages until they unmap it
+        prefix = f"{name}.{version.split('-', 1)[0]}-"
+        for entry in os.listdir(self.directory):
+            if entry.startswith(prefix) and entry.endswith('.arrow') and \
+                    os.path.join(self.directory, entry) != path:
+                try:
+                    os.remove(os.path.join(self.directory, entry))
+                except OSError:
+                    pass
+        return path
+
+    def attach(self, name, version):
+        """Map a published table, or return None if it has not been materialized"""
+        if not self.available:
+            return None
+        path = self._path(name, version)
+        if not os.path.exists(path):
+            return None
+        try:
+            return map_table(path)
+        except Exception as e:
+            print(f"Could not map shared table {path}: {e}")
+            return None
+
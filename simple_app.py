@@ -1,42 +1,105 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import plotly.utils
 import json
+import os
 import numpy as np
 from datetime import datetime
+from sales_data import load_sales_data, SALES_CSV
+from categories import categorize_descriptions
+from chart_cache import ChartCache, encode_figure, ENCODINGS
+from request_timing import RequestTimings
+from sales_store import SalesStore, register_store_routes
+from scatter_charts import scatter_figure
+from histogram_charts import histogram_figure, HISTOGRAM_BINNING, BINNING_METHODS
+from reloader import SnapshotReloader, file_signature
+from shared_data import SharedTables, source_version, source_mtime
+from product_index import ProductIndex
+from query_index import SalesQueryIndex, INDEXED_COLUMNS
+from warehouse_data import derive_warehouse_columns, create_sample_warehouse_data, WAREHOUSE_CSV
 import warnings
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
 
+# Per-route latency, payload size and cache hit ratios at /api/debug/timings
+timings = RequestTimings(app)
+
+# Date-range metrics over the partitioned export store (sales_store.py)
+register_store_routes(app, SalesStore())
+
+# Cleaned tables shared read-only by every worker process on this host
+shared_tables = SharedTables()
+
 class SimpleSalesDashboard:
-    def __init__(self):
+    def __init__(self, sales_csv=SALES_CSV, warehouse_csv=WAREHOUSE_CSV):
+        self.sales_csv = sales_csv
+        self.warehouse_csv = warehouse_csv
         self.df = None
         self.warehouse_df = None
         self.insights = {}
         self.warehouse_insights = {}
-        self.load_data()
-        self.load_warehouse_data()
+        self.source_version = source_version([self.sales_csv, self.warehouse_csv])
+        # Rebuilt with the data, so cached payloads never outlive it
+        self.chart_cache = ChartCache(source_mtime([self.sales_csv, self.warehouse_csv]))
+        self.product_index = None
+        self.query_index = None
+        if not self.attach_shared_tables():
+            self.load_data()
+            self.load_warehouse_data()
+            self.publish_shared_tables()
+        self.build_product_index()
+        self.build_query_index()
+    
+    def attach_shared_tables(self):
+        """Map the cleaned tables read-only if another process already materialized them"""
+        df = shared_tables.attach('sales', self.source_version)
+        warehouse_df = shared_tables.attach('warehouse', self.source_version)
+        if df is None or warehouse_df is None:
+            return False
+        
+        self.df = df
+        self.warehouse_df = warehouse_df
+        self.generate_insights()
+        self.generate_warehouse_insights()
+        print(f"Attached shared data tables ({len(df)} products)")
+        return True
+    
+    def publish_shared_tables(self):
+        """Materialize the cleaned tables once so other workers can map them"""
+        if self.df is None or self.warehouse_df is None:
+            return
+        try:
+            shared_tables.publish('sales', self.df, self.source_version)
+            shared_tables.publish('warehouse', self.warehouse_df, self.source_version)
+        except Exception as e:
+            print(f"Could not publish shared data tables: {e}")
+    
+    def build_product_index(self):
+        """Join warehouse rows to sales rows once, by ID first and description last"""
+        if self.df is None or self.warehouse_df is None:
+            return
+        try:
+            self.product_index = ProductIndex(self.df, self.warehouse_df)
+            print(self.product_index.summary())
+        except Exception as e:
+            print(f"Error building product index: {str(e)}")
+    
+    def build_query_index(self):
+        """Presort the filterable columns once so /api/query never scans the catalog"""
+        if self.df is None:
+            return
+        try:
+            self.query_index = SalesQueryIndex(self.df)
+        except Exception as e:
+            print(f"Error building query index: {str(e)}")
     
     def load_data(self):
         """Load and prepare the data"""
         try:
-            # Load CSV data
-            self.df = pd.read_csv('reports_sales_listings_item.csv')
-            
-            # Clean column names
-            self.df.columns = self.df.columns.str.strip().str.replace('"', '')
-            
-            # Clean numeric data
-            numeric_columns = ['Stock', 'Sold', 'Subtotal', 'Discounts', 'Subtotal w/ Discounts', 
-                              'Total', 'Cost', 'Profit', 'Margin']
-            
-            for col in numeric_columns:
-                if col in self.df.columns:
-                    self.df[col] = self.df[col].astype(str).str.replace('$', '').str.replace('%', '').str.replace(',', '')
-                    self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+            # Load cleaned CSV data (served from the typed cache when unchanged)
+            self.df = load_sales_data(self.sales_csv)
             
             # Create categories
             self.df['Category'] = self.categorize_products(self.df['Description'])
@@ -50,7 +113,7 @@ class SimpleSalesDashboard:
         try:
             # Try to load the warehouse CSV file
             try:
-                self.warehouse_df = pd.read_csv('_Inventory Planning Settings 20250627.csv')
+                self.warehouse_df = pd.read_csv(self.warehouse_csv)
                 print("Successfully loaded warehouse CSV file")
                 
                 # Map the actual CSV columns to expected column names
@@ -100,59 +163,8 @@ class SimpleSalesDashboard:
                 if 'Last_Updated' not in self.warehouse_df.columns:
                     self.warehouse_df['Last_Updated'] = datetime.now().strftime('%Y-%m-%d')
                 
-                # Calculate derived columns with proper error handling
-                def calculate_stock_status(row):
-                    try:
-                        current = float(row['Current_Stock'])
-                        reorder = float(row['Reorder_Point'])
-                        max_stock = float(row.get('Max_Stock', current + 1))
-                        
-                        if current <= reorder:
-                            return 'Low'
-                        elif current <= max_stock:
-                            return 'Adequate'
-                        else:
-                            return 'Overstocked'
-                    except:
-                        return 'Unknown'
-                
-                self.warehouse_df['Stock_Status'] = self.warehouse_df.apply(calculate_stock_status, axis=1)
-                
-                def calculate_restock_needed(row):
-                    try:
-                        return float(row['Current_Stock']) <= float(row['Reorder_Point'])
-                    except:
-                        return False
-                
-                self.warehouse_df['Restock_Needed'] = self.warehouse_df.apply(calculate_restock_needed, axis=1)
-                
-                # Calculate days until stockout (simplified calculation)
-                def calculate_days_until_stockout(row):
-                    try:
-                        current = float(row['Current_Stock'])
-                        reorder = float(row['Reorder_Point'])
-                        if current == 0:
-                            return 999
-                        return int(current / max(1, reorder / 30))
-                    except:
-                        return 999
-                
-                self.warehouse_df['Days_Until_Stockout'] = self.warehouse_df.apply(calculate_days_until_stockout, axis=1)
-                
-                # Add monthly and annual demand estimates
-                self.warehouse_df['Monthly_Demand'] = self.warehouse_df['Reorder_Point'] * 2  # Estimate
-                self.warehouse_df['Annual_Demand'] = self.warehouse_df['Monthly_Demand'] * 12
-                
-                # Calculate stock turnover
-                def calculate_stock_turnover(row):
-                    try:
-                        monthly_demand = float(row['Monthly_Demand'])
-                        current_stock = float(row['Current_Stock'])
-                        return monthly_demand / max(1, current_stock)
-                    except:
-                        return 0
-                
-                self.warehouse_df['Stock_Turnover'] = self.warehouse_df.apply(calculate_stock_turnover, axis=1)
+                # Calculate derived columns as whole-column array expressions
+                derive_warehouse_columns(self.warehouse_df)
                 
                 print(f"Successfully processed warehouse data with {len(self.warehouse_df)} products")
                 
@@ -171,60 +183,12 @@ class SimpleSalesDashboard:
         """Create sample warehouse data based on sales data"""
         print("Creating sample warehouse data...")
         
-        # Create warehouse data based on existing sales data
-        warehouse_data = []
-        
-        for _, row in self.df.iterrows():
-            # Calculate warehouse metrics based on sales data
-            current_stock = max(0, row['Stock'])
-            reorder_point = max(1, int(row['Sold'] * 0.2))  # 20% of sales as reorder point
-            lead_time_days = np.random.randint(7, 30)  # Random lead time 7-30 days
-            safety_stock = max(1, int(row['Sold'] * 0.1))  # 10% of sales as safety stock
-            max_stock = reorder_point + safety_stock + int(row['Sold'] * 0.5)  # Max stock level
-            
-            warehouse_data.append({
-                'Product_ID': row.get('System ID', f'PROD_{len(warehouse_data)}'),
-                'Product_Name': row['Description'],
-                'Category': row['Category'],
-                'Current_Stock': current_stock,
-                'Reorder_Point': reorder_point,
-                'Lead_Time_Days': lead_time_days,
-                'Safety_Stock': safety_stock,
-                'Max_Stock': max_stock,
-                'Warehouse_Location': np.random.choice(['A1', 'A2', 'B1', 'B2', 'C1', 'C2']),
-                'Supplier': np.random.choice(['Supplier A', 'Supplier B', 'Supplier C', 'Supplier D']),
-                'Last_Updated': datetime.now().strftime('%Y-%m-%d'),
-                'Stock_Status': 'Low' if current_stock <= reorder_point else 'Adequate' if current_stock <= max_stock else 'Overstocked',
-                'Restock_Needed': current_stock <= reorder_point,
-                'Days_Until_Stockout': int(current_stock / (row['Sold'] / 365)) if row['Sold'] > 0 else 999,
-                'Monthly_Demand': row['Sold'],
-                'Annual_Demand': row['Sold'] * 12,
-                'Stock_Turnover': row['Sold'] / current_stock if current_stock > 0 else 0
-            })
-        
-        self.warehouse_df = pd.DataFrame(warehouse_data)
-        print(f"Created sample warehouse data with {len(warehouse_data)} products")
+        self.warehouse_df = create_sample_warehouse_data(self.df)
+        print(f"Created sample warehouse data with {len(self.warehouse_df)} products")
     
     def categorize_products(self, descriptions):
         """Categorize products based on description"""
-        categories = []
-        for desc in descriptions:
-            desc_lower = str(desc).lower()
-            if any(word in desc_lower for word in ['vibrator', 'rabbit', 'bullet', 'wand']):
-                categories.append('Vibrators')
-            elif any(word in desc_lower for word in ['supplement', 'rhino', 'mood', 'male', 'female']):
-                categories.append('Supplements')
-            elif any(word in desc_lower for word in ['lube', 'lubricant', 'gel', 'oil']):
-                categories.append('Lubricants')
-            elif any(word in desc_lower for word in ['dress', 'lingerie', 'bra', 'panty', 'stocking', 'heels', 'shoes']):
-                categories.append('Clothing & Accessories')
-            elif any(word in desc_lower for word in ['dildo', 'plug', 'ring', 'harness', 'restraint']):
-                categories.append('Adult Toys')
-            elif any(word in desc_lower for word in ['cleaner', 'clean', 'charger', 'battery']):
-                categories.append('Accessories')
-            else:
-                categories.append('Other')
-        return categories
+        return categorize_descriptions(descriptions)
     
     def map_warehouse_category(self, warehouse_category):
         """Map warehouse category names to match sales categories"""
@@ -328,6 +292,20 @@ class SimpleSalesDashboard:
         category_summary.columns = ['_'.join(col).strip() for col in category_summary.columns]
         return category_summary
     
+    def query_products(self, categories=None, ranges=None, sort='-Total', limit=50):
+        """Rows matching the filters, sorted and limited, with totals over every match"""
+        descending = sort.startswith('-')
+        positions = self.query_index.filter_positions(categories, ranges)
+        top = self.query_index.sorted_positions(positions, sort.lstrip('-'), limit, descending)
+        
+        rows = self.df.take(top)[QUERY_COLUMNS].round(2)
+        # NaN is not valid JSON; send missing values as null
+        rows = rows.astype(object).where(rows.notna(), None)
+        return {
+            'totals': self.query_index.totals(positions),
+            'rows': rows.to_dict('records')
+        }
+    
     def get_warehouse_summary(self):
         """Get warehouse summary data - limited to top categories by revenue"""
         if self.warehouse_df is not None:
@@ -363,24 +341,12 @@ class SimpleSalesDashboard:
     
     def get_restock_alerts(self):
         """Get top 15 products that need restocking - prioritized by revenue and urgency"""
-        if self.warehouse_df is not None:
-            # Get top revenue products from sales data
-            top_revenue_products = self.df.nlargest(100, 'Total')['Description'].tolist()
-            
-            # Filter warehouse data to include only top revenue products
-            filtered_warehouse = self.warehouse_df[
-                self.warehouse_df['Product_Name'].isin(top_revenue_products)
-            ]
+        if self.warehouse_df is not None and self.product_index is not None:
+            # Warehouse rows of the top revenue products, with their sales revenue
+            filtered_warehouse = self.product_index.top_product_rows()
             
             # Get products that need restocking, sorted by urgency and revenue
-            restock_alerts = filtered_warehouse[filtered_warehouse['Restock_Needed'] == True].copy()
-            
-            # Add revenue information from sales data
-            restock_alerts = restock_alerts.merge(
-                self.df[['Description', 'Total']].rename(columns={'Description': 'Product_Name'}),
-                on='Product_Name',
-                how='left'
-            ).fillna(0)
+            restock_alerts = filtered_warehouse[filtered_warehouse['Restock_Needed'] == True].fillna(0)
             
             # Sort by urgency (days until stockout) and revenue, then take top 15
             restock_alerts = restock_alerts.sort_values(['Days_Until_Stockout', 'Total'], ascending=[True, False])
@@ -405,14 +371,9 @@ class SimpleSalesDashboard:
     
     def get_warehouse_locations(self):
         """Get warehouse location summary - limited to top locations"""
-        if self.warehouse_df is not None:
-            # Get top revenue products
-            top_revenue_products = self.df.nlargest(100, 'Total')['Description'].tolist()
-            
-            # Filter warehouse data to include only top revenue products
-            filtered_warehouse = self.warehouse_df[
-                self.warehouse_df['Product_Name'].isin(top_revenue_products)
-            ]
+        if self.warehouse_df is not None and self.product_index is not None:
+            # Warehouse rows of the top revenue products
+            filtered_warehouse = self.product_index.top_product_rows()
             
             location_summary = filtered_warehouse.groupby('Warehouse_Location').agg({
                 'Current_Stock': 'sum',
@@ -436,24 +397,23 @@ class SimpleSalesDashboard:
             return location_dict
         return {}
     
-    def create_margin_distribution_chart(self):
+    def create_margin_distribution_chart(self, binning=None):
         """Create margin distribution histogram"""
-        fig = px.histogram(
-            self.df,
-            x='Margin',
-            nbins=30,
+        # Binned here so only the bin edges and counts are sent, not every margin
+        fig = histogram_figure(
+            self.df['Margin'],
             title="Profit Margin Distribution",
-            labels={'Margin': 'Profit Margin (%)', 'count': 'Number of Products'},
-            color_discrete_sequence=['#667eea']
+            x_label='Profit Margin (%)',
+            bins=30,
+            method=binning,
+            color='#667eea'
         )
-        fig.add_vline(x=self.df['Margin'].mean(), line_dash="dash", line_color="red",
-                     annotation_text=f"Mean: {self.df['Margin'].mean():.1f}%")
         fig.update_layout(
             title_x=0.5,
             title_font_size=16,
             showlegend=False
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_revenue_by_category_chart(self):
         """Create revenue distribution by category"""
@@ -468,7 +428,7 @@ class SimpleSalesDashboard:
             title_x=0.5,
             title_font_size=16
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_top_products_chart(self):
         """Create top products by revenue chart"""
@@ -487,7 +447,7 @@ class SimpleSalesDashboard:
             title_font_size=16,
             yaxis={'categoryorder':'total ascending'}
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_stock_vs_sales_chart(self):
         """Create stock vs sales scatter plot"""
@@ -495,7 +455,7 @@ class SimpleSalesDashboard:
         df_filtered = self.df.copy()
         df_filtered['Total_abs'] = df_filtered['Total'].abs()
         
-        fig = px.scatter(
+        fig = scatter_figure(
             df_filtered,
             x='Sold',
             y='Stock',
@@ -509,7 +469,7 @@ class SimpleSalesDashboard:
             title_x=0.5,
             title_font_size=16
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_profit_margin_by_category_chart(self):
         """Create average profit margin by category"""
@@ -527,7 +487,7 @@ class SimpleSalesDashboard:
             title_font_size=16,
             showlegend=False
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_revenue_vs_margin_chart(self):
         """Create revenue vs margin scatter plot"""
@@ -535,7 +495,7 @@ class SimpleSalesDashboard:
         df_filtered = self.df.copy()
         df_filtered['Sold_abs'] = df_filtered['Sold'].abs()
         
-        fig = px.scatter(
+        fig = scatter_figure(
             df_filtered,
             x='Margin',
             y='Total',
@@ -549,7 +509,7 @@ class SimpleSalesDashboard:
             title_x=0.5,
             title_font_size=16
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     def create_category_performance_chart(self):
         """Create category performance comparison"""
@@ -582,7 +542,7 @@ class SimpleSalesDashboard:
             yaxis2=dict(title="Units Sold", overlaying="y", side="right"),
             barmode='group'
         )
-        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        return encode_figure(fig)
     
     # Warehouse-specific charts
     def create_warehouse_stock_status_chart(self):
@@ -600,19 +560,14 @@ class SimpleSalesDashboard:
                 title_x=0.5,
                 title_font_size=16
             )
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return encode_figure(fig)
         return json.dumps({})
     
     def create_warehouse_location_chart(self):
         """Create warehouse location chart - focused on top locations"""
-        if self.warehouse_df is not None:
-            # Get top revenue products
-            top_revenue_products = self.df.nlargest(100, 'Total')['Description'].tolist()
-            
-            # Filter warehouse data to include only top revenue products
-            filtered_warehouse = self.warehouse_df[
-                self.warehouse_df['Product_Name'].isin(top_revenue_products)
-            ]
+        if self.warehouse_df is not None and self.product_index is not None:
+            # Warehouse rows of the top revenue products
+            filtered_warehouse = self.product_index.top_product_rows()
             
             location_data = filtered_warehouse.groupby('Warehouse_Location').agg({
                 'Current_Stock': 'sum',
@@ -636,29 +591,17 @@ class SimpleSalesDashboard:
                 title_font_size=16,
                 height=500
             )
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return encode_figure(fig)
         return json.dumps({})
     
     def create_restock_urgency_chart(self):
         """Create restock urgency chart - top 15 products by urgency and revenue"""
-        if self.warehouse_df is not None:
-            # Get top revenue products from sales data
-            top_revenue_products = self.df.nlargest(100, 'Total')['Description'].tolist()
-            
-            # Filter warehouse data to include only top revenue products
-            filtered_warehouse = self.warehouse_df[
-                self.warehouse_df['Product_Name'].isin(top_revenue_products)
-            ]
+        if self.warehouse_df is not None and self.product_index is not None:
+            # Warehouse rows of the top revenue products, with their sales revenue
+            filtered_warehouse = self.product_index.top_product_rows()
             
             # Filter products that need restocking
-            restock_data = filtered_warehouse[filtered_warehouse['Restock_Needed'] == True].copy()
-            
-            # Add revenue information
-            restock_data = restock_data.merge(
-                self.df[['Description', 'Total']].rename(columns={'Description': 'Product_Name'}),
-                on='Product_Name',
-                how='left'
-            ).fillna(0)
+            restock_data = filtered_warehouse[filtered_warehouse['Restock_Needed'] == True].fillna(0)
             
             # Sort by urgency and revenue, take top 15
             restock_data = restock_data.sort_values(['Days_Until_Stockout', 'Total'], ascending=[True, False]).head(15)
@@ -683,19 +626,14 @@ class SimpleSalesDashboard:
                 yaxis={'categoryorder':'total ascending'},
                 height=600  # Increase height for better visibility
             )
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return encode_figure(fig)
         return json.dumps({})
     
     def create_supplier_analysis_chart(self):
         """Create supplier analysis chart - focused on top suppliers"""
-        if self.warehouse_df is not None:
-            # Get top revenue products
-            top_revenue_products = self.df.nlargest(100, 'Total')['Description'].tolist()
-            
-            # Filter warehouse data to include only top revenue products
-            filtered_warehouse = self.warehouse_df[
-                self.warehouse_df['Product_Name'].isin(top_revenue_products)
-            ]
+        if self.warehouse_df is not None and self.product_index is not None:
+            # Warehouse rows of the top revenue products
+            filtered_warehouse = self.product_index.top_product_rows()
             
             supplier_data = filtered_warehouse.groupby('Supplier').agg({
                 'Current_Stock': 'sum',
@@ -729,117 +667,149 @@ class SimpleSalesDashboard:
                 barmode='group',
                 height=500
             )
-            return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+            return encode_figure(fig)
         return json.dumps({})
 
-# Initialize dashboard
-dashboard = SimpleSalesDashboard()
+def build_dashboard():
+    """Build a complete dashboard snapshot, refusing to replace good data with a failed load"""
+    snapshot = SimpleSalesDashboard()
+    if snapshot.df is None or not snapshot.insights:
+        raise RuntimeError("sales data could not be loaded")
+    return snapshot
+
+# Initialize dashboard and rebuild it in the background whenever an export changes.
+# The files are signed before the first load, so one replaced during it still reloads.
+initial_signature = file_signature([SALES_CSV, WAREHOUSE_CSV])
+reloader = SnapshotReloader(
+    build_dashboard,
+    [SALES_CSV, WAREHOUSE_CSV],
+    interval=float(os.environ.get('DASHBOARD_RELOAD_INTERVAL', '5')),
+    initial=SimpleSalesDashboard(),
+    signature=initial_signature
+).start()
 
 @app.route('/')
 def index():
     """Main dashboard page"""
     return render_template('dashboard_pro.html')
 
+def data_response(current, name):
+    """Serve one of the BOOTSTRAP_DATA payloads, encoded and compressed once per snapshot"""
+    return current.chart_cache.response(f'data:{name}', lambda: app.json.dumps(BOOTSTRAP_DATA[name](current)))
+
 @app.route('/api/metrics')
 def get_metrics():
     """API endpoint for key metrics"""
-    return jsonify(dashboard.insights)
+    current = reloader.current()
+    return data_response(current, 'metrics')
 
 @app.route('/api/warehouse/metrics')
 def get_warehouse_metrics():
     """API endpoint for warehouse metrics"""
-    return jsonify(dashboard.warehouse_insights)
+    current = reloader.current()
+    return data_response(current, 'warehouse-metrics')
 
 @app.route('/api/data/top-products')
 def get_top_products_data():
     """API endpoint for top products data"""
-    return jsonify(dashboard.get_top_products_data().to_dict('records'))
+    current = reloader.current()
+    return data_response(current, 'top-products')
 
 @app.route('/api/data/negative-margin')
 def get_negative_margin_data():
     """API endpoint for negative margin data"""
-    return jsonify(dashboard.get_negative_margin_data().to_dict('records'))
+    current = reloader.current()
+    return data_response(current, 'negative-margin')
 
 @app.route('/api/data/category-summary')
 def get_category_summary_data():
     """API endpoint for category summary data"""
-    return jsonify(dashboard.get_category_summary().to_dict('index'))
+    current = reloader.current()
+    return data_response(current, 'category-summary')
 
 @app.route('/api/data/warehouse-summary')
 def get_warehouse_summary_data():
     """API endpoint for warehouse summary data"""
-    return jsonify(dashboard.get_warehouse_summary())
+    current = reloader.current()
+    return data_response(current, 'warehouse-summary')
 
 @app.route('/api/data/restock-alerts')
 def get_restock_alerts_data():
     """API endpoint for restock alerts data"""
-    return jsonify(dashboard.get_restock_alerts())
+    current = reloader.current()
+    return data_response(current, 'restock-alerts')
 
 @app.route('/api/data/warehouse-locations')
 def get_warehouse_locations_data():
     """API endpoint for warehouse locations data"""
-    return jsonify(dashboard.get_warehouse_locations())
+    current = reloader.current()
+    return data_response(current, 'warehouse-locations')
 
 @app.route('/api/charts/margin-distribution')
 def get_margin_distribution_chart():
     """API endpoint for margin distribution chart"""
+    current = reloader.current()
+    binning = request.args.get('binning', HISTOGRAM_BINNING)
+    if binning not in BINNING_METHODS:
+        return jsonify({'error': f"Unknown binning: {binning}"}), 400
     try:
-        chart_data = dashboard.create_margin_distribution_chart()
-        return jsonify(json.loads(chart_data))
+        # The default binning shares its cache entry with /api/bootstrap
+        return current.chart_cache.response(chart_cache_name('margin-distribution', binning),
+                                            lambda: current.create_margin_distribution_chart(binning))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/revenue-by-category')
 def get_revenue_by_category_chart():
     """API endpoint for revenue by category chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_revenue_by_category_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('revenue-by-category', current.create_revenue_by_category_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/top-products-chart')
 def get_top_products_chart():
     """API endpoint for top products chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_top_products_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('top-products-chart', current.create_top_products_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/stock-vs-sales')
 def get_stock_vs_sales_chart():
     """API endpoint for stock vs sales chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_stock_vs_sales_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('stock-vs-sales', current.create_stock_vs_sales_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/profit-margin-by-category')
 def get_profit_margin_by_category_chart():
     """API endpoint for profit margin by category chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_profit_margin_by_category_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('profit-margin-by-category', current.create_profit_margin_by_category_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/revenue-vs-margin')
 def get_revenue_vs_margin_chart():
     """API endpoint for revenue vs margin chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_revenue_vs_margin_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('revenue-vs-margin', current.create_revenue_vs_margin_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/category-performance')
 def get_category_performance_chart():
     """API endpoint for category performance chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_category_performance_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('category-performance', current.create_category_performance_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -847,43 +817,203 @@ def get_category_performance_chart():
 @app.route('/api/charts/warehouse-stock-status')
 def get_warehouse_stock_status_chart():
     """API endpoint for warehouse stock status chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_warehouse_stock_status_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('warehouse-stock-status', current.create_warehouse_stock_status_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/warehouse-location')
 def get_warehouse_location_chart():
     """API endpoint for warehouse location chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_warehouse_location_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('warehouse-location', current.create_warehouse_location_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/restock-urgency')
 def get_restock_urgency_chart():
     """API endpoint for restock urgency chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_restock_urgency_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('restock-urgency', current.create_restock_urgency_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/charts/supplier-analysis')
 def get_supplier_analysis_chart():
     """API endpoint for supplier analysis chart"""
+    current = reloader.current()
     try:
-        chart_data = dashboard.create_supplier_analysis_chart()
-        return jsonify(json.loads(chart_data))
+        return current.chart_cache.response('supplier-analysis', current.create_supplier_analysis_chart)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Columns /api/query returns for each matching product
+QUERY_COLUMNS = ['Description', 'Category', 'Sold', 'Stock', 'Total', 'Margin', 'Profit']
+
+# Range filters /api/query accepts, as ?min_<name>=&max_<name>=
+QUERY_RANGES = {'total': 'Total', 'margin': 'Margin', 'stock': 'Stock'}
+
+QUERY_MAX_LIMIT = 1000
+
+def parse_query_args(args):
+    """Turn /api/query arguments into query_products keyword arguments"""
+    categories = [name.strip() for value in args.getlist('category')
+                  for name in value.split(',') if name.strip()] or None
+    
+    ranges = {}
+    for name, column in QUERY_RANGES.items():
+        low, high = args.get(f'min_{name}'), args.get(f'max_{name}')
+        if low is None and high is None:
+            continue
+        try:
+            ranges[column] = (float(low) if low is not None else None,
+                              float(high) if high is not None else None)
+        except ValueError:
+            raise ValueError(f"min_{name} and max_{name} must be numbers")
+    
+    sort = args.get('sort', '-Total')
+    if sort.lstrip('-') not in INDEXED_COLUMNS:
+        raise ValueError(f"Cannot sort by {sort.lstrip('-')}")
+    
+    try:
+        limit = int(args.get('limit', 50))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 0 <= limit <= QUERY_MAX_LIMIT:
+        raise ValueError(f"limit must be between 0 and {QUERY_MAX_LIMIT}")
+    
+    return {'categories': categories, 'ranges': ranges, 'sort': sort, 'limit': limit}
+
+@app.route('/api/query')
+def query_products():
+    """API endpoint for filtered, sorted product rows plus totals over all matches"""
+    current = reloader.current()
+    if current.query_index is None:
+        return jsonify({'error': 'Sales data is not loaded'}), 503
+    try:
+        query = parse_query_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Too varied to keep, but still compressed and revalidated against the snapshot
+    return current.chart_cache.response('query:' + request.query_string.decode('utf-8'),
+                                        lambda: app.json.dumps(current.query_products(**query)),
+                                        store=False)
+
+# Payloads /api/bootstrap can batch, keyed by the slug of their standalone route
+BOOTSTRAP_DATA = {
+    'metrics': lambda d: d.insights,
+    'warehouse-metrics': lambda d: d.warehouse_insights,
+    'top-products': lambda d: d.get_top_products_data().to_dict('records'),
+    'negative-margin': lambda d: d.get_negative_margin_data().to_dict('records'),
+    'category-summary': lambda d: d.get_category_summary().to_dict('index'),
+    'warehouse-summary': lambda d: d.get_warehouse_summary(),
+    'restock-alerts': lambda d: d.get_restock_alerts(),
+    'warehouse-locations': lambda d: d.get_warehouse_locations()
+}
+
+BOOTSTRAP_CHARTS = {
+    'margin-distribution': 'create_margin_distribution_chart',
+    'revenue-by-category': 'create_revenue_by_category_chart',
+    'top-products-chart': 'create_top_products_chart',
+    'stock-vs-sales': 'create_stock_vs_sales_chart',
+    'profit-margin-by-category': 'create_profit_margin_by_category_chart',
+    'revenue-vs-margin': 'create_revenue_vs_margin_chart',
+    'category-performance': 'create_category_performance_chart',
+    'warehouse-stock-status': 'create_warehouse_stock_status_chart',
+    'warehouse-location': 'create_warehouse_location_chart',
+    'restock-urgency': 'create_restock_urgency_chart',
+    'supplier-analysis': 'create_supplier_analysis_chart'
+}
+
+def chart_cache_name(name, binning=HISTOGRAM_BINNING):
+    """Cache entry of a chart; the histogram's name carries its binning"""
+    return f'{name}:{binning}' if name == 'margin-distribution' else name
+
+def render_bootstrap(current, items):
+    """Encode the requested items from one dashboard snapshot as a single JSON object"""
+    parts = []
+    for name in items:
+        try:
+            if name in BOOTSTRAP_CHARTS:
+                # Splice the cached chart bytes in without decoding them
+                payload, _ = current.chart_cache.get(chart_cache_name(name), getattr(current, BOOTSTRAP_CHARTS[name]))
+            else:
+                payload = app.json.dumps(BOOTSTRAP_DATA[name](current)).encode('utf-8')
+        except Exception as e:
+            payload = app.json.dumps({'error': str(e)}).encode('utf-8')
+        parts.append(json.dumps(name).encode('utf-8') + b':' + payload)
+    return b'{' + b','.join(parts) + b'}'
+
+@app.route('/api/bootstrap')
+def get_bootstrap():
+    """API endpoint returning many metrics, tables and charts in one response"""
+    # Resolve the snapshot once so every item comes from the same data
+    current = reloader.current()
+    requested = request.args.get('items')
+    if requested:
+        items = sorted({item.strip() for item in requested.split(',') if item.strip()})
+    else:
+        items = sorted(list(BOOTSTRAP_DATA) + list(BOOTSTRAP_CHARTS))
+    
+    unknown = [item for item in items if item not in BOOTSTRAP_DATA and item not in BOOTSTRAP_CHARTS]
+    if unknown:
+        return jsonify({'error': f"Unknown bootstrap items: {', '.join(unknown)}"}), 400
+    
+    return current.chart_cache.response('bootstrap:' + ','.join(items),
+                                        lambda: render_bootstrap(current, items))
+
+# Hooks for prefork_server.py, which imports this module once in its master process
+
+def prefork_prepare():
+    """Render and compress every payload in the master, so forked workers inherit them"""
+    # The master polls through prefork_check instead; no threads may run across fork()
+    reloader.stop()
+    current = reloader.current()
+    renderers = {chart_cache_name(name): getattr(current, method) for name, method in BOOTSTRAP_CHARTS.items()}
+    renderers.update({f'data:{name}': (lambda name=name: app.json.dumps(BOOTSTRAP_DATA[name](current)))
+                      for name in BOOTSTRAP_DATA})
+    # The default /api/bootstrap response, spliced from the charts warmed above
+    items = sorted(list(BOOTSTRAP_DATA) + list(BOOTSTRAP_CHARTS))
+    renderers['bootstrap:' + ','.join(items)] = lambda: render_bootstrap(current, items)
+    for name, render in renderers.items():
+        try:
+            current.chart_cache.warm({name: render}, ENCODINGS)
+        except Exception as e:
+            print(f"Could not pre-render {name}: {e}")
+
+def prefork_check():
+    """Rebuild the snapshot in the master when the exports changed"""
+    return reloader.check()
+
+def prefork_reload():
+    """Rebuild the snapshot in the master unconditionally (SIGHUP)"""
+    return reloader.reload()
+
 if __name__ == '__main__':
-    # For Replit deployment
-    app.run(
-        host='0.0.0.0',
-        port=8080,
-        debug=False  # Set to False for production
-    ) 
\ No newline at end of file
+    # Read the same way in both modes (and by prefork_server.py)
+    host = os.environ.get('WEB_HOST', '0.0.0.0')
+    port = int(os.environ.get('PORT', '8080'))
+    workers = int(os.environ.get('WEB_WORKERS', '0'))
+    if workers > 0 and hasattr(os, 'fork'):
+        # Production: pre-forked workers sharing the data this process just loaded
+        from prefork_server import PreforkServer
+        PreforkServer(
+            app,
+            host=host,
+            port=port,
+            workers=workers,
+            threads=int(os.environ.get('WEB_THREADS', '8')),
+            prepare=prefork_prepare,
+            check=prefork_check,
+            reload=prefork_reload
+        ).run()
+    else:
+        # For Replit deployment
+        app.run(
+            host=host,
+            port=port,
+            debug=False  # Set to False for production
+        ) 
\ No newline at end of file
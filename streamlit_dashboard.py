@@ -5,6 +5,14 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime
+from sales_data import load_sales_data, SALES_CSV
+from categories import categorize_descriptions
+from histogram_charts import histogram_figure
+from query_index import SalesQueryIndex
+from pareto import ParetoCurve
+from grouped_stats import price_elasticity
+from shared_data import source_version
+from sales_store import SalesStore
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -42,31 +50,61 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(max_entries=1, show_spinner="Loading sales data...")
+def load_dashboard_data(csv_file, version):
+    """Load, categorize and index the export once; shared by every rerun and session.
+
+    ``version`` changes with the file's size and mtime, so a new export is
+    picked up on the next interaction. Callers must treat the frame as read-only.
+    """
+    df = load_sales_data(csv_file)
+    df['Category'] = categorize_descriptions(df['Description'])
+    return df, SalesQueryIndex(df)
+
+@st.cache_resource(max_entries=4, show_spinner="Loading stored exports...")
+def load_store_data(start, end, version):
+    """Read and index one date range of the export store; only its partitions are mapped"""
+    df = SalesStore().read(start, end)
+    return df, SalesQueryIndex(df)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def pareto_curve(version, category, price_range, margin_range, _filtered_df):
+    """Pareto curve of one filter selection, ranked once per dataset version and filters"""
+    return ParetoCurve(_filtered_df['Total'])
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def category_elasticity(version, category, price_range, margin_range, _filtered_df):
+    """Price elasticity per category of one filter selection, from grouped sums"""
+    return price_elasticity(_filtered_df, by='Category')
+
 class StreamlitSalesDashboard:
     def __init__(self):
         self.df = None
+        self.index = None
+        self.version = None
         self.load_data()
     
     def load_data(self):
         """Load and prepare the data"""
         try:
-            # Load CSV data
-            self.df = pd.read_csv('reports_sales_listings_item.csv')
+            store = SalesStore()
+            days = store.dates()
+            if days:
+                # Daily exports have been ingested: analyze any range of them
+                first, last = (datetime.fromisoformat(day).date() for day in (days[0], days[-1]))
+                period = st.sidebar.date_input("Export Period", value=(first, last),
+                                               min_value=first, max_value=last)
+                start, end = (period[0], period[-1]) if isinstance(period, (tuple, list)) and period else (period, period)
+                if not store.dates(start, end):
+                    st.warning("No exports were stored in that period")
+                    st.stop()
+                self.version = store.version(start, end)
+                self.df, self.index = load_store_data(start, end, self.version)
+                return
             
-            # Clean column names
-            self.df.columns = self.df.columns.str.strip().str.replace('"', '')
-            
-            # Clean numeric data
-            numeric_columns = ['Stock', 'Sold', 'Subtotal', 'Discounts', 'Subtotal w/ Discounts', 
-                              'Total', 'Cost', 'Profit', 'Margin']
-            
-            for col in numeric_columns:
-                if col in self.df.columns:
-                    self.df[col] = self.df[col].astype(str).str.replace('$', '').str.replace('%', '').str.replace(',', '')
-                    self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
-            
-            # Create categories
-            self.df['Category'] = self.categorize_products(self.df['Description'])
+            # Cleaned, categorized frame and its filter index, cached across reruns
+            self.version = source_version([SALES_CSV])
+            self.df, self.index = load_dashboard_data(SALES_CSV, self.version)
             
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
@@ -74,24 +112,7 @@ class StreamlitSalesDashboard:
     
     def categorize_products(self, descriptions):
         """Categorize products based on description"""
-        categories = []
-        for desc in descriptions:
-            desc_lower = str(desc).lower()
-            if any(word in desc_lower for word in ['vibrator', 'rabbit', 'bullet', 'wand']):
-                categories.append('Vibrators')
-            elif any(word in desc_lower for word in ['supplement', 'rhino', 'mood', 'male', 'female']):
-                categories.append('Supplements')
-            elif any(word in desc_lower for word in ['lube', 'lubricant', 'gel', 'oil']):
-                categories.append('Lubricants')
-            elif any(word in desc_lower for word in ['dress', 'lingerie', 'bra', 'panty', 'stocking', 'heels', 'shoes']):
-                categories.append('Clothing & Accessories')
-            elif any(word in desc_lower for word in ['dildo', 'plug', 'ring', 'harness', 'restraint']):
-                categories.append('Adult Toys')
-            elif any(word in desc_lower for word in ['cleaner', 'clean', 'charger', 'battery']):
-                categories.append('Accessories')
-            else:
-                categories.append('Other')
-        return categories
+        return categorize_descriptions(descriptions)
     
     def run_dashboard(self):
         """Run the main dashboard"""
@@ -114,12 +135,12 @@ class StreamlitSalesDashboard:
         st.sidebar.header("🔍 Filters")
         
         # Category filter
-        categories = ['All'] + list(self.df['Category'].unique())
+        categories = ['All'] + self.index.categories
         selected_category = st.sidebar.selectbox("Select Category", categories)
         
-        # Price range filter
-        min_price = float(self.df['Total'].min())
-        max_price = float(self.df['Total'].max())
+        # Price range filter (bounds come straight from the presorted index)
+        min_price = self.index.columns['Total'].min
+        max_price = self.index.columns['Total'].max
         price_range = st.sidebar.slider(
             "Price Range ($)",
             min_value=min_price,
@@ -128,8 +149,8 @@ class StreamlitSalesDashboard:
         )
         
         # Margin filter
-        min_margin = float(self.df['Margin'].min())
-        max_margin = float(self.df['Margin'].max())
+        min_margin = self.index.columns['Margin'].min
+        max_margin = self.index.columns['Margin'].max
         margin_range = st.sidebar.slider(
             "Profit Margin Range (%)",
             min_value=min_margin,
@@ -137,19 +158,14 @@ class StreamlitSalesDashboard:
             value=(min_margin, max_margin)
         )
         
-        # Apply filters
-        filtered_df = self.df.copy()
-        if selected_category != 'All':
-            filtered_df = filtered_df[filtered_df['Category'] == selected_category]
-        
-        filtered_df = filtered_df[
-            (filtered_df['Total'] >= price_range[0]) &
-            (filtered_df['Total'] <= price_range[1]) &
-            (filtered_df['Margin'] >= margin_range[0]) &
-            (filtered_df['Margin'] <= margin_range[1])
-        ]
+        # Apply filters: binary search on the sorted indexes, then gather only matching rows
+        filtered_df = self.index.filter(
+            categories=None if selected_category == 'All' else [selected_category],
+            ranges={'Total': price_range, 'Margin': margin_range}
+        )
         
         self.filtered_df = filtered_df
+        self.filters = (selected_category, tuple(price_range), tuple(margin_range))
         
         # Show filter summary
         st.sidebar.markdown("---")
@@ -273,15 +289,12 @@ class StreamlitSalesDashboard:
         
         with col2:
             # Profit Margin Distribution
-            fig = px.histogram(
-                self.filtered_df,
-                x='Margin',
-                nbins=30,
+            fig = histogram_figure(
+                self.filtered_df['Margin'],
                 title="Profit Margin Distribution",
-                labels={'Margin': 'Profit Margin (%)', 'count': 'Number of Products'}
+                x_label='Profit Margin (%)',
+                bins=30
             )
-            fig.add_vline(x=self.filtered_df['Margin'].mean(), line_dash="dash", line_color="red",
-                         annotation_text=f"Mean: {self.filtered_df['Margin'].mean():.1f}%")
             st.plotly_chart(fig, use_container_width=True)
         
         # Revenue vs Cost Analysis
@@ -313,13 +326,11 @@ class StreamlitSalesDashboard:
         
         with col1:
             # Price Elasticity Analysis
-            price_elasticity = self.filtered_df.groupby('Category').apply(
-                lambda x: np.corrcoef(x['Total']/x['Sold'], x['Sold'])[0,1] if len(x) > 1 else 0
-            ).fillna(0)
+            elasticity = category_elasticity(self.version, *self.filters, self.filtered_df)
             
             fig = px.bar(
-                x=price_elasticity.index,
-                y=price_elasticity.values,
+                x=elasticity.index,
+                y=elasticity.values,
                 title="Price Elasticity by Category",
                 labels={'x': 'Category', 'y': 'Price Elasticity'}
             )
@@ -338,27 +349,18 @@ class StreamlitSalesDashboard:
             )
             st.plotly_chart(fig, use_container_width=True)
         
-        # Revenue Forecast (Pareto Analysis)
-        sorted_df = self.filtered_df.sort_values('Total', ascending=False)
-        cumulative_revenue = sorted_df['Total'].cumsum()
-        cumulative_percentage = (np.arange(len(cumulative_revenue)) + 1) / len(cumulative_revenue) * 100
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=cumulative_percentage,
-            y=cumulative_revenue,
-            mode='lines+markers',
-            name='Cumulative Revenue'
-        ))
-        fig.add_hline(y=cumulative_revenue.max() * 0.8, line_dash="dash", line_color="red",
-                     annotation_text="80% of Revenue")
-        
-        fig.update_layout(
-            title="Revenue Concentration (Pareto Analysis)",
-            xaxis_title="Percentage of Products (%)",
-            yaxis_title="Cumulative Revenue ($)"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        # Revenue Forecast (Pareto Analysis): downsampled curve plus exact breakpoints
+        pareto = pareto_curve(self.version, *self.filters, self.filtered_df)
+        st.plotly_chart(pareto.figure(), use_container_width=True)
+        
+        cols = st.columns(len(pareto.breakpoints))
+        for col, (level, point) in zip(cols, pareto.breakpoints.items()):
+            col.metric(
+                label=f"Products for {level}% of Revenue",
+                value=f"{point['products']:,}",
+                delta=f"{point['product_share']:.1f}% of products",
+                delta_color="off"
+            )
     
     def display_product_analysis(self):
         """Display detailed product analysis"""
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+import categories
+from categories import (CATEGORY_RULES, DEFAULT_CATEGORY, CategoryEngine, categorize_descriptions,
+                        rules_fingerprint)
+
+DESCRIPTIONS = [
+    'Rabbit Vibrator', 'WARMING GEL', 'Mood Enhancer', 'lace dress', 'COCK RING', 'Toy Cleaner',
+    'Gift Card', '',
+    # First match wins: each of these also hits a later rule
+    'Rabbit Massage Gel', 'MALE LUBE', 'Gel Cleaner', 'Ring Charger', 'Lingerie Ring',
+    # Keywords inside other words still count, as with `in`
+    'Female Oilskin', 'Bracelet', 'Unclean Bullets',
+    # Missing and non-string values are categorized by their str()
+    None, np.nan, 123, 4.5
+]
+
+
+def naive_categorize(descriptions, rules=CATEGORY_RULES, default=DEFAULT_CATEGORY):
+    """The original row-wise loop: str(desc).lower() then the first rule with any keyword"""
+    result = []
+    for desc in descriptions:
+        desc_lower = str(desc).lower()
+        for name, words in rules:
+            if any(word in desc_lower for word in words):
+                result.append(name)
+                break
+        else:
+            result.append(default)
+    return result
+
+
+def test_matches_the_row_wise_loop():
+    assert list(categorize_descriptions(DESCRIPTIONS)) == naive_categorize(DESCRIPTIONS)
+
+
+def test_first_matching_rule_wins():
+    result = CategoryEngine().categorize(['Rabbit Massage Gel', 'MALE LUBE', 'Gel Cleaner'])
+    assert list(result) == ['Vibrators', 'Supplements', 'Lubricants']
+
+
+def test_missing_descriptions_are_categorized_as_nan():
+    # str(nan) is 'nan', which matches no keyword
+    result = CategoryEngine().categorize(pd.Series([np.nan, None, 'Wand'], dtype=object))
+    assert list(result) == ['Other', 'Other', 'Vibrators']
+
+
+@pytest.mark.parametrize('dtype', [object, 'string', pd.StringDtype('pyarrow', na_value=np.nan)])
+def test_string_dtypes_match_the_loop(dtype):
+    descriptions = pd.Series([d for d in DESCRIPTIONS if d is None or isinstance(d, str)] + [np.nan], dtype=dtype)
+    assert list(CategoryEngine().categorize(descriptions)) == naive_categorize(
+        [np.nan if pd.isna(d) else d for d in descriptions])
+
+
+def test_memo_gives_the_same_answer_on_repeat_calls():
+    engine = CategoryEngine()
+    rng = np.random.default_rng(0)
+    first = list(rng.choice(DESCRIPTIONS[:16], 500))
+    second = list(rng.choice(DESCRIPTIONS[:16], 500)) + ['New Battery', 'new battery']
+    assert list(engine.categorize(first)) == naive_categorize(first)
+    assert list(engine.categorize(second)) == naive_categorize(second)
+    assert len(engine.memo_keys) == len(set(d.lower() for d in first + second))
+
+
+def test_memo_is_reset_past_its_limit(monkeypatch):
+    monkeypatch.setattr(categories, 'MAX_MEMO_SIZE', 10)
+    engine = CategoryEngine()
+    for start in range(0, 40, 8):
+        batch = [f'Item {i} Lube' if i % 2 else f'Item {i}' for i in range(start, start + 8)]
+        assert list(engine.categorize(batch)) == naive_categorize(batch)
+        assert len(engine.memo_keys) <= 10
+
+
+def test_custom_rules():
+    rules = [('Light', ['lamp', 'bulb']), ('Heat', ['candle', 'lamp'])]
+    descriptions = ['Oil Lamp', 'Candle', 'Light Bulb (2+)', 'Chair', None]
+    engine = CategoryEngine(rules, default='Misc')
+    assert list(engine.categorize(descriptions)) == naive_categorize(descriptions, rules, 'Misc')
+
+
+def test_fingerprint_follows_the_rules():
+    assert rules_fingerprint() == rules_fingerprint(list(CATEGORY_RULES))
+    edited = [(name, words + ['extra']) if name == 'Lubricants' else (name, words) for name, words in CATEGORY_RULES]
+    assert rules_fingerprint(edited) != rules_fingerprint()
+    assert rules_fingerprint(default='Misc') != rules_fingerprint()
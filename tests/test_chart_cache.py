@@ -0,0 +1,127 @@
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+import pytest
+from flask import Flask
+from chart_cache import ChartCache, COMPRESS_MIN_BYTES, ENCODINGS
+from shared_data import source_mtime
+
+LARGE = json.dumps({'values': list(range(2000))}).encode('utf-8')
+SMALL = json.dumps({'values': [1, 2, 3]}).encode('utf-8')
+
+
+@pytest.fixture
+def client():
+    """A Flask app serving one large and one small cached payload, counting renders"""
+    app = Flask(__name__)
+    cache = ChartCache(datetime(2025, 6, 27, 12, 0, tzinfo=timezone.utc))
+    renders = {'large': 0, 'small': 0}
+
+    def render(name, body):
+        def run():
+            renders[name] += 1
+            return body
+        return run
+
+    @app.route('/large')
+    def large():
+        return cache.response('large', render('large', LARGE))
+
+    @app.route('/small')
+    def small():
+        return cache.response('small', render('small', SMALL))
+
+    @app.route('/adhoc')
+    def adhoc():
+        return cache.response('adhoc', lambda: LARGE, store=False)
+
+    client = app.test_client()
+    client.renders = renders
+    return client
+
+
+def test_bodies_are_gzipped_for_clients_that_accept_it(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == LARGE
+    assert response.headers['ETag'] == f'"{ChartCache.etag(LARGE)}-gzip"'
+
+
+def test_identity_is_sent_without_accept_encoding(client):
+    response = client.get('/large', headers={'Accept-Encoding': ''})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == LARGE
+    assert response.headers['ETag'] == f'"{ChartCache.etag(LARGE)}"'
+
+
+def test_br_is_preferred_when_brotli_is_installed(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip, br'})
+    expected = 'br' if 'br' in ENCODINGS else 'gzip'
+    assert response.headers['Content-Encoding'] == expected
+    assert response.headers['ETag'] == f'"{ChartCache.etag(LARGE)}-{expected}"'
+
+
+def test_small_bodies_are_not_compressed(client):
+    assert len(SMALL) < COMPRESS_MIN_BYTES <= len(LARGE)
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == SMALL
+    assert response.headers['ETag'] == f'"{ChartCache.etag(SMALL)}"'
+
+
+@pytest.mark.parametrize('encoding', ['', 'gzip'])
+def test_held_etag_is_answered_with_304(client, encoding):
+    first = client.get('/large', headers={'Accept-Encoding': encoding})
+    etag = first.headers['ETag']
+    again = client.get('/large', headers={'Accept-Encoding': encoding, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+    assert client.renders['large'] == 1
+
+
+def test_any_encoding_variant_revalidates(client):
+    # A client that held the gzip body and now asks without compression still has current data
+    etag = client.get('/large', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    response = client.get('/large', headers={'Accept-Encoding': '', 'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_star_matches_any_current_payload(client):
+    response = client.get('/large', headers={'If-None-Match': '*'})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == f'"{ChartCache.etag(LARGE)}"'
+
+
+def test_stale_etag_gets_the_body(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert gzip.decompress(response.data) == LARGE
+
+
+def test_uncached_payloads_get_validators(client):
+    etag = client.get('/adhoc').headers['ETag']
+    assert etag == f'"{ChartCache.etag(LARGE)}"'
+    assert client.get('/adhoc', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_last_modified_is_the_dataset_time(client):
+    response = client.get('/large')
+    assert response.headers['Last-Modified'] == 'Fri, 27 Jun 2025 12:00:00 GMT'
+    response = client.get('/large', headers={'If-Modified-Since': 'Fri, 27 Jun 2025 12:00:00 GMT'})
+    assert response.status_code == 304
+
+
+def test_caches_over_the_same_exports_agree_on_last_modified(tmp_path):
+    older, newer = tmp_path / 'sales.csv', tmp_path / 'warehouse.csv'
+    older.write_text('a\n')
+    newer.write_text('b\n')
+    os.utime(older, (1_700_000_000, 1_700_000_000))
+    os.utime(newer, (1_750_000_000.5, 1_750_000_000.5))
+    first = ChartCache(source_mtime([str(older), str(newer)]))
+    second = ChartCache(source_mtime([str(newer), str(older), str(tmp_path / 'missing.csv')]))
+    assert first.last_modified == second.last_modified == datetime.fromtimestamp(1_750_000_000, timezone.utc)
+    assert source_mtime([str(tmp_path / 'missing.csv')]) is None
@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+import excel_report
+from benchmarks.synthetic_data import write_sales_export
+from categories import categorize_descriptions
+from excel_report import write_excel_report, iter_frame_chunks
+from sales_aggregates import SalesAggregates
+from sales_data import load_sales_data
+
+SHEET_ROWS = 101
+
+
+@pytest.fixture(scope='module')
+def sales(tmp_path_factory):
+    path = tmp_path_factory.mktemp('exports') / 'sales.csv'
+    write_sales_export(str(path), 250, seed=3)
+    df = load_sales_data(str(path), use_cache=False)
+    df['Category'] = categorize_descriptions(df['Description'])
+    return df
+
+
+@pytest.fixture
+def small_sheets(monkeypatch):
+    """Shrink the worksheet row limit to 100 data rows plus the header"""
+    monkeypatch.setattr(excel_report, 'EXCEL_MAX_ROWS', SHEET_ROWS)
+
+
+def write(tmp_path, df, raw_data):
+    filename = str(tmp_path / 'report.xlsx')
+    # Chunks that do not line up with the sheet boundaries
+    aggregates = write_excel_report(filename, iter_frame_chunks(df, chunksize=70), raw_data=raw_data)
+    return filename, aggregates
+
+
+def raw_sheet_names(filename):
+    return [name for name in load_workbook(filename, read_only=True).sheetnames if name.startswith('Raw Data')]
+
+
+def read_sheet(filename, name):
+    return pd.read_excel(filename, sheet_name=name)
+
+
+def assert_same_rows(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def test_rows_past_the_limit_continue_on_new_sheets(tmp_path, sales, small_sheets):
+    filename, _ = write(tmp_path, sales, 'split')
+    names = raw_sheet_names(filename)
+    assert names == ['Raw Data', 'Raw Data 2', 'Raw Data 3']
+    sheets = [read_sheet(filename, name) for name in names]
+    assert [len(sheet) for sheet in sheets] == [100, 100, 50]
+    assert_same_rows(pd.concat(sheets), sales)
+
+
+def test_truncate_stops_at_the_limit(tmp_path, sales, small_sheets, capsys):
+    filename, _ = write(tmp_path, sales, 'truncate')
+    assert raw_sheet_names(filename) == ['Raw Data']
+    assert_same_rows(read_sheet(filename, 'Raw Data'), sales.iloc[:100])
+    assert '150 rows were not written' in capsys.readouterr().out
+
+
+def test_skip_leaves_raw_data_out(tmp_path, sales, small_sheets):
+    filename, _ = write(tmp_path, sales, 'skip')
+    assert raw_sheet_names(filename) == []
+    assert load_workbook(filename, read_only=True).sheetnames == [
+        'Summary', 'Category Analysis', 'Top Products', 'Negative Margin Products']
+
+
+def test_frames_under_the_limit_fit_one_sheet(tmp_path, sales):
+    assert excel_report.EXCEL_MAX_ROWS == 1_048_576
+    filename, _ = write(tmp_path, sales, 'split')
+    assert raw_sheet_names(filename) == ['Raw Data']
+    assert_same_rows(read_sheet(filename, 'Raw Data'), sales)
+
+
+@pytest.mark.parametrize('raw_data', ['split', 'truncate', 'skip'])
+def test_summary_sheets_come_from_the_whole_frame(tmp_path, sales, small_sheets, raw_data):
+    filename, aggregates = write(tmp_path, sales, raw_data)
+    expected = SalesAggregates.from_frame(sales)
+    # Summed chunk by chunk, so totals can differ from one pass in the last bits
+    assert aggregates.insights() == pytest.approx(expected.insights())
+
+    summary = read_sheet(filename, 'Summary').set_index('Metric')['Value']
+    assert summary['Total Products'] == len(sales)
+    assert summary['Total Revenue'] == pytest.approx(sales['Total'].sum())
+
+    categories = read_sheet(filename, 'Category Analysis').set_index('Category')
+    pd.testing.assert_frame_equal(categories, expected.category_summary()[excel_report.CATEGORY_COLUMNS],
+                                  check_dtype=False, check_names=False)
+
+
+def test_unknown_raw_data_mode_is_rejected(tmp_path, sales):
+    with pytest.raises(ValueError):
+        write(tmp_path, sales, 'split-sheets')
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from grouped_stats import GroupedMoments, price_elasticity
+
+
+@pytest.fixture(scope='module')
+def frame():
+    rng = np.random.default_rng(5)
+    rows = 4000
+    df = pd.DataFrame({
+        'Category': rng.choice(['A', 'B', 'C', 'D'], rows),
+        'x': rng.normal(10, 3, rows),
+        'noise': rng.normal(0, 2, rows)
+    })
+    df['y'] = np.where(df['Category'] == 'A', 2 * df['x'], -0.5 * df['x']) + df['noise']
+    df.loc[rng.random(rows) < 0.05, 'x'] = np.nan
+    # One row only and a constant column: both have no defined correlation
+    df.loc[len(df)] = ['Single', 1.0, 0.0, 2.0]
+    constant = pd.DataFrame({'Category': 'Flat', 'x': 5.0, 'noise': 0.0, 'y': rng.normal(0, 1, 20)})
+    return pd.concat([df, constant], ignore_index=True)
+
+
+def test_correlation_matches_groupby_corr(frame):
+    moments = GroupedMoments.from_frame(frame, 'x', 'y', 'Category')
+    expected = frame.groupby('Category')[['x', 'y']].corr().xs('x', level=1)['y']
+    pd.testing.assert_series_equal(moments.correlation(), expected, check_names=False, rtol=1e-9)
+
+
+def test_slope_matches_least_squares(frame):
+    slopes = GroupedMoments.from_frame(frame, 'x', 'y', 'Category').slope()
+    for name, group in frame.dropna(subset=['x', 'y']).groupby('Category'):
+        if len(group) > 1 and group['x'].nunique() > 1:
+            assert slopes[name] == pytest.approx(np.polyfit(group['x'], group['y'], 1)[0])
+        else:
+            assert np.isnan(slopes[name])
+
+
+def test_summary_counts_used_and_skipped_rows(frame):
+    summary = GroupedMoments.from_frame(frame, 'x', 'y', 'Category').summary()
+    assert summary['rows'].to_dict() == frame.dropna(subset=['x']).groupby('Category').size().to_dict()
+    assert summary['skipped'].to_dict() == frame['x'].isna().groupby(frame['Category']).sum().to_dict()
+
+
+def test_merged_parts_equal_one_pass(frame):
+    whole = GroupedMoments.from_frame(frame, 'x', 'y', 'Category')
+    # Halves with different group sets merge like one pass over everything
+    first, second = frame.iloc[:1500], frame.iloc[1500:]
+    merged = GroupedMoments.from_frame(first, 'x', 'y', 'Category').merge(
+        GroupedMoments.from_frame(second, 'x', 'y', 'Category'))
+    pd.testing.assert_frame_equal(merged.moments, whole.moments, rtol=1e-9)
+    pd.testing.assert_series_equal(merged.correlation(), whole.correlation(), rtol=1e-9)
+    assert merged.skipped.to_dict() == whole.skipped.to_dict()
+
+
+def test_price_elasticity_skips_unsold_products():
+    df = pd.DataFrame({
+        'Category': ['A', 'A', 'A', 'A', 'B', 'B', 'C'],
+        'Total': [10.0, 40.0, 90.0, 0.0, 5.0, 7.0, 3.0],
+        'Sold': [1, 2, 3, 0, 1, 1, 1]
+    })
+    priced = df[df['Sold'] != 0].assign(Price=lambda d: d['Total'] / d['Sold'])
+    expected = priced.groupby('Category')[['Price', 'Sold']].corr().xs('Price', level=1)['Sold'].fillna(0)
+    pd.testing.assert_series_equal(price_elasticity(df), expected, check_names=False)
+    # B has no variation in units sold and C a single product: both report 0
+    assert price_elasticity(df)[['B', 'C']].tolist() == [0.0, 0.0]
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from histogram_charts import bin_values, histogram_figure
+
+
+def test_fixed_bins_match_numpy():
+    values = np.random.default_rng(1).normal(20, 15, 5000)
+    edges, counts, mean = bin_values(values, bins=30)
+    expected_counts, expected_edges = np.histogram(values, bins=30)
+    assert np.array_equal(counts, expected_counts)
+    assert np.allclose(edges, expected_edges)
+    assert mean == pytest.approx(values.mean())
+
+
+def test_quantile_bins_hold_about_the_same_count():
+    values = np.random.default_rng(2).lognormal(2, 1, 10_000)
+    edges, counts, _ = bin_values(values, bins=20, method='quantile')
+    assert len(counts) == 20
+    assert counts.sum() == len(values)
+    assert counts.min() >= 0.95 * len(values) / 20
+    assert np.allclose(edges, np.quantile(values, np.linspace(0, 1, 21)))
+
+
+def test_missing_and_infinite_values_are_dropped():
+    values = pd.Series([1.0, np.nan, 2.0, np.inf, 3.0, -np.inf, None])
+    for method in ('fixed', 'quantile'):
+        edges, counts, mean = bin_values(values, bins=4, method=method)
+        assert counts.sum() == 3
+        assert edges[0] == 1.0 and edges[-1] == 3.0
+        assert mean == 2.0
+
+
+@pytest.mark.parametrize('method', ['fixed', 'quantile'])
+def test_constant_values_fall_in_one_bin_around_them(method):
+    edges, counts, mean = bin_values(np.full(100, 7.5), bins=10, method=method)
+    assert counts.sum() == 100
+    assert np.count_nonzero(counts) == 1
+    assert edges[0] < 7.5 < edges[-1]
+    assert mean == 7.5
+
+
+@pytest.mark.parametrize('values', [[], [np.nan, np.nan]])
+@pytest.mark.parametrize('method', ['fixed', 'quantile'])
+def test_empty_input_gives_no_bins(values, method):
+    edges, counts, mean = bin_values(values, method=method)
+    assert len(edges) == 0 and len(counts) == 0
+    assert np.isnan(mean)
+
+    fig = histogram_figure(values, 'Empty', 'Margin', method=method)
+    assert len(fig.data[0].x) == 0
+    assert not fig.layout.shapes
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        bin_values([1.0, 2.0], method='log')
+
+
+def test_quantile_figure_shows_density():
+    values = np.random.default_rng(3).exponential(10, 2000)
+    edges, counts, _ = bin_values(values, bins=10, method='quantile')
+    fig = histogram_figure(values, 'Margins', 'Margin', bins=10, method='quantile')
+    assert np.allclose(fig.data[0].y, counts / np.diff(edges))
+    assert np.allclose(fig.data[0].width, np.diff(edges))
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pareto import ParetoCurve
+
+
+def exact_breakpoint(revenue, level):
+    """Fewest top products whose revenue reaches `level` percent, from the full cumsum"""
+    cumulative = pd.Series(revenue).fillna(0).sort_values(ascending=False).cumsum()
+    target = cumulative.iloc[-1] * level / 100
+    return int((cumulative < target).sum()) + 1
+
+
+@pytest.fixture(scope='module')
+def revenue():
+    values = np.random.default_rng(4).pareto(1.2, 50_000) * 100
+    values[::97] = np.nan
+    return values
+
+
+def test_breakpoints_match_the_exact_cumsum(revenue):
+    curve = ParetoCurve(revenue, levels=(10, 50, 80, 95, 100))
+    for level, point in curve.breakpoints.items():
+        assert point['products'] == exact_breakpoint(revenue, level)
+        assert point['product_share'] == pytest.approx(point['products'] / len(revenue) * 100)
+    insights = curve.insights()
+    assert insights['products_for_80pct_revenue'] == exact_breakpoint(revenue, 80)
+
+
+def test_downsampled_curve_stays_within_tolerance(revenue):
+    curve = ParetoCurve(revenue, tolerance=0.5)
+    cumulative = pd.Series(revenue).fillna(0).sort_values(ascending=False).cumsum().to_numpy()
+    x = np.arange(1, len(revenue) + 1) / len(revenue) * 100
+    y = cumulative / cumulative[-1] * 100
+
+    drawn = np.interp(x, curve.product_share, curve.cumulative_revenue / curve.total_revenue * 100)
+    assert np.abs(drawn - y).max() <= 0.5
+    # The knots are exact points of the full curve, and the payload stays small
+    assert np.allclose(curve.cumulative_revenue, cumulative[curve.ranks - 1])
+    assert curve.ranks[0] == 1 and curve.ranks[-1] == len(revenue)
+    assert set(point['products'] for point in curve.breakpoints.values()) <= set(curve.ranks)
+    assert len(curve.ranks) < 1000
+
+
+def test_small_catalog_keeps_every_point():
+    curve = ParetoCurve([5.0, 1.0, 3.0, np.nan])
+    assert curve.ranks.tolist() == [1, 2, 3, 4]
+    assert curve.cumulative_revenue.tolist() == [5.0, 8.0, 9.0, 9.0]
+    assert curve.breakpoints[50]['products'] == 1
+    assert curve.breakpoints[80]['products'] == 2
+    assert curve.breakpoints[95]['products'] == 3
+
+
+@pytest.mark.parametrize('revenue', [[], [0.0, 0.0, np.nan]])
+def test_no_revenue(revenue):
+    curve = ParetoCurve(revenue)
+    assert curve.total_revenue == 0.0
+    assert all(point['products'] == 0 for point in curve.breakpoints.values())
+    assert curve.insights()['product_share_for_50pct_revenue'] == 0.0
+    curve.figure()
@@ -0,0 +1,154 @@
+import os
+import queue
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A minimal app: /slow stays in flight long enough to be caught by a signal
+SERVER = '''
+import os, sys, time
+from prefork_server import PreforkServer
+
+def app(environ, start_response):
+    if environ['PATH_INFO'] == '/slow':
+        time.sleep(1.5)
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(os.getpid()).encode()]
+
+PreforkServer(app, host='127.0.0.1', port=int(sys.argv[1]), workers=2, threads=2,
+              reload=lambda: True, check_interval=0, graceful_timeout=10).run()
+'''
+
+READY = re.compile(r'Worker (\d+) \(generation (\d+)\) ready')
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason="the pre-fork server needs os.fork")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def alive(pid):
+    """Whether a process still runs (an exited child nobody reaped yet does not)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return True
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class Server:
+    def __init__(self):
+        self.port = free_port()
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', '-c', SERVER, str(self.port)],
+            cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
+        self.lines = queue.Queue()
+        self.output = []
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            self.output.append(line)
+            self.lines.put(line)
+
+    def ready_workers(self, generation, count=2, timeout=15.0):
+        """PIDs of the first `count` workers of a generation to report ready"""
+        pids = []
+        deadline = time.monotonic() + timeout
+        while len(pids) < count:
+            line = self.lines.get(timeout=max(deadline - time.monotonic(), 0.01))
+            for match in READY.finditer(line):
+                if int(match.group(2)) == generation:
+                    pids.append(int(match.group(1)))
+        return pids[:count]
+
+    def get(self, path='/'):
+        with urllib.request.urlopen(f'http://127.0.0.1:{self.port}{path}', timeout=10) as response:
+            return response.status, int(response.read())
+
+    def get_in_background(self, path):
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(response=self.get(path)))
+        thread.start()
+        # Let a worker accept it before anything else happens
+        time.sleep(0.3)
+        return thread, result
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+
+@pytest.fixture
+def server():
+    server = Server()
+    yield server
+    server.kill()
+
+
+def test_hup_swaps_generations_and_term_drains(server):
+    first = server.ready_workers(1)
+    status, pid = server.get()
+    assert status == 200 and pid in first
+
+    # HUP: a new generation takes over; the old one finishes what it accepted
+    thread, result = server.get_in_background('/slow')
+    os.kill(server.process.pid, signal.SIGHUP)
+    second = server.ready_workers(2)
+    thread.join(10)
+    assert result['response'][0] == 200
+    assert result['response'][1] in first
+    assert wait_until(lambda: not any(alive(pid) for pid in first)), server.output
+    assert server.get()[1] in second
+
+    # TERM: in-flight requests complete, then the master and every worker exit
+    thread, result = server.get_in_background('/slow')
+    os.kill(server.process.pid, signal.SIGTERM)
+    thread.join(10)
+    assert result['response'][0] == 200
+    assert server.process.wait(timeout=15) == 0
+    assert not any(alive(pid) for pid in first + second), server.output
+
+
+def test_crashed_worker_is_replaced(server):
+    workers = server.ready_workers(1)
+    os.kill(workers[0], signal.SIGKILL)
+    replacement = server.ready_workers(1, count=1)
+    assert replacement[0] not in workers
+    assert server.get()[0] == 200
+
+    os.kill(server.process.pid, signal.SIGINT)
+    assert server.process.wait(timeout=15) == 0
+    assert not any(alive(pid) for pid in workers + replacement)
+
+
+def test_workers_exit_when_the_master_dies(server):
+    workers = server.ready_workers(1)
+    server.kill()
+    assert wait_until(lambda: not any(alive(pid) for pid in workers)), server.output
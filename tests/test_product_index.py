@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from product_index import (ProductIndex, SALES_KEY_COLUMNS, normalize_descriptions,
+                           normalize_ids)
+
+
+def naive_match(sales_df, warehouse_df):
+    """Sales row for each warehouse row by scanning: IDs in key order, then descriptions"""
+    warehouse_ids = normalize_ids(warehouse_df['Product_ID'])
+    sales_ids = {column: normalize_ids(sales_df[column]) for column in SALES_KEY_COLUMNS
+                 if column in sales_df.columns}
+    names = normalize_descriptions(warehouse_df['Product_Name'])
+    descriptions = normalize_descriptions(sales_df['Description'])
+
+    matches = []
+    for row in range(len(warehouse_df)):
+        match = -1
+        for keys in sales_ids.values():
+            if pd.notna(warehouse_ids[row]):
+                hits = [i for i, key in enumerate(keys) if key == warehouse_ids[row]]
+                if hits:
+                    match = hits[0]
+                    break
+        if match < 0 and pd.notna(names[row]):
+            hits = [i for i, key in enumerate(descriptions) if key == names[row]]
+            match = hits[0] if hits else -1
+        matches.append(match)
+    return np.array(matches)
+
+
+def sample_tables():
+    sales = pd.DataFrame({
+        'System ID': [1001, 1002, 1003, 1004, 1002],
+        'UPC': [np.nan, 555.0, np.nan, 777.0, np.nan],
+        'Custom SKU': ['a-1', None, 'C-3', '', 'x'],
+        'Description': ['Red  Candle', 'Blue Lamp', 'Green Mug', 'Tea Set', 'Blue Lamp'],
+        'Total': [10.0, 50.0, 30.0, 40.0, 20.0]
+    })
+    warehouse = pd.DataFrame({
+        # System ID, UPC, Custom SKU (case-insensitive), description only, nothing
+        'Product_ID': ['1002', '777', 'A-1', None, 'ZZZ'],
+        'Product_Name': ['Blue lamp', 'Tea Set', 'Red Candle', ' green   MUG ', 'Unknown'],
+        'Current_Stock': [1, 2, 3, 4, 5]
+    })
+    return sales, warehouse
+
+
+def test_normalize_ids():
+    ids = normalize_ids(pd.Series([12.0, np.nan, 7.0]))
+    assert ids.tolist()[0] == '12' and pd.isna(ids[1]) and ids[2] == '7'
+    ids = normalize_ids(pd.Series([' ab ', '', None, 'Cd']))
+    assert ids[0] == 'AB' and pd.isna(ids[1]) and pd.isna(ids[2]) and ids[3] == 'CD'
+
+
+def test_matches_each_key_in_order():
+    sales, warehouse = sample_tables()
+    index = ProductIndex(sales, warehouse)
+    # Duplicate System ID 1002 resolves to its first row
+    assert index.warehouse_to_sales.tolist() == [1, 3, 0, 2, -1]
+    assert index.matched == 4
+    assert index.matched_by == {'System ID': 1, 'UPC': 1, 'Custom SKU': 1, 'Description': 1}
+    assert index.warehouse_to_sales.tolist() == naive_match(sales, warehouse).tolist()
+
+
+def test_matches_random_tables_like_a_scan():
+    rng = np.random.default_rng(7)
+    words = np.array(['lamp', 'mug', 'candle', 'set', 'tea', 'blue'])
+    sales = pd.DataFrame({
+        'System ID': rng.integers(0, 60, 80),
+        'UPC': np.where(rng.random(80) < 0.3, np.nan, rng.integers(1000, 1060, 80)).astype(float),
+        'Description': [' '.join(rng.choice(words, 2)) for _ in range(80)],
+        'Total': rng.random(80) * 100
+    })
+    warehouse = pd.DataFrame({
+        'Product_ID': [str(v) for v in rng.integers(0, 1100, 120)],
+        'Product_Name': ['  '.join(rng.choice(words, 2)).upper() for _ in range(120)]
+    })
+    index = ProductIndex(sales, warehouse)
+    assert index.warehouse_to_sales.tolist() == naive_match(sales, warehouse).tolist()
+
+
+def test_top_product_rows_follow_sales_totals():
+    sales, warehouse = sample_tables()
+    index = ProductIndex(sales, warehouse, top_n=2)
+    rows = index.top_product_rows()
+
+    top = set(sales['Total'].nlargest(2).index)
+    expected = [(name, sales['Total'][match]) for name, match
+                in zip(warehouse['Product_Name'], naive_match(sales, warehouse)) if match in top]
+    assert list(zip(rows['Product_Name'], rows['Total'])) == expected
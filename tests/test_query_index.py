@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+from query_index import SalesQueryIndex
+
+
+def sales_frame(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Total': rng.lognormal(4, 1.2, rows).round(2),
+        'Margin': rng.normal(30, 20, rows).round(1),
+        'Stock': rng.integers(0, 50, rows).astype(float),
+        'Sold': rng.integers(0, 200, rows).astype(float),
+        'Profit': rng.normal(20, 40, rows),
+        'Cost': rng.lognormal(3, 1, rows),
+        'Category': rng.choice(['Lubricants', 'Vibrators', 'Other', 'Supplements', None],
+                               rows, p=[0.3, 0.05, 0.5, 0.1, 0.05])
+    })
+    df.loc[rng.random(rows) < 0.02, 'Margin'] = np.nan
+    df.loc[rng.random(rows) < 0.02, 'Total'] = np.nan
+    return df
+
+
+def mask(df, categories=None, ranges=None):
+    """The filter as a plain boolean mask"""
+    keep = pd.Series(True, index=df.index)
+    if categories is not None:
+        keep &= df['Category'].isin(categories)
+    for col, (low, high) in (ranges or {}).items():
+        keep &= df[col].notna()
+        if low is not None:
+            keep &= df[col] >= low
+        if high is not None:
+            keep &= df[col] <= high
+    return keep
+
+
+FILTERS = [
+    {},
+    {'categories': ['Vibrators']},
+    {'categories': ['Lubricants', 'Other']},
+    {'categories': []},
+    {'categories': ['No such category']},
+    {'ranges': {'Total': (None, 20.0)}},
+    {'ranges': {'Total': (500.0, None)}},
+    {'ranges': {'Margin': (-10.0, 10.0), 'Stock': (5, 6)}},
+    {'ranges': {'Margin': (0, 100), 'Total': (10.0, 1000.0)}},
+    {'categories': ['Vibrators'], 'ranges': {'Margin': (20.0, None)}},
+    {'categories': ['Other', 'Supplements'], 'ranges': {'Sold': (150, 160), 'Total': (None, 200.0)}},
+    {'ranges': {'Total': (60.0, 50.0)}},
+]
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return sales_frame()
+
+
+@pytest.fixture(scope='module')
+def index(frame):
+    return SalesQueryIndex(frame)
+
+
+@pytest.mark.parametrize('query', FILTERS)
+def test_filter_matches_a_boolean_mask(frame, index, query):
+    expected = np.flatnonzero(mask(frame, **query).to_numpy())
+    assert index.filter_positions(**query).tolist() == expected.tolist()
+    pd.testing.assert_frame_equal(index.filter(**query), frame[mask(frame, **query)])
+
+
+def test_unfiltered_returns_the_frame_itself(frame, index):
+    assert index.filter() is frame
+    assert index.filter(ranges={'Total': None}) is frame
+
+
+def test_category_positions_cover_every_categorized_row(frame, index):
+    for name, positions in index.category_positions.items():
+        assert positions.tolist() == np.flatnonzero((frame['Category'] == name).to_numpy()).tolist()
+    assert sum(map(len, index.category_positions.values())) == frame['Category'].notna().sum()
+
+
+def test_column_bounds(frame, index):
+    total = index.columns['Total']
+    assert total.min == frame['Total'].min()
+    assert total.max == frame['Total'].max()
+    assert total.valid == frame['Total'].notna().sum()
+
+
+def reference_order(frame, positions, column, limit, descending):
+    """sort_values with ties broken by row position in the sort's direction"""
+    rows = frame.iloc[positions].assign(position=positions)
+    valid = rows[rows[column].notna()].sort_values([column, 'position'], ascending=not descending)
+    return (valid['position'].tolist() + rows.loc[rows[column].isna(), 'position'].tolist())[:limit]
+
+
+@pytest.mark.parametrize('query', [{}, {'categories': ['Vibrators']}, {'ranges': {'Total': (100.0, None)}}])
+@pytest.mark.parametrize('column', ['Total', 'Margin', 'Profit'])
+@pytest.mark.parametrize('limit', [1, 25, 100_000])
+def test_sorted_positions_match_sort_values(frame, index, query, column, limit):
+    positions = index.filter_positions(**query)
+    for descending in (False, True):
+        ranked = index.sorted_positions(positions, column, limit, descending)
+        assert ranked.tolist() == reference_order(frame, positions, column, limit, descending)
+
+
+def test_sorted_positions_with_ties_order_the_values(frame, index):
+    positions = index.filter_positions()
+    for descending in (False, True):
+        ranked = index.sorted_positions(positions, 'Stock', 500, descending)
+        expected = frame['Stock'].sort_values(ascending=not descending).to_numpy()[:500]
+        assert np.array_equal(frame['Stock'].to_numpy()[ranked], expected)
+        assert len(set(ranked.tolist())) == 500
+
+
+def test_totals_match_pandas_sums(frame, index):
+    for query in FILTERS:
+        rows = frame[mask(frame, **query)]
+        totals = index.totals(index.filter_positions(**query))
+        assert totals['count'] == len(rows)
+        for col in ['Total', 'Sold', 'Stock', 'Cost', 'Profit']:
+            assert totals[col] == pytest.approx(rows[col].sum())
+        if rows['Margin'].notna().any():
+            assert totals['avg_margin'] == pytest.approx(rows['Margin'].mean())
+        else:
+            assert totals['avg_margin'] is None
@@ -0,0 +1,106 @@
+import os
+import time
+import pytest
+from reloader import SnapshotReloader, file_signature
+
+
+class Factory:
+    """Builds numbered snapshots of a file's contents, or fails on demand"""
+
+    def __init__(self, path):
+        self.path = path
+        self.builds = 0
+        self.fail = False
+
+    def __call__(self):
+        if self.fail:
+            raise ValueError('export is corrupt')
+        self.builds += 1
+        with open(self.path) as f:
+            return (self.builds, f.read())
+
+
+def rewrite(path, text, mtime):
+    with open(path, 'w') as f:
+        f.write(text)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = str(tmp_path / 'sales.csv')
+    rewrite(path, 'first', 1_700_000_000)
+    return path
+
+
+def test_change_is_swapped_in_after_a_quiet_poll(export):
+    factory = Factory(export)
+    reloader = SnapshotReloader(factory, [export], interval=0)
+    assert reloader.current() == (1, 'first')
+    assert reloader.check() is False
+
+    rewrite(export, 'second, half written', 1_700_000_001)
+    assert reloader.check() is False
+    assert reloader.current() == (1, 'first')
+
+    # Still changing: the pending signature is replaced, nothing is loaded yet
+    rewrite(export, 'second, complete', 1_700_000_002)
+    assert reloader.check() is False
+    assert reloader.current() == (1, 'first')
+
+    assert reloader.check() is True
+    assert reloader.current() == (2, 'second, complete')
+    assert reloader.reload_count == 1
+    assert reloader.check() is False
+
+
+def test_failed_rebuild_keeps_the_old_snapshot(export):
+    factory = Factory(export)
+    reloader = SnapshotReloader(factory, [export], interval=0)
+    before = reloader.current()
+
+    factory.fail = True
+    rewrite(export, 'broken', 1_700_000_001)
+    reloader.check()
+    assert reloader.check() is False
+    assert reloader.current() is before
+    assert reloader.last_error == 'export is corrupt'
+    assert reloader.reload_count == 0
+
+    # The failed signature was not recorded, so the build is retried after another quiet poll
+    factory.fail = False
+    assert reloader.check() is False
+    assert reloader.check() is True
+    assert reloader.current() == (2, 'broken')
+    assert reloader.last_error is None
+
+
+def test_initial_signature_catches_a_change_during_the_first_build(export):
+    signature = file_signature([export])
+    rewrite(export, 'replaced while loading', 1_700_000_001)
+    reloader = SnapshotReloader(Factory(export), [export], interval=0, initial=('prebuilt', 'first'),
+                                signature=signature)
+    reloader.check()
+    assert reloader.check() is True
+    assert reloader.current() == (1, 'replaced while loading')
+
+
+def test_missing_files_count_as_a_change(export):
+    reloader = SnapshotReloader(Factory(export), [export], interval=0)
+    os.remove(export)
+    reloader.factory.fail = True
+    reloader.check()
+    assert reloader.check() is False
+    assert reloader.current() == (1, 'first')
+
+
+def test_background_thread_reloads(export):
+    reloader = SnapshotReloader(Factory(export), [export], interval=0.01).start()
+    try:
+        rewrite(export, 'second', 1_700_000_001)
+        deadline = time.time() + 5
+        while reloader.current()[1] != 'second' and time.time() < deadline:
+            time.sleep(0.01)
+        assert reloader.current() == (2, 'second')
+    finally:
+        reloader.stop()
@@ -0,0 +1,85 @@
+import pytest
+from flask import Flask
+from chart_cache import ChartCache
+from request_timing import RequestTimings
+
+TOKEN = 'secret-token'
+AUTH = {'Authorization': f'Bearer {TOKEN}'}
+
+
+def make_app(token=TOKEN):
+    app = Flask(__name__)
+    timings = RequestTimings(app, token=token)
+    cache = ChartCache()
+
+    @app.route('/api/charts/<name>')
+    def chart(name):
+        return cache.response(name, lambda: '{"data": []}')
+
+    @app.route('/api/fail')
+    def fail():
+        return 'boom', 500
+
+    return app, timings
+
+
+@pytest.fixture
+def client():
+    app, _ = make_app()
+    return app.test_client()
+
+
+@pytest.mark.parametrize('headers', [{}, {'Authorization': 'Bearer wrong'}, {'Authorization': TOKEN},
+                                     {'Authorization': f'Basic {TOKEN}'}])
+def test_endpoint_is_hidden_without_the_token(client, headers):
+    assert client.get('/api/debug/timings', headers=headers).status_code == 404
+    assert client.post('/api/debug/timings', headers=headers).status_code == 404
+
+
+def test_endpoint_is_off_without_a_configured_token():
+    app, _ = make_app(token='')
+    client = app.test_client()
+    assert client.get('/api/debug/timings', headers={'Authorization': 'Bearer '}).status_code == 404
+
+
+def test_percentiles_and_cache_counters_per_route(client):
+    for _ in range(3):
+        client.get('/api/charts/revenue')
+    etag = client.get('/api/charts/revenue').headers['ETag']
+    client.get('/api/charts/revenue', headers={'If-None-Match': etag})
+    client.get('/api/fail')
+
+    response = client.get('/api/debug/timings', headers=AUTH)
+    assert response.status_code == 200
+    routes = {route['route']: route for route in response.get_json()['routes']}
+    assert set(routes) == {'/api/charts/<name>', '/api/fail'}
+
+    charts = routes['/api/charts/<name>']
+    assert charts['count'] == 5
+    assert charts['not_modified'] == 1
+    assert (charts['cache_hits'], charts['cache_misses']) == (4, 1)
+    assert charts['cache_hit_ratio'] == 0.8
+    assert 0 <= charts['p50_ms'] <= charts['p95_ms'] <= charts['p99_ms']
+    assert charts['max_bytes'] == len('{"data": []}')
+    assert routes['/api/fail']['errors'] == 1
+
+
+def test_prometheus_text(client):
+    client.get('/api/charts/revenue')
+    client.get('/api/charts/revenue')
+    response = client.get('/api/debug/timings?format=prometheus', headers=AUTH)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    lines = response.get_data(as_text=True).splitlines()
+    assert '# TYPE dashboard_request_duration_seconds histogram' in lines
+    assert 'dashboard_request_duration_seconds_bucket{route="/api/charts/<name>",le="+Inf"} 2' in lines
+    assert 'dashboard_request_duration_seconds_count{route="/api/charts/<name>"} 2' in lines
+    assert 'dashboard_cache_hits_total{route="/api/charts/<name>"} 1' in lines
+    # The timings endpoint does not time itself
+    assert not any('/api/debug/timings' in line for line in lines)
+
+
+def test_post_resets_the_counters(client):
+    client.get('/api/charts/revenue')
+    assert client.post('/api/debug/timings', headers=AUTH).get_json() == {'reset': True}
+    assert client.get('/api/debug/timings', headers=AUTH).get_json()['routes'] == []
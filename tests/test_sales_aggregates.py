@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic_data import write_sales_export
+from sales_aggregates import (SalesAggregates, aggregate_sales_csv, aggregate_stores,
+                              iter_sales_chunks)
+
+
+@pytest.fixture(scope='module')
+def exports(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('stores')
+    paths = []
+    for seed, rows in enumerate([2500, 1200, 3100]):
+        path = directory / f'store{seed}.csv'
+        write_sales_export(str(path), rows, seed=seed)
+        paths.append(str(path))
+    return paths
+
+
+def cleaned(paths):
+    """Every export's cleaned, categorized rows in one frame, in the order given"""
+    return pd.concat([chunk for path in paths for chunk in iter_sales_chunks(path)], ignore_index=True)
+
+
+def assert_same_aggregates(actual, expected):
+    assert actual.rows == expected.rows
+    assert actual.insights() == pytest.approx(expected.insights(), rel=1e-9)
+    pd.testing.assert_frame_equal(actual.category_summary(), expected.category_summary())
+    pd.testing.assert_frame_equal(actual.top_products(), expected.top_products())
+    pd.testing.assert_frame_equal(actual.negative_margin_products().reset_index(drop=True),
+                                  expected.negative_margin_products().reset_index(drop=True))
+    assert actual.margin_std() == pytest.approx(expected.margin_std(), rel=1e-9)
+
+
+def test_single_pass_matches_pandas(exports):
+    df = cleaned(exports)
+    aggregates = SalesAggregates.from_frame(df)
+    insights = aggregates.insights()
+
+    assert insights['total_revenue'] == pytest.approx(df['Total'].sum())
+    assert insights['total_units_sold'] == int(df['Sold'].sum())
+    assert insights['total_products'] == len(df)
+    assert insights['avg_profit_margin'] == pytest.approx(df['Margin'].mean())
+    assert insights['negative_margin_products'] == int((df['Margin'] < 0).sum())
+    assert insights['high_margin_products'] == int((df['Margin'] > 50).sum())
+    assert insights['top_product'] == df.loc[df['Total'].idxmax(), 'Description']
+    assert insights['top_category'] == df.groupby('Category')['Total'].sum().idxmax()
+    assert aggregates.margin_std() == pytest.approx(df['Margin'].std())
+
+    summary = aggregates.category_summary()
+    expected = df.groupby('Category').agg(Total_sum=('Total', 'sum'), Margin_mean=('Margin', 'mean'),
+                                          Profit_sum=('Profit', 'sum')).round(2)
+    pd.testing.assert_frame_equal(summary[['Total_sum', 'Margin_mean', 'Profit_sum']], expected,
+                                  check_exact=False, atol=0.011)
+    assert summary['Total_count'].to_dict() == df.groupby('Category')['Total'].count().to_dict()
+    assert aggregates.top_products()['Total'].tolist() == df['Total'].nlargest(20).tolist()
+
+
+def test_merged_chunks_equal_one_pass(exports):
+    expected = SalesAggregates.from_frame(cleaned(exports[:1]))
+    assert_same_aggregates(aggregate_sales_csv(exports[0], chunksize=300), expected)
+
+
+def test_merged_stores_equal_one_pass_over_the_concatenation(exports):
+    expected = SalesAggregates.from_frame(cleaned(exports))
+    merged = SalesAggregates()
+    for path in exports:
+        merged.merge(aggregate_sales_csv(path, chunksize=700))
+    assert_same_aggregates(merged, expected)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_aggregate_stores(exports, workers):
+    chain, per_store = aggregate_stores(exports, workers=workers, chunksize=1000)
+    assert_same_aggregates(chain, SalesAggregates.from_frame(cleaned(exports)))
+    assert list(per_store) == exports
+    for path, partial in per_store.items():
+        assert_same_aggregates(partial, SalesAggregates.from_frame(cleaned([path])))
+
+
+def test_merging_empty_partials_changes_nothing(exports):
+    expected = SalesAggregates.from_frame(cleaned(exports[:1]))
+    merged = SalesAggregates().merge(SalesAggregates.from_frame(cleaned(exports[:1]))).merge(SalesAggregates())
+    assert_same_aggregates(merged, expected)
+    assert np.isnan(SalesAggregates().margin_mean())
@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+from datetime import date, datetime, timezone
+import pandas as pd
+import pytest
+from flask import Flask
+from benchmarks.synthetic_data import write_sales_export
+from categories import categorize_descriptions
+from sales_aggregates import SalesAggregates
+from sales_data import load_sales_data
+from sales_store import SalesStore, export_date, register_store_routes, MANIFEST
+
+
+@pytest.fixture(scope='module')
+def exports(tmp_path_factory):
+    """Daily exports named the way the store dates them, plus a replacement for one day"""
+    directory = tmp_path_factory.mktemp('exports')
+    paths = {}
+    for seed, day in enumerate(['2025-06-01', '2025-06-02', '2025-06-03', '2025-06-05']):
+        path = directory / f'sales_{day.replace("-", "")}.csv'
+        write_sales_export(str(path), 400 + 100 * seed, seed=seed)
+        paths[day] = str(path)
+    replacement = directory / 'sales_2025-06-02_corrected.csv'
+    write_sales_export(str(replacement), 250, seed=99)
+    paths['replacement'] = str(replacement)
+    return paths
+
+
+def rows_of(path, day):
+    df = load_sales_data(path, use_cache=False)
+    df['Category'] = categorize_descriptions(df['Description'])
+    df.insert(0, 'Date', pd.Timestamp(day))
+    return df
+
+
+def expected_rows(exports, days):
+    return pd.concat([rows_of(exports[day], day) for day in days], ignore_index=True)
+
+
+def assert_same_rows(actual, expected):
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected, check_dtype=False)
+
+
+@pytest.fixture
+def store(tmp_path, exports):
+    store = SalesStore(str(tmp_path / 'store'))
+    for day in ['2025-06-01', '2025-06-02', '2025-06-03', '2025-06-05']:
+        store.append(exports[day])
+    return store
+
+
+def test_export_dates_come_from_the_file_name(exports):
+    assert export_date(exports['2025-06-03']) == date(2025, 6, 3)
+    assert export_date(exports['replacement']) == date(2025, 6, 2)
+
+
+def test_range_reads_only_the_partitions_inside(store, exports):
+    assert store.dates() == ['2025-06-01', '2025-06-02', '2025-06-03', '2025-06-05']
+    assert store.dates('2025-06-02', '2025-06-04') == ['2025-06-02', '2025-06-03']
+    assert_same_rows(store.read('2025-06-02', '2025-06-04'), expected_rows(exports, ['2025-06-02', '2025-06-03']))
+    assert_same_rows(store.read(end=date(2025, 6, 1)), expected_rows(exports, ['2025-06-01']))
+    assert len(store.read('2025-07-01')) == 0
+
+
+def test_summary_matches_one_pass_over_the_range(store, exports):
+    summary = store.summary('2025-06-02', '2025-06-05')
+    expected = SalesAggregates.from_frame(expected_rows(exports, ['2025-06-02', '2025-06-03', '2025-06-05']))
+    assert (summary['start'], summary['end'], summary['partitions']) == ('2025-06-02', '2025-06-05', 3)
+    assert summary['insights'] == pytest.approx(expected.insights())
+    assert summary['categories'] == expected.category_summary().to_dict('index')
+    assert store.summary('2030-01-01')['partitions'] == 0
+
+
+def test_store_routes_send_the_manifest_time(store):
+    os.utime(os.path.join(store.directory, MANIFEST), (1_750_000_000, 1_750_000_000))
+    app = Flask(__name__)
+    register_store_routes(app, SalesStore(store.directory))
+    client = app.test_client()
+    response = client.get('/api/store/partitions')
+    assert response.last_modified == datetime.fromtimestamp(1_750_000_000, timezone.utc)
+    assert client.get('/api/store/summary?start=2025-06-02').last_modified == response.last_modified
+    again = client.get('/api/store/partitions', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_reappend_is_a_noop_and_a_new_file_replaces_the_day(store, exports):
+    version = store.version()
+    partition = os.path.join(store.directory, store.manifest['2025-06-01']['path'])
+    modified = os.stat(partition).st_mtime_ns
+    store.append(exports['2025-06-01'])
+    assert store.version() == version
+    assert os.stat(partition).st_mtime_ns == modified
+
+    store.append(exports['replacement'])
+    assert store.dates() == ['2025-06-01', '2025-06-02', '2025-06-03', '2025-06-05']
+    assert store.manifest['2025-06-02']['rows'] == 250
+    assert store.version() != version
+    assert store.version('2025-06-03') == SalesStore(store.directory).version('2025-06-03')
+    assert_same_rows(store.read('2025-06-02', '2025-06-02'), rows_of(exports['replacement'], '2025-06-02'))
+
+
+def test_refresh_picks_up_appends_from_another_store(tmp_path, exports):
+    directory = str(tmp_path / 'store')
+    reader = SalesStore(directory)
+    assert reader.summary()['partitions'] == 0
+    SalesStore(directory).append(exports['2025-06-01'])
+    reader.refresh()
+    assert reader.dates() == ['2025-06-01']
+    # The cached empty summary was dropped with the old manifest
+    assert reader.summary()['partitions'] == 1
+
+
+def _append(directory, path, start):
+    store = SalesStore(directory)
+    start.wait()
+    store.append(path)
+
+
+def test_concurrent_appenders_keep_each_others_partitions(tmp_path, exports):
+    directory = str(tmp_path / 'store')
+    days = ['2025-06-01', '2025-06-02', '2025-06-03', '2025-06-05']
+    context = multiprocessing.get_context('fork')
+    start = context.Event()
+    # Every appender loads the (empty) manifest before any of them writes
+    workers = [context.Process(target=_append, args=(directory, exports[day], start)) for day in days]
+    for worker in workers:
+        worker.start()
+    start.set()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    store = SalesStore(directory)
+    assert store.dates() == days
+    partitions = sorted(name for name in os.listdir(directory) if name.startswith('date='))
+    assert partitions == [f'date={day}' for day in days]
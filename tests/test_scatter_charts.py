@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+from scatter_charts import (GRID_BINS, OUTLIER_QUANTILE, _grid_cells, outlier_positions,
+                            sample_positions, scatter_figure)
+
+
+def catalog(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Sold': rng.lognormal(2, 1, rows),
+        'Total': rng.lognormal(5, 1.5, rows),
+        'Description': [f'Product {i}' for i in range(rows)]
+    })
+
+
+def naive_outliers(x, y):
+    """Rows outside the central quantile range of either axis"""
+    outside = np.zeros(len(x), dtype=bool)
+    for values in (x, y):
+        low, high = np.quantile(values, [OUTLIER_QUANTILE, 1 - OUTLIER_QUANTILE])
+        outside |= (values < low) | (values > high)
+    return np.flatnonzero(outside)
+
+
+def test_small_catalogs_get_the_plain_scatter():
+    df = catalog(50)
+    fig = scatter_figure(df, 'Sold', 'Total', 'Sold vs Total', limit=100)
+    assert fig.to_dict() == px.scatter(df, x='Sold', y='Total', title='Sold vs Total', labels={}).to_dict()
+
+
+def test_outliers_match_the_quantile_fences():
+    df = catalog(20_000)
+    x, y = df['Sold'].to_numpy(), df['Total'].to_numpy()
+    expected = naive_outliers(x, y)
+    assert outlier_positions(x, y, len(x)).tolist() == expected.tolist()
+    # A smaller limit keeps the most extreme of them
+    assert set(outlier_positions(x, y, 10)) <= set(expected)
+    assert len(outlier_positions(x, y, 10)) == 10
+
+
+def test_sample_keeps_outliers_and_every_occupied_cell():
+    df = catalog(20_000)
+    x, y = df['Sold'].to_numpy(), df['Total'].to_numpy()
+    limit = 3000
+    positions = sample_positions(x, y, limit)
+
+    assert len(positions) == limit
+    assert np.all(np.diff(positions) > 0)
+    assert set(naive_outliers(x, y)) <= set(positions)
+    # Cells are laid over the non-outlier rows; with fewer occupied cells than
+    # the budget, each one gets a representative
+    rest = np.setdiff1d(np.arange(len(x)), outlier_positions(x, y, limit // 2))
+    cells = pd.Series(_grid_cells(x[rest], y[rest]), index=rest)
+    assert cells.nunique() < limit
+    assert set(cells[cells.index.isin(positions)]) == set(cells)
+    assert sample_positions(x, y, limit).tolist() == positions.tolist()
+
+
+def test_large_catalogs_are_bounded():
+    df = catalog(5000)
+    sampled = scatter_figure(df, 'Sold', 'Total', 'Sold vs Total', limit=500, mode='sample')
+    assert len(sampled.data[0].x) == 500
+    assert sampled.data[0].type == 'scattergl'
+
+    df.loc[::10, 'Sold'] = np.nan
+    binned = scatter_figure(df, 'Sold', 'Total', 'Sold vs Total', limit=500, mode='bin')
+    heatmap, outliers = binned.data
+    assert np.nansum(np.asarray(heatmap.z, dtype=float)) == df['Sold'].notna().sum()
+    assert np.asarray(heatmap.z).shape == (GRID_BINS, GRID_BINS)
+    assert 0 < len(outliers.x) <= 500
+
+
+@pytest.mark.parametrize('rows', [50, 5000])
+def test_unknown_modes_are_rejected(rows):
+    with pytest.raises(ValueError, match='binned'):
+        scatter_figure(catalog(rows), 'Sold', 'Total', 'Sold vs Total', limit=500, mode='binned')
@@ -0,0 +1,53 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from shared_data import SharedTables, pa, source_version
+
+pytestmark = pytest.mark.skipif(pa is None, reason="shared tables need pyarrow")
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'Description': ['Lamp', None, 'Candle'], 'Total': [1.5, np.nan, 3.0], 'Sold': [1, 2, 3]})
+
+
+def touch(path, mtime):
+    path.write_text(str(mtime))
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_published_tables_map_back(tmp_path, frame):
+    tables = SharedTables(str(tmp_path / 'shared'))
+    version = source_version([touch(tmp_path / 'sales.csv', 1_700_000_000)])
+    assert tables.attach('sales', version) is None
+    tables.publish('sales', frame, version)
+    pd.testing.assert_frame_equal(tables.attach('sales', version), frame, check_dtype=False)
+
+
+def test_publishing_keeps_tables_from_other_sources(tmp_path, frame):
+    tables = SharedTables(str(tmp_path / 'shared'))
+    first = touch(tmp_path / 'first.csv', 1_700_000_000)
+    second = touch(tmp_path / 'second.csv', 1_700_000_000)
+    first_version, second_version = source_version([first]), source_version([second])
+
+    tables.publish('sales', frame, first_version)
+    tables.publish('sales', frame.iloc[:1], second_version)
+    tables.publish('sales', frame, first_version)
+    assert len(tables.attach('sales', first_version)) == 3
+    assert len(tables.attach('sales', second_version)) == 1
+
+
+def test_a_new_version_replaces_the_old_one_for_the_same_sources(tmp_path, frame):
+    tables = SharedTables(str(tmp_path / 'shared'))
+    path = touch(tmp_path / 'sales.csv', 1_700_000_000)
+    old_version = source_version([path])
+    tables.publish('sales', frame, old_version)
+
+    touch(tmp_path / 'sales.csv', 1_750_000_000)
+    new_version = source_version([path])
+    assert new_version != old_version
+    tables.publish('sales', frame, new_version)
+    assert tables.attach('sales', old_version) is None
+    assert os.listdir(tables.directory) == [f'sales.{new_version}.arrow']
@@ -0,0 +1,116 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.bench_warehouse_derivations import legacy_derive_warehouse_columns, make_planning_export
+from warehouse_data import (NO_STOCKOUT_DAYS, SAMPLE_LEAD_TIME_DAYS, SAMPLE_LOCATIONS, SAMPLE_SUPPLIERS,
+                            create_sample_warehouse_data, derive_warehouse_columns)
+
+RANDOM_COLUMNS = ['Lead_Time_Days', 'Warehouse_Location', 'Supplier']
+
+
+def naive_sample_warehouse(sales_df):
+    """The original iterrows() builder, without its unseeded random columns"""
+    rows = []
+    for _, row in sales_df.iterrows():
+        current_stock = max(0, row['Stock'])
+        reorder_point = max(1, int(row['Sold'] * 0.2))
+        safety_stock = max(1, int(row['Sold'] * 0.1))
+        max_stock = reorder_point + safety_stock + int(row['Sold'] * 0.5)
+        rows.append({
+            'Product_ID': row.get('System ID', f'PROD_{len(rows)}'),
+            'Product_Name': row['Description'],
+            'Category': row['Category'],
+            'Current_Stock': current_stock,
+            'Reorder_Point': reorder_point,
+            'Safety_Stock': safety_stock,
+            'Max_Stock': max_stock,
+            'Last_Updated': datetime.now().strftime('%Y-%m-%d'),
+            'Stock_Status': 'Low' if current_stock <= reorder_point else 'Adequate' if current_stock <= max_stock else 'Overstocked',
+            'Restock_Needed': current_stock <= reorder_point,
+            'Days_Until_Stockout': int(current_stock / (row['Sold'] / 365)) if row['Sold'] > 0 else 999,
+            'Monthly_Demand': row['Sold'],
+            'Annual_Demand': row['Sold'] * 12,
+            'Stock_Turnover': row['Sold'] / current_stock if current_stock > 0 else 0
+        })
+    return pd.DataFrame(rows)
+
+
+def planning_frame():
+    """Random planning rows plus the edge cases: no stock, stock at and around the fences"""
+    df = make_planning_export(2000, seed=1)
+    edges = pd.DataFrame({
+        'Product_ID': [-1, -2, -3, -4, -5, -6],
+        'Product_Name': ['ZERO', 'ZERO NO REORDER', 'AT REORDER', 'AT MAX', 'OVER MAX', 'FRACTIONAL'],
+        'Current_Stock': [0.0, 0.0, 20.0, 300.0, 301.0, 7.5],
+        'Reorder_Point': [40.0, 0.0, 20.0, 10.0, 10.0, 45.0],
+        'Max_Stock': [100.0, 100.0, 100.0, 300.0, 300.0, 50.0],
+    })
+    return pd.concat([df, edges], ignore_index=True)
+
+
+def test_derived_columns_match_the_row_wise_apply():
+    df = planning_frame()
+    expected = legacy_derive_warehouse_columns(df.copy())
+    pd.testing.assert_frame_equal(derive_warehouse_columns(df.copy()), expected, check_dtype=False)
+
+
+def test_no_stock_means_no_stockout():
+    result = derive_warehouse_columns(planning_frame())
+    zero = result['Current_Stock'] == 0
+    assert zero.sum() > 2
+    assert (result.loc[zero, 'Days_Until_Stockout'] == NO_STOCKOUT_DAYS).all()
+    assert (result.loc[~zero, 'Days_Until_Stockout'] != NO_STOCKOUT_DAYS).any()
+
+
+def test_missing_max_stock_falls_back_like_the_apply():
+    # Without Max_Stock every row not below its reorder point counts as adequate
+    df = planning_frame().drop(columns='Max_Stock')
+    expected = legacy_derive_warehouse_columns(df.copy())
+    result = derive_warehouse_columns(df.copy())
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert set(result['Stock_Status']) == {'Low', 'Adequate'}
+
+
+@pytest.fixture
+def sales():
+    rng = np.random.default_rng(5)
+    rows = 500
+    sold = rng.integers(0, 60, rows).astype(float)
+    sold[:5] = 0
+    stock = rng.integers(-10, 80, rows).astype(float)
+    return pd.DataFrame({
+        'System ID': np.arange(210000000000, 210000000000 + rows),
+        'Description': [f'ITEM {i}' for i in range(rows)],
+        'Category': rng.choice(['Lubricants', 'Vibrators', 'Other'], rows),
+        'Stock': stock,
+        'Sold': sold,
+    })
+
+
+def test_sample_matches_the_row_wise_builder(sales):
+    result = create_sample_warehouse_data(sales)
+    expected = naive_sample_warehouse(sales)
+    pd.testing.assert_frame_equal(result.drop(columns=RANDOM_COLUMNS), expected[result.columns.drop(RANDOM_COLUMNS)],
+                                  check_dtype=False)
+
+
+def test_sample_is_reproducible_from_its_seed(sales):
+    first = create_sample_warehouse_data(sales)
+    pd.testing.assert_frame_equal(create_sample_warehouse_data(sales), first)
+    other = create_sample_warehouse_data(sales, seed=7)
+    assert not other[RANDOM_COLUMNS].equals(first[RANDOM_COLUMNS])
+    pd.testing.assert_frame_equal(other.drop(columns=RANDOM_COLUMNS), first.drop(columns=RANDOM_COLUMNS))
+
+
+def test_sample_random_columns_use_the_original_ranges(sales):
+    result = create_sample_warehouse_data(sales)
+    low, high = SAMPLE_LEAD_TIME_DAYS
+    assert result['Lead_Time_Days'].between(low, high - 1).all()
+    assert set(result['Warehouse_Location']) == set(SAMPLE_LOCATIONS)
+    assert set(result['Supplier']) == set(SAMPLE_SUPPLIERS)
+
+
+def test_sample_without_system_ids(sales):
+    result = create_sample_warehouse_data(sales.drop(columns='System ID'))
+    assert list(result['Product_ID'][:3]) == ['PROD_0', 'PROD_1', 'PROD_2']
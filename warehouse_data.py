@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+WAREHOUSE_CSV = '_Inventory Planning Settings 20250627.csv'
+
+# Days_Until_Stockout value used when there is no stock to run down
+NO_STOCKOUT_DAYS = 999
+
+# Fallback dataset settings; the fixed seed keeps every worker's copy identical
+SAMPLE_SEED = 42
+SAMPLE_LOCATIONS = pd.Series(['A1', 'A2', 'B1', 'B2', 'C1', 'C2'])
+SAMPLE_SUPPLIERS = pd.Series(['Supplier A', 'Supplier B', 'Supplier C', 'Supplier D'])
+STOCK_STATUSES = pd.Series(['Low', 'Adequate', 'Overstocked'])
+SAMPLE_LEAD_TIME_DAYS = (7, 30)
+
+
+def derive_warehouse_columns(warehouse_df):
+    """Add stock status, restock, stockout and turnover columns in one vectorized pass"""
+    current = warehouse_df['Current_Stock'].to_numpy(dtype=float)
+    reorder = warehouse_df['Reorder_Point'].to_numpy(dtype=float)
+    if 'Max_Stock' in warehouse_df.columns:
+        max_stock = warehouse_df['Max_Stock'].to_numpy(dtype=float)
+    else:
+        max_stock = current + 1
+
+    restock_needed = current <= reorder
+
+    warehouse_df['Stock_Status'] = np.select(
+        [restock_needed, current <= max_stock],
+        ['Low', 'Adequate'],
+        default='Overstocked'
+    )
+    warehouse_df['Restock_Needed'] = restock_needed
+
+    # Simplified stockout estimate, truncated to whole days like int()
+    days_until_stockout = np.trunc(current / np.maximum(1, reorder / 30))
+    warehouse_df['Days_Until_Stockout'] = np.where(
+        current == 0, NO_STOCKOUT_DAYS, days_until_stockout
+    ).astype(np.int64)
+
+    # Add monthly and annual demand estimates
+    warehouse_df['Monthly_Demand'] = warehouse_df['Reorder_Point'] * 2  # Estimate
+    warehouse_df['Annual_Demand'] = warehouse_df['Monthly_Demand'] * 12
+
+    warehouse_df['Stock_Turnover'] = (
+        warehouse_df['Monthly_Demand'].to_numpy(dtype=float) / np.maximum(1, current)
+    )
+    return warehouse_df
+
+
+def create_sample_warehouse_data(sales_df, seed=SAMPLE_SEED):
+    """Build a reproducible warehouse frame from sales data, column by column"""
+    rows = len(sales_df)
+    stock = sales_df['Stock'].fillna(0).to_numpy(dtype=float)
+    sold = sales_df['Sold'].fillna(0).to_numpy(dtype=float)
+
+    # Draw lead time, location and supplier for every row in one batched call
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(
+        low=[SAMPLE_LEAD_TIME_DAYS[0], 0, 0],
+        high=[SAMPLE_LEAD_TIME_DAYS[1], len(SAMPLE_LOCATIONS), len(SAMPLE_SUPPLIERS)],
+        size=(rows, 3)
+    )
+
+    # Calculate warehouse metrics based on sales data
+    current_stock = np.maximum(0, stock)
+    reorder_point = np.maximum(1, np.trunc(sold * 0.2)).astype(np.int64)  # 20% of sales as reorder point
+    safety_stock = np.maximum(1, np.trunc(sold * 0.1)).astype(np.int64)  # 10% of sales as safety stock
+    max_stock = reorder_point + safety_stock + np.trunc(sold * 0.5).astype(np.int64)  # Max stock level
+
+    restock_needed = current_stock <= reorder_point
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_until_stockout = np.where(
+            sold > 0, np.trunc(current_stock / (sold / 365)), NO_STOCKOUT_DAYS
+        ).astype(np.int64)
+        stock_turnover = np.where(current_stock > 0, sold / current_stock, 0.0)
+
+    # Low-cardinality text columns are gathered from label Series by code,
+    # which avoids converting a million Python strings
+    stock_status = np.select([restock_needed, current_stock <= max_stock], [0, 1], default=2)
+
+    if 'System ID' in sales_df.columns:
+        product_ids = sales_df['System ID'].to_numpy()
+    else:
+        product_ids = 'PROD_' + pd.Series(np.arange(rows)).astype(str)
+
+    return pd.DataFrame({
+        'Product_ID': product_ids,
+        'Product_Name': sales_df['Description'].reset_index(drop=True),
+        'Category': sales_df['Category'].reset_index(drop=True),
+        'Current_Stock': current_stock,
+        'Reorder_Point': reorder_point,
+        'Lead_Time_Days': draws[:, 0],
+        'Safety_Stock': safety_stock,
+        'Max_Stock': max_stock,
+        'Warehouse_Location': SAMPLE_LOCATIONS.take(draws[:, 1]).reset_index(drop=True),
+        'Supplier': SAMPLE_SUPPLIERS.take(draws[:, 2]).reset_index(drop=True),
+        'Last_Updated': datetime.now().strftime('%Y-%m-%d'),
+        'Stock_Status': STOCK_STATUSES.take(stock_status).reset_index(drop=True),
+        'Restock_Needed': restock_needed,
+        'Days_Until_Stockout': days_until_stockout,
+        'Monthly_Demand': sales_df['Sold'].fillna(0).to_numpy(),
+        'Annual_Demand': sales_df['Sold'].fillna(0).to_numpy() * 12,
+        'Stock_Turnover': stock_turnover
+    })